@@ -1,50 +1,122 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Union
+import hmac
 import os
+import time
 
 from app.crud import blog as crud
 from app.schemas import blog as schemas
+from app.core import config
+from app.core.auth import require_admin
 from app.core.database import get_db
+from app.core.cache import response_cache
+from app.core.metrics import metrics
+from app.core.timing import TimedRoute
 from app.services.article_service import save_article_file, delete_article_file
-from app.utils.tag_utils import extract_unique_tags
-from app.utils.security import verify_password
-
-router = APIRouter()
-
-@router.post("/login")
+from app.services.export_service import export_scheduler
+from app.services.image_service import store_image
+from app.services.import_service import import_articles
+from app.utils.tag_utils import format_facet_values
+from app.utils.security import verify_password, hash_password, needs_rehash, create_admin_token, is_password_hash
+
+async def _schedule_export(request: Request):
+    # Endpoints that raise never get past the yield: only successful writes refresh the export
+    yield
+    if request.method != "GET":
+        export_scheduler.notify()
+
+# Login is the only admin route that takes no token
+auth_router = APIRouter(route_class=TimedRoute)
+router = APIRouter(route_class=TimedRoute, dependencies=[Depends(require_admin), Depends(_schedule_export)])
+
+@auth_router.post("/login", response_model=schemas.LoginResponse)
 def login(login_data: schemas.LoginRequest, db: Session = Depends(get_db)):
+    # A sync endpoint runs in the threadpool, so the slow KDF never blocks the event loop
     admin = crud.get_admin_by_username(db, username=login_data.username)
 
     if not admin:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    # Verify password (supports both hashed and legacy plain text)
+    # Verify password (supports scrypt, legacy SHA-256 and legacy plain text)
     is_valid = False
     
     # 1. Try verifying as hashed password
     if verify_password(login_data.password, admin.password):
         is_valid = True
-    # 2. Fallback: Check if it matches plain text (legacy support)
-    elif login_data.password == admin.password:
+    # 2. Fallback: Check if it matches plain text (legacy support), never against a stored hash
+    elif not is_password_hash(admin.password) and hmac.compare_digest(login_data.password.encode(), admin.password.encode()):
         is_valid = True
 
     if is_valid:
-        return {"message": "Login successful", "status": "success"}
+        # Upgrade legacy rows and outdated scrypt costs while the password is at hand
+        if needs_rehash(admin.password):
+            crud.update_admin_password(db, admin, hash_password(login_data.password))
+        return {
+            "message": "Login successful",
+            "status": "success",
+            "access_token": create_admin_token(admin.username),
+            "token_type": "bearer",
+            "expires_in": config.ADMIN_TOKEN_TTL,
+        }
     else:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-@router.get("/articles", response_model=List[schemas.Post])
+@router.get("/cache")
+def read_cache_stats():
+    return response_cache.stats()
+
+@router.get("/search", response_model=schemas.SearchPage)
+def search(q: str = Query(..., min_length=1), skip: int = 0, limit: int = 20, type: List[str] = Query(None), db: Session = Depends(get_db)):
+    # Unlike /api/user/search, drafts and private items are included
+    total, items = crud.search(db, q, skip=skip, limit=limit, types=type, include_hidden=True)
+    return {"total": total, "items": items}
+
+def _run_batch(db: Session, resource: str, batch: schemas.BatchAction):
+    if batch.action == "set_status":
+        if resource not in crud.FACETED_RESOURCES:
+            raise HTTPException(status_code=400, detail=f"{resource} have no status")
+        if not batch.status:
+            raise HTTPException(status_code=400, detail="status is required")
+        affected = crud.batch_set_status(db, resource, batch.ids, batch.status)
+    elif batch.action in ("add_tags", "remove_tags"):
+        if resource not in crud.TAGGED_RESOURCES:
+            raise HTTPException(status_code=400, detail=f"{resource} have no tags")
+        if batch.action == "add_tags":
+            affected = crud.batch_update_tags(db, resource, batch.ids, add=batch.tags)
+        else:
+            affected = crud.batch_update_tags(db, resource, batch.ids, remove=batch.tags)
+    else:
+        rows = crud.batch_delete(db, resource, batch.ids)
+        if resource == "posts":
+            # Files go only after the rows are gone for good
+            for row in rows:
+                delete_article_file(row.url)
+        affected = [row.id for row in rows]
+    return {"status": "success", "action": batch.action, "affected": affected}
+
+@router.get("/articles", response_model=Union[List[schemas.Post], schemas.PostCursorPage, schemas.PostPagination])
 def read_admin_articles(
     skip: int = 0, 
     limit: int = 10, 
+    cursor: str = None,
     category: str = None, 
     tags: List[str] = Query(None),
     sort: str = "desc",
     status: str = None,
+    with_total: bool = False,
     db: Session = Depends(get_db)
 ):
+    if cursor is not None:
+        try:
+            posts, next_cursor = crud.get_posts_page(db, cursor=cursor, limit=limit, folder=category, tags=tags, sort=sort, status=status)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return {"items": posts, "next_cursor": next_cursor}
     posts = crud.get_posts(db, skip=skip, limit=limit, folder=category, tags=tags, sort=sort, status=status)
+    if with_total:
+        return {"total": crud.get_posts_count(db, folder=category, tags=tags, status=status), "items": posts}
     return posts
 
 @router.post("/articles/upload")
@@ -59,6 +131,7 @@ async def upload_article(
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
+    start = time.perf_counter()
     # Save file using service
     url_path = await save_article_file(
         file=file,
@@ -72,7 +145,10 @@ async def upload_article(
     if status == "published":
         status = "public"
 
-    crud.create_post(
+    # Session calls block: keep them off the event loop, where waiting for the
+    # single writer connection would stall the request that holds it
+    await run_in_threadpool(
+        crud.create_post,
         db=db,
         title=title,
         date=date,
@@ -83,9 +159,24 @@ async def upload_article(
         url=url_path,
         image=image
     )
-    
+
+    metrics.observe_upload(file.size or 0, time.perf_counter() - start)
     return {"status": "success", "message": "Article uploaded successfully"}
 
+@router.post("/articles/import")
+def import_article_archive(
+    status: str = Form("draft"),
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    # Sync endpoint: the import runs in the threadpool, with its own worker pool for file writes
+    try:
+        report = import_articles(db, file.file, status=status)
+    except (ValueError, EOFError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    failed = sum(1 for entry in report if entry["status"] == "error")
+    return {"status": "success", "imported": len(report) - failed, "failed": failed, "files": report}
+
 @router.put("/articles/{post_id}")
 async def update_article(
     post_id: int,
@@ -99,7 +190,7 @@ async def update_article(
     file: UploadFile = File(None),
     db: Session = Depends(get_db)
 ):
-    post = crud.get_post(db, post_id)
+    post = await run_in_threadpool(crud.get_post, db, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Article not found")
 
@@ -130,7 +221,8 @@ async def update_article(
     if status == "published":
         status = "public"
 
-    updated_post = crud.update_post(
+    updated_post = await run_in_threadpool(
+        crud.update_post,
         db=db,
         post_id=post_id,
         title=title,
@@ -162,24 +254,34 @@ def delete_article(post_id: int, db: Session = Depends(get_db)):
     else:
         raise HTTPException(status_code=500, detail="Failed to delete article from database")
 
+@router.post("/articles/batch", response_model=schemas.BatchResult)
+def batch_articles(batch: schemas.BatchAction, db: Session = Depends(get_db)):
+    # Normalize status
+    if batch.status == "published":
+        batch.status = "public"
+    return _run_batch(db, "posts", batch)
+
 @router.get("/articles/tags")
-def read_admin_article_tags(db: Session = Depends(get_db)):
-    posts = crud.get_posts(db, skip=0, limit=10000)
-    return {"tags": extract_unique_tags(posts, field_name="tags")}
+def read_admin_article_tags(counts: bool = False, db: Session = Depends(get_db)):
+    rows = crud.get_facet_counts(db, "posts", "tags")
+    return {"tags": format_facet_values(rows, key="tag", with_counts=counts)}
 
-@router.get("/books", response_model=List[schemas.Book])
+@router.get("/books", response_model=Union[List[schemas.Book], schemas.BookPagination])
 def read_admin_books(
     skip: int = 0, 
     limit: int = 100, 
     tags: List[str] = Query(None),
     status: str = None,
+    with_total: bool = False,
     db: Session = Depends(get_db)
 ):
     books = crud.get_books(db, skip=skip, limit=limit, status=status, tags=tags)
+    if with_total:
+        return {"total": crud.get_books_count(db, status=status, tags=tags), "items": books}
     return books
 
 @router.post("/books/upload")
-async def upload_book(
+def upload_book(
     title: str = Form(...),
     cover: str = Form(None),
     url: str = Form(None),
@@ -200,7 +302,7 @@ async def upload_book(
     return {"status": "success", "message": "Book created successfully"}
 
 @router.put("/books/{book_id}")
-async def update_book(
+def update_book(
     book_id: int,
     title: str = Form(None),
     cover: str = Form(None),
@@ -233,10 +335,14 @@ def delete_book(book_id: int, db: Session = Depends(get_db)):
     else:
         raise HTTPException(status_code=404, detail="Book not found")
 
+@router.post("/books/batch", response_model=schemas.BatchResult)
+def batch_books(batch: schemas.BatchAction, db: Session = Depends(get_db)):
+    return _run_batch(db, "books", batch)
+
 @router.get("/books/tags")
-def read_admin_book_tags(db: Session = Depends(get_db)):
-    books = crud.get_books(db, skip=0, limit=10000)
-    return {"tags": extract_unique_tags(books, field_name="tags")}
+def read_admin_book_tags(counts: bool = False, db: Session = Depends(get_db)):
+    rows = crud.get_facet_counts(db, "books", "tags")
+    return {"tags": format_facet_values(rows, key="tag", with_counts=counts)}
 
 @router.get("/projects", response_model=List[schemas.Project])
 def read_admin_projects(
@@ -251,12 +357,12 @@ def read_admin_projects(
     return projects
 
 @router.get("/projects/tech-stacks")
-def read_admin_tech_stacks(db: Session = Depends(get_db)):
-    projects = crud.get_projects(db, skip=0, limit=10000)
-    return extract_unique_tags(projects, field_name="techStack")
+def read_admin_tech_stacks(counts: bool = False, db: Session = Depends(get_db)):
+    rows = crud.get_facet_counts(db, "projects", "techStack")
+    return format_facet_values(rows, key="tag", with_counts=counts)
 
 @router.post("/projects/upload")
-async def upload_project(
+def upload_project(
     name: str = Form(...),
     description: str = Form(None),
     link: str = Form(None),
@@ -277,7 +383,7 @@ async def upload_project(
     return {"status": "success", "message": "Project created successfully"}
 
 @router.put("/projects/{project_id}")
-async def update_project(
+def update_project(
     project_id: int,
     name: str = Form(None),
     description: str = Form(None),
@@ -310,20 +416,31 @@ def delete_project(project_id: int, db: Session = Depends(get_db)):
     else:
         raise HTTPException(status_code=404, detail="Project not found")
 
-@router.get("/diaries", response_model=schemas.DiaryPagination)
+@router.post("/projects/batch", response_model=schemas.BatchResult)
+def batch_projects(batch: schemas.BatchAction, db: Session = Depends(get_db)):
+    return _run_batch(db, "projects", batch)
+
+@router.get("/diaries", response_model=Union[schemas.DiaryPagination, schemas.DiaryCursorPage])
 def read_admin_diaries(
     skip: int = 0, 
     limit: int = 100, 
+    cursor: str = None,
     year: str = Query(None),
     month: str = Query(None),
     db: Session = Depends(get_db)
 ):
+    if cursor is not None:
+        try:
+            diaries, next_cursor = crud.get_diaries_page(db, cursor=cursor, limit=limit, year=year, month=month)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return {"items": diaries, "next_cursor": next_cursor}
     diaries = crud.get_diaries(db, skip=skip, limit=limit, year=year, month=month)
     total = crud.get_diaries_count(db, year=year, month=month)
     return {"total": total, "items": diaries}
 
 @router.post("/diaries/upload")
-async def upload_diary(
+def upload_diary(
     date: str = Form(...),
     content: str = Form(None),
     mood: str = Form(None),
@@ -342,7 +459,7 @@ async def upload_diary(
     return {"status": "success", "message": "Diary created successfully"}
 
 @router.put("/diaries/{diary_id}")
-async def update_diary(
+def update_diary(
     diary_id: int,
     date: str = Form(None),
     content: str = Form(None),
@@ -373,39 +490,75 @@ def delete_diary(diary_id: int, db: Session = Depends(get_db)):
     else:
         raise HTTPException(status_code=404, detail="Diary not found")
 
+@router.post("/diaries/batch", response_model=schemas.BatchResult)
+def batch_diaries(batch: schemas.BatchAction, db: Session = Depends(get_db)):
+    return _run_batch(db, "diaries", batch)
+
 @router.get("/gallery/tags")
-def read_admin_gallery_tags(db: Session = Depends(get_db)):
-    gallery = crud.get_gallery(db, skip=0, limit=10000)
-    return {"tags": extract_unique_tags(gallery, field_name="tags")}
+def read_admin_gallery_tags(counts: bool = False, db: Session = Depends(get_db)):
+    rows = crud.get_facet_counts(db, "gallery", "tags")
+    return {"tags": format_facet_values(rows, key="tag", with_counts=counts)}
 
-@router.get("/gallery", response_model=List[schemas.Gallery])
+@router.get("/gallery", response_model=Union[List[schemas.Gallery], schemas.GalleryCursorPage, schemas.GalleryPagination])
 def read_admin_gallery(
     skip: int = 0, 
     limit: int = 100, 
+    cursor: str = None,
     tags: List[str] = Query(None),
     sort: str = "desc",
     status: str = None,
+    with_total: bool = False,
     db: Session = Depends(get_db)
 ):
+    if cursor is not None:
+        try:
+            gallery, next_cursor = crud.get_gallery_page(db, cursor=cursor, limit=limit, status=status, tags=tags, sort=sort)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return {"items": gallery, "next_cursor": next_cursor}
     gallery = crud.get_gallery(db, skip=skip, limit=limit, status=status, tags=tags, sort=sort)
+    if with_total:
+        return {"total": crud.get_gallery_count(db, status=status, tags=tags), "items": gallery}
     return gallery
 
+async def _store_image(file: UploadFile) -> dict:
+    try:
+        return await store_image(file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/images", response_model=schemas.ImageUpload)
+async def upload_image(file: UploadFile = File(...)):
+    # For covers (books, posts): the returned URLs go into their cover/image fields
+    return await _store_image(file)
+
 @router.post("/gallery/upload")
 async def upload_gallery(
     title: str = Form(None),
-    url: str = Form(...),
+    url: str = Form(None),
     date: str = Form(None),
     tags: str = Form(None), # JSON string
     status: str = Form("published"),
+    file: UploadFile = File(None),
     db: Session = Depends(get_db)
 ):
-    crud.create_gallery(
+    # Either an external image URL or an uploaded file, which gets thumbnails
+    image = None
+    if file and file.filename:
+        image = await _store_image(file)
+        url = image["url"]
+    if not url:
+        raise HTTPException(status_code=400, detail="url or file is required")
+
+    await run_in_threadpool(
+        crud.create_gallery,
         db=db,
         title=title,
         url=url,
         date=date,
         tags=tags,
-        status=status
+        status=status,
+        image=image
     )
     return {"status": "success", "message": "Image created successfully"}
 
@@ -417,20 +570,31 @@ async def update_gallery(
     date: str = Form(None),
     tags: str = Form(None),
     status: str = Form(None),
+    file: UploadFile = File(None),
     db: Session = Depends(get_db)
 ):
-    gallery = crud.get_gallery_item(db, gallery_id)
+    gallery = await run_in_threadpool(crud.get_gallery_item, db, gallery_id)
     if not gallery:
         raise HTTPException(status_code=404, detail="Image not found")
 
-    crud.update_gallery(
+    image = None
+    if file and file.filename:
+        image = await _store_image(file)
+        url = image["url"]
+    elif url and url != gallery.url:
+        # A new external URL: the old thumbnails no longer match
+        image = {}
+
+    await run_in_threadpool(
+        crud.update_gallery,
         db=db,
         gallery_id=gallery_id,
         title=title,
         url=url,
         date=date,
         tags=tags,
-        status=status
+        status=status,
+        image=image
     )
     return {"status": "success", "message": "Image updated successfully"}
 
@@ -441,24 +605,38 @@ def delete_gallery(gallery_id: int, db: Session = Depends(get_db)):
     else:
         raise HTTPException(status_code=404, detail="Image not found")
 
-@router.get("/todos", response_model=List[schemas.Todo])
+@router.post("/gallery/batch", response_model=schemas.BatchResult)
+def batch_gallery(batch: schemas.BatchAction, db: Session = Depends(get_db)):
+    return _run_batch(db, "gallery", batch)
+
+@router.get("/todos", response_model=Union[List[schemas.Todo], schemas.TodoCursorPage, schemas.TodoPagination])
 def read_admin_todos(
     skip: int = 0, 
     limit: int = 100, 
+    cursor: str = None,
     priority: str = None,
     type: str = None,
     status: str = None,
     completed: bool = None,
     sort: str = "desc",
+    with_total: bool = False,
     db: Session = Depends(get_db)
 ):
     if priority:
         priority = priority.lower()
+    if cursor is not None:
+        try:
+            todos, next_cursor = crud.get_todos_page(db, cursor=cursor, limit=limit, status=status, priority=priority, type=type, completed=completed, sort=sort)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return {"items": todos, "next_cursor": next_cursor}
     todos = crud.get_todos(db, skip=skip, limit=limit, status=status, priority=priority, type=type, completed=completed, sort=sort)
+    if with_total:
+        return {"total": crud.get_todos_count(db, status=status, priority=priority, type=type, completed=completed), "items": todos}
     return todos
 
 @router.post("/todos/upload")
-async def upload_todo(
+def upload_todo(
     task: str = Form(...),
     priority: str = Form("medium"),
     type: str = Form("short-term"),
@@ -481,7 +659,7 @@ async def upload_todo(
     return {"status": "success", "message": "Task created successfully"}
 
 @router.put("/todos/{todo_id}")
-async def update_todo(
+def update_todo(
     todo_id: int,
     task: str = Form(None),
     priority: str = Form(None),
@@ -516,11 +694,14 @@ def delete_todo(todo_id: int, db: Session = Depends(get_db)):
     else:
         raise HTTPException(status_code=404, detail="Task not found")
 
+@router.post("/todos/batch", response_model=schemas.BatchResult)
+def batch_todos(batch: schemas.BatchAction, db: Session = Depends(get_db)):
+    return _run_batch(db, "todos", batch)
+
 @router.get("/todos/types")
-def read_admin_todo_types(db: Session = Depends(get_db)):
-    todos = crud.get_todos(db, skip=0, limit=10000)
-    all_types = set(t.type for t in todos if t.type)
-    return {"types": list(sorted(all_types))}
+def read_admin_todo_types(counts: bool = False, db: Session = Depends(get_db)):
+    rows = crud.get_facet_counts(db, "todos", "type")
+    return {"types": format_facet_values(rows, key="type", with_counts=counts)}
 
 @router.get("/tools", response_model=List[schemas.Tool])
 def read_admin_tools(
@@ -534,13 +715,12 @@ def read_admin_tools(
     return tools
 
 @router.get("/tools/categories")
-def read_admin_tool_categories(db: Session = Depends(get_db)):
-    tools = crud.get_tools(db, skip=0, limit=10000)
-    all_categories = set(t.category for t in tools if t.category)
-    return {"categories": list(sorted(all_categories))}
+def read_admin_tool_categories(counts: bool = False, db: Session = Depends(get_db)):
+    rows = crud.get_facet_counts(db, "tools", "category")
+    return {"categories": format_facet_values(rows, key="category", with_counts=counts)}
 
 @router.post("/tools/upload")
-async def upload_tool(
+def upload_tool(
     name: str = Form(...),
     url: str = Form(...),
     description: str = Form(None),
@@ -561,7 +741,7 @@ async def upload_tool(
     return {"status": "success", "message": "Tool created successfully"}
 
 @router.put("/tools/{tool_id}")
-async def update_tool(
+def update_tool(
     tool_id: int,
     name: str = Form(None),
     url: str = Form(None),
@@ -593,3 +773,7 @@ def delete_tool(tool_id: int, db: Session = Depends(get_db)):
         return {"status": "success", "message": "Tool deleted successfully"}
     else:
         raise HTTPException(status_code=404, detail="Tool not found")
+
+@router.post("/tools/batch", response_model=schemas.BatchResult)
+def batch_tools(batch: schemas.BatchAction, db: Session = Depends(get_db)):
+    return _run_batch(db, "tools", batch)
@@ -1,78 +1,150 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Union
 
-from app.crud import blog as crud
+from app.crud import blog_async as crud
 from app.schemas import blog as schemas
-from app.core.database import get_db
-from app.utils.tag_utils import extract_unique_tags
-
-router = APIRouter()
-
-@router.get("/books", response_model=List[schemas.Book])
-def read_books(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    books = crud.get_books(db, skip=skip, limit=limit, status="published")
+from app.core.database import get_async_db
+from app.core.cache import cached
+from app.core.timing import TimedRoute
+from app.services.render_service import render_article
+from app.utils.tag_utils import format_facet_values
+
+router = APIRouter(route_class=TimedRoute)
+
+@router.get("/books", response_model=Union[List[schemas.Book], schemas.BookPagination])
+@cached("books", response_model=Union[List[schemas.Book], schemas.BookPagination])
+async def read_books(skip: int = 0, limit: int = 100, with_total: bool = False, db: AsyncSession = Depends(get_async_db)):
+    books = await crud.get_books(db, skip=skip, limit=limit, status="published")
+    if with_total:
+        return {"total": await crud.get_books_count(db, status="published"), "items": books}
     return books
 
-@router.get("/diaries", response_model=List[schemas.Diary])
-def read_diaries(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    diaries = crud.get_diaries(db, skip=skip, limit=limit)
+@router.get("/diaries", response_model=Union[List[schemas.Diary], schemas.DiaryCursorPage])
+@cached("diaries", response_model=Union[List[schemas.Diary], schemas.DiaryCursorPage])
+async def read_diaries(skip: int = 0, limit: int = 100, cursor: str = None, year: str = None, month: str = None, db: AsyncSession = Depends(get_async_db)):
+    if cursor is not None:
+        try:
+            diaries, next_cursor = await crud.get_diaries_page(db, cursor=cursor, limit=limit, year=year, month=month)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return {"items": diaries, "next_cursor": next_cursor}
+    diaries = await crud.get_diaries(db, skip=skip, limit=limit, year=year, month=month)
     return diaries
 
-@router.get("/gallery", response_model=List[schemas.Gallery])
-def read_gallery(skip: int = 0, limit: int = 100, tags: List[str] = Query(None), db: Session = Depends(get_db)):
-    gallery = crud.get_gallery(db, skip=skip, limit=limit, status="published", tags=tags)
+@router.get("/diaries/archive", response_model=schemas.DiaryArchive)
+@cached("diaries", response_model=schemas.DiaryArchive)
+async def read_diary_archive(db: AsyncSession = Depends(get_async_db)):
+    # Per-year/month counts for calendar and archive views, without fetching entries
+    return await crud.get_diary_archive(db)
+
+@router.get("/gallery", response_model=Union[List[schemas.Gallery], schemas.GalleryCursorPage, schemas.GalleryPagination])
+@cached("gallery", response_model=Union[List[schemas.Gallery], schemas.GalleryCursorPage, schemas.GalleryPagination])
+async def read_gallery(skip: int = 0, limit: int = 100, cursor: str = None, tags: List[str] = Query(None), with_total: bool = False, db: AsyncSession = Depends(get_async_db)):
+    if cursor is not None:
+        try:
+            gallery, next_cursor = await crud.get_gallery_page(db, cursor=cursor, limit=limit, status="published", tags=tags)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return {"items": gallery, "next_cursor": next_cursor}
+    gallery = await crud.get_gallery(db, skip=skip, limit=limit, status="published", tags=tags)
+    if with_total:
+        return {"total": await crud.get_gallery_count(db, status="published", tags=tags), "items": gallery}
     return gallery
 
-@router.get("/posts", response_model=List[schemas.Post])
-def read_posts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    posts = crud.get_posts(db, skip=skip, limit=limit, status="public")
+@router.get("/posts", response_model=Union[List[schemas.Post], schemas.PostCursorPage, schemas.PostPagination])
+@cached("posts", response_model=Union[List[schemas.Post], schemas.PostCursorPage, schemas.PostPagination])
+async def read_posts(skip: int = 0, limit: int = 100, cursor: str = None, with_total: bool = False, db: AsyncSession = Depends(get_async_db)):
+    if cursor is not None:
+        try:
+            posts, next_cursor = await crud.get_posts_page(db, cursor=cursor, limit=limit, status="public")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return {"items": posts, "next_cursor": next_cursor}
+    posts = await crud.get_posts(db, skip=skip, limit=limit, status="public")
+    if with_total:
+        return {"total": await crud.get_posts_count(db, status="public"), "items": posts}
     return posts
 
+# Not @cached: the article file can change on disk without a posts write.
+# The render cache is keyed by the file's contents, so a hit costs a lookup and a stat.
+@router.get("/posts/{post_id}/content", response_model=schemas.PostContent)
+async def read_post_content(post_id: int, db: AsyncSession = Depends(get_async_db)):
+    post = await crud.get_post(db, post_id)
+    if post is None or post.status != "public":
+        raise HTTPException(status_code=404, detail="Article not found")
+    # File reads and rendering (on a render cache miss) stay off the event loop
+    content = await run_in_threadpool(render_article, post.url)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Article file not found")
+    return {"id": post.id, **content}
+
 @router.get("/projects", response_model=List[schemas.Project])
-def read_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    projects = crud.get_projects(db, skip=skip, limit=limit, visibility="published")
+@cached("projects", response_model=List[schemas.Project])
+async def read_projects(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    projects = await crud.get_projects(db, skip=skip, limit=limit, visibility="published")
     return projects
 
-@router.get("/todos", response_model=List[schemas.Todo])
-def read_todos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    todos = crud.get_todos(db, skip=skip, limit=limit, status="published")
+@router.get("/todos", response_model=Union[List[schemas.Todo], schemas.TodoCursorPage, schemas.TodoPagination])
+@cached("todos", response_model=Union[List[schemas.Todo], schemas.TodoCursorPage, schemas.TodoPagination])
+async def read_todos(skip: int = 0, limit: int = 100, cursor: str = None, with_total: bool = False, db: AsyncSession = Depends(get_async_db)):
+    if cursor is not None:
+        try:
+            todos, next_cursor = await crud.get_todos_page(db, cursor=cursor, limit=limit, status="published")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return {"items": todos, "next_cursor": next_cursor}
+    todos = await crud.get_todos(db, skip=skip, limit=limit, status="published")
+    if with_total:
+        return {"total": await crud.get_todos_count(db, status="published"), "items": todos}
     return todos
 
 @router.get("/tools", response_model=List[schemas.Tool])
-def read_tools(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    tools = crud.get_tools(db, skip=skip, limit=limit, status="published")
+@cached("tools", response_model=List[schemas.Tool])
+async def read_tools(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    tools = await crud.get_tools(db, skip=skip, limit=limit, status="published")
     return tools
 
 @router.get("/projects/tech-stacks")
-def read_tech_stacks(db: Session = Depends(get_db)):
-    projects = crud.get_projects(db, skip=0, limit=10000, visibility="published")
-    return extract_unique_tags(projects, field_name="techStack")
+@cached("projects")
+async def read_tech_stacks(counts: bool = False, db: AsyncSession = Depends(get_async_db)):
+    rows = await crud.get_facet_counts(db, "projects", "techStack", status="published")
+    return format_facet_values(rows, key="tag", with_counts=counts)
 
 @router.get("/articles/categories")
-def read_categories(db: Session = Depends(get_db)):
-    posts = crud.get_posts(db, skip=0, limit=10000, status="public")
-    folders = set(p.folder for p in posts if p.folder)
-    return {"categories": [{"path": f} for f in folders]}
+@cached("posts")
+async def read_categories(db: AsyncSession = Depends(get_async_db)):
+    rows = await crud.get_facet_counts(db, "posts", "folder", status="public")
+    return {"categories": [{"path": f, "count": count} for f, count in rows]}
 
 @router.get("/articles/tags")
-def read_tags(db: Session = Depends(get_db)):
-    posts = crud.get_posts(db, skip=0, limit=10000, status="public")
-    return {"tags": extract_unique_tags(posts, field_name="tags")}
+@cached("posts")
+async def read_tags(counts: bool = False, db: AsyncSession = Depends(get_async_db)):
+    rows = await crud.get_facet_counts(db, "posts", "tags", status="public")
+    return {"tags": format_facet_values(rows, key="tag", with_counts=counts)}
 
 @router.get("/books/tags")
-def read_book_tags(db: Session = Depends(get_db)):
-    books = crud.get_books(db, skip=0, limit=10000)
-    return {"tags": extract_unique_tags(books, field_name="tags")}
+@cached("books")
+async def read_book_tags(counts: bool = False, db: AsyncSession = Depends(get_async_db)):
+    rows = await crud.get_facet_counts(db, "books", "tags")
+    return {"tags": format_facet_values(rows, key="tag", with_counts=counts)}
 
 @router.get("/gallery/tags")
-def read_gallery_tags(db: Session = Depends(get_db)):
-    gallery = crud.get_gallery(db, skip=0, limit=10000)
-    return {"tags": extract_unique_tags(gallery, field_name="tags")}
+@cached("gallery")
+async def read_gallery_tags(counts: bool = False, db: AsyncSession = Depends(get_async_db)):
+    rows = await crud.get_facet_counts(db, "gallery", "tags")
+    return {"tags": format_facet_values(rows, key="tag", with_counts=counts)}
 
 @router.get("/todos/types")
-def read_todo_types(db: Session = Depends(get_db)):
-    todos = crud.get_todos(db, skip=0, limit=10000)
-    all_types = set(t.type for t in todos if t.type)
-    return {"types": list(sorted(all_types))}
+@cached("todos")
+async def read_todo_types(counts: bool = False, db: AsyncSession = Depends(get_async_db)):
+    rows = await crud.get_facet_counts(db, "todos", "type")
+    return {"types": format_facet_values(rows, key="type", with_counts=counts)}
+
 
+@router.get("/search", response_model=schemas.SearchPage)
+@cached("posts", "diaries", "projects", response_model=schemas.SearchPage)
+async def search(q: str = Query(..., min_length=1), skip: int = 0, limit: int = 20, type: List[str] = Query(None), db: AsyncSession = Depends(get_async_db)):
+    total, items = await crud.search(db, q, skip=skip, limit=limit, types=type)
+    return {"total": total, "items": items}
@@ -0,0 +1,21 @@
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.utils.security import verify_admin_token
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+async def require_admin(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> str:
+    """
+    Router dependency for /api/admin: accepts a valid `Authorization: Bearer`
+    admin token and returns its username. Checking the signature and expiry
+    takes no database access, so it runs on the event loop.
+    """
+    claims = verify_admin_token(credentials.credentials) if credentials else None
+    if claims is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return claims["sub"]
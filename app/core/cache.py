@@ -0,0 +1,264 @@
+import functools
+import gzip
+import hashlib
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+import brotli
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+
+from app.core import config
+from app.core.database import AsyncReadSessionLocal
+from app.core.serialization import row_encoder
+from app.core.timing import timed
+from app.models.blog import ContentVersion
+
+# Bump when the serialized representation changes, so old ETags stop matching
+ETAG_FORMAT = "2"
+
+# Content codings cached bodies can be stored in, most preferred first
+ENCODINGS = ("br", "gzip")
+
+class ResponseCache:
+    """
+    In-process LRU cache of serialized responses.
+
+    An entry maps content codings to bodies ({"identity": ..., "gzip": ...});
+    compressed variants are added on first request, so each one is
+    compressed once per content version.
+
+    Every entry remembers the content version of each resource it was built
+    from; crud writes publish a resource's new version, which turns those
+    entries into misses on their next lookup. Versions are persisted in
+    content_versions, loaded at startup and re-read every
+    `version_check_ms`, so writes committed by other processes are seen too.
+    """
+    def __init__(self, max_entries: int, version_check_ms: int = 1000):
+        self.max_entries = max_entries
+        self.version_check_ms = version_check_ms
+        self._next_version_check = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._updated_at = {}
+        self._lock = threading.Lock()
+
+    def generations(self, resources: tuple) -> tuple:
+        with self._lock:
+            return tuple(self._versions.get(r, 0) for r in resources)
+
+    def last_modified(self, resources: tuple):
+        with self._lock:
+            stamps = [self._updated_at[r] for r in resources if r in self._updated_at]
+        return max(stamps) if stamps else None
+
+    def set_version(self, resource: str, version: int, updated_at: str):
+        with self._lock:
+            # Never move backwards if a slower writer publishes late
+            if version >= self._versions.get(resource, 0):
+                self._versions[resource] = version
+                self._updated_at[resource] = datetime.fromisoformat(updated_at)
+
+    def load_versions(self, rows):
+        for row in rows:
+            self.set_version(row.resource, row.version, row.updated_at)
+
+    def versions_due(self) -> bool:
+        """
+        True when content_versions should be re-read; at most once per
+        version_check_ms across all callers.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_version_check:
+                return False
+            self._next_version_check = now + self.version_check_ms / 1000
+            return True
+
+    def get(self, key, resources: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                generations, bodies = entry
+                if generations == tuple(self._versions.get(r, 0) for r in resources):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return bodies
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, generations: tuple, bodies: dict):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (generations, bodies)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "versions": dict(self._versions),
+            }
+
+    def count_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+response_cache = ResponseCache(config.RESPONSE_CACHE_SIZE, config.CACHE_VERSION_CHECK_MS)
+
+async def _reload_versions():
+    async with AsyncReadSessionLocal() as db:
+        rows = (await db.execute(select(ContentVersion))).scalars().all()
+    response_cache.load_versions(rows)
+
+def _etag(key, generations: tuple, encoding: str) -> str:
+    # Each content coding is a separate representation and gets its own strong ETag
+    digest = hashlib.blake2b(repr((ETAG_FORMAT, key, generations, encoding)).encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+def _negotiate_encoding(accept_encoding: str) -> str:
+    """
+    Picks the preferred entry of ENCODINGS acceptable to the client
+    (honouring q-values and "*"), or "identity".
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding.strip():
+            weights[coding.strip().lower()] = q
+    best, best_q = "identity", 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=config.BROTLI_QUALITY)
+    # mtime=0 keeps the output deterministic for a given body
+    return gzip.compress(body, compresslevel=config.GZIP_LEVEL, mtime=0)
+
+def _not_modified(request: Request, etags: tuple, last_modified):
+    """
+    Returns the entry of `etags` the client's validators match (the first
+    one for "*" or If-Modified-Since), or None if the response must be sent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match uses weak comparison and takes precedence over If-Modified-Since
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in candidates:
+            return etags[0]
+        return next((etag for etag in etags if etag in candidates), None)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        return etags[0] if last_modified.replace(microsecond=0) <= since else None
+    return None
+
+def cached(*resources: str, response_model: Any = Any):
+    """
+    Caches an async endpoint's JSON response, keyed by path and query params.
+
+    The endpoint's `db` parameter is removed from its signature: a session
+    from AsyncReadSessionLocal is opened and passed in only on a cache miss.
+    The result is encoded once with row_encoder (the rows are trusted DB output,
+    so `response_model` only selects their fields) and stored as bytes.
+    Bodies of at least COMPRESSION_MIN_SIZE bytes are sent with the best
+    coding in Accept-Encoding (br, gzip); the compressed bytes are kept in
+    the cache entry next to the plain body.
+
+    Content versions written by other processes are picked up within
+    CACHE_VERSION_CHECK_MS.
+
+    Responses carry an ETag derived from the resources' content versions and
+    the coding actually sent, Last-Modified and Cache-Control; matching
+    conditional requests get a 304 before any cache lookup, query or
+    serialization. Since a small body goes out as identity whatever the
+    client accepts, the identity ETag is matched too.
+    """
+    encode = row_encoder(response_model)
+
+    def decorator(endpoint):
+        signature = inspect.signature(endpoint)
+        parameters = [p for p in signature.parameters.values() if p.name != "db"]
+        parameters.append(inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, request: Request, **kwargs):
+            if response_cache.versions_due():
+                await _reload_versions()
+            key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+            generations = response_cache.generations(resources)
+            last_modified = response_cache.last_modified(resources)
+            encoding = _negotiate_encoding(request.headers.get("accept-encoding", ""))
+            etags = tuple(_etag(key, generations, coding) for coding in dict.fromkeys((encoding, "identity")))
+            headers = {"Cache-Control": config.PUBLIC_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+            if last_modified is not None:
+                headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+            matched = _not_modified(request, etags, last_modified)
+            if matched is not None:
+                response_cache.count_not_modified()
+                headers["ETag"] = matched
+                return Response(status_code=304, headers=headers)
+
+            bodies = response_cache.get(key, resources)
+            if bodies is None:
+                async with AsyncReadSessionLocal() as db:
+                    result = await endpoint(*args, db=db, **kwargs)
+                with timed("serialize"):
+                    bodies = {"identity": encode(result)}
+                response_cache.set(key, generations, bodies)
+
+            if encoding == "identity" or len(bodies["identity"]) < config.COMPRESSION_MIN_SIZE:
+                headers["ETag"] = etags[-1]
+                return Response(content=bodies["identity"], media_type="application/json", headers=headers)
+            body = bodies.get(encoding)
+            if body is None:
+                # Off the event loop: a large page takes milliseconds to compress
+                with timed("compress"):
+                    body = bodies[encoding] = await run_in_threadpool(_compress, bodies["identity"], encoding)
+            headers["Content-Encoding"] = encoding
+            headers["ETag"] = etags[0]
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        wrapper.__signature__ = signature.replace(parameters=parameters)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,101 @@
+import os
+import secrets
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+def _int_env(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+# --- Database ---
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./blog.db")
+
+# SQLite pragmas applied to every connection
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = _int_env("SQLITE_BUSY_TIMEOUT_MS", 5000)
+SQLITE_MMAP_SIZE = _int_env("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)
+SQLITE_CACHE_SIZE = _int_env("SQLITE_CACHE_SIZE", -64 * 1024) # negative values are KiB
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+
+# Connection pools: many read-only connections for /api/user, one writer for /api/admin
+DB_READ_POOL_SIZE = _int_env("DB_READ_POOL_SIZE", 8)
+DB_READ_MAX_OVERFLOW = _int_env("DB_READ_MAX_OVERFLOW", 32)
+DB_WRITE_POOL_SIZE = _int_env("DB_WRITE_POOL_SIZE", 1)
+DB_POOL_TIMEOUT = _int_env("DB_POOL_TIMEOUT", 30)
+
+# --- Admin auth ---
+# HMAC key for admin tokens. Without it a random key is made per process, so
+# tokens stop working on restart and are not shared between workers
+ADMIN_TOKEN_SECRET = os.getenv("ADMIN_TOKEN_SECRET") or secrets.token_hex(32)
+# Lifetime of an admin token in seconds
+ADMIN_TOKEN_TTL = _int_env("ADMIN_TOKEN_TTL", 3600)
+# scrypt cost for stored passwords; hashes made with other settings are upgraded on login
+PASSWORD_SCRYPT_N = _int_env("PASSWORD_SCRYPT_N", 2 ** 14)
+PASSWORD_SCRYPT_R = _int_env("PASSWORD_SCRYPT_R", 8)
+PASSWORD_SCRYPT_P = _int_env("PASSWORD_SCRYPT_P", 1)
+
+# --- Caching ---
+# Max number of cached /api/user responses (0 disables the cache)
+RESPONSE_CACHE_SIZE = _int_env("RESPONSE_CACHE_SIZE", 1024)
+# How often (ms) cached responses re-read content_versions, to pick up writes committed
+# by other processes: the sync/import scripts and other workers (0 = on every request)
+CACHE_VERSION_CHECK_MS = _int_env("CACHE_VERSION_CHECK_MS", 1000)
+# Cache-Control sent with /api/user responses; clients revalidate with ETag / Last-Modified
+PUBLIC_CACHE_CONTROL = os.getenv("PUBLIC_CACHE_CONTROL", "public, max-age=0, must-revalidate")
+
+# --- Instrumentation ---
+# Server-Timing header (db, serialize, file, total) on every response
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "1") == "1"
+# INFO/WARNING log only slow requests and queries; DEBUG also logs one JSON line
+# per request, which costs a json.dumps and a write on every request
+TIMING_LOG_LEVEL = os.getenv("TIMING_LOG_LEVEL", "INFO").upper()
+SLOW_REQUEST_MS = _int_env("SLOW_REQUEST_MS", 500)
+# Statements slower than this are logged with their bound parameters
+SLOW_QUERY_MS = _int_env("SLOW_QUERY_MS", 100)
+# Prometheus text exposition at /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# --- Static export ---
+# Directory kept up to date with a static JSON export after every admin write (empty disables)
+EXPORT_DIR = os.getenv("EXPORT_DIR", "")
+EXPORT_PAGE_SIZE = _int_env("EXPORT_PAGE_SIZE", 100)
+# Admin writes this close together are exported in one run
+EXPORT_DEBOUNCE_MS = _int_env("EXPORT_DEBOUNCE_MS", 1000)
+# Used by the exported feed.json: item URLs are SITE_URL + the post's url
+SITE_URL = os.getenv("SITE_URL", "").rstrip("/")
+SITE_TITLE = os.getenv("SITE_TITLE", "NayukiBlog")
+
+# --- Article rendering ---
+# Rendered article HTML (/api/user/posts/{id}/content), keyed by a digest of the file:
+# entries kept in memory, and a disk cache evicted least recently used past RENDER_CACHE_DISK_MB
+RENDER_CACHE_SIZE = _int_env("RENDER_CACHE_SIZE", 256)
+RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", ".cache/render")
+RENDER_CACHE_DISK_MB = _int_env("RENDER_CACHE_DISK_MB", 256)
+# Newest public articles loaded into memory in the background at startup (0 disables)
+RENDER_WARMUP = _int_env("RENDER_WARMUP", 100)
+
+# --- Article import ---
+# Archive members larger than this are reported as failed instead of being read
+IMPORT_MAX_FILE_MB = _int_env("IMPORT_MAX_FILE_MB", 10)
+
+# --- Image uploads ---
+# Originals and WebP variants are stored here by content hash, and served at /uploads
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+# Prefix of the stored image URLs: the default path, or a CDN in front of UPLOAD_DIR
+UPLOAD_URL = os.getenv("UPLOAD_URL", "/uploads").rstrip("/")
+IMAGE_MAX_MB = _int_env("IMAGE_MAX_MB", 20)
+IMAGE_WEBP_QUALITY = _int_env("IMAGE_WEBP_QUALITY", 80)
+# Processes decoding and resizing uploads (0 = one per CPU)
+IMAGE_WORKERS = _int_env("IMAGE_WORKERS", 2)
+
+# --- Compression ---
+# Responses smaller than this many bytes are sent uncompressed
+COMPRESSION_MIN_SIZE = _int_env("COMPRESSION_MIN_SIZE", 1024)
+# Levels for cached /api/user bodies, which are compressed once per content version
+GZIP_LEVEL = _int_env("GZIP_LEVEL", 9)
+BROTLI_QUALITY = _int_env("BROTLI_QUALITY", 9)
+# Level for other responses, compressed per request by GZipMiddleware
+GZIP_MIDDLEWARE_LEVEL = _int_env("GZIP_MIDDLEWARE_LEVEL", 6)
@@ -1,14 +1,92 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from app.core import config
+from app.core.timing import install_query_timing
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./blog.db"
+SQLALCHEMY_DATABASE_URL = config.DATABASE_URL
+# Same database through the aiosqlite driver, for the async read path
+ASYNC_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+def _set_sqlite_pragmas(dbapi_connection, read_only: bool):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={config.SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA temp_store={config.SQLITE_TEMP_STORE}")
+    if read_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+def _install_sqlite_pragmas(db_engine, read_only: bool):
+    @event.listens_for(db_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        _set_sqlite_pragmas(dbapi_connection, read_only)
+
+def create_db_engine(url: str, pool_size: int, max_overflow: int, read_only: bool = False):
+    """
+    Creates an engine whose SQLite connections are tuned by the SQLITE_* settings.
+    Read-only engines additionally refuse writes on every connection.
+    """
+    is_sqlite = url.startswith("sqlite")
+    db_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if is_sqlite else {},
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+    )
+    if is_sqlite:
+        _install_sqlite_pragmas(db_engine, read_only)
+    install_query_timing(db_engine)
+    return db_engine
+
+def create_async_db_engine(url: str, pool_size: int, max_overflow: int, read_only: bool = False):
+    """
+    Async counterpart of create_db_engine, with the same pragmas on every connection.
+    """
+    is_sqlite = url.startswith("sqlite")
+    db_engine = create_async_engine(
+        url,
+        connect_args={"check_same_thread": False} if is_sqlite else {},
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+    )
+    if is_sqlite:
+        _install_sqlite_pragmas(db_engine.sync_engine, read_only)
+    install_query_timing(db_engine.sync_engine)
+    return db_engine
+
+# Single-writer pool: admin routes, migrations and scripts
+engine = create_db_engine(
+    SQLALCHEMY_DATABASE_URL,
+    pool_size=config.DB_WRITE_POOL_SIZE,
+    max_overflow=0,
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read-only pool: public routes, so readers never queue behind the writer
+read_engine = create_db_engine(
+    SQLALCHEMY_DATABASE_URL,
+    pool_size=config.DB_READ_POOL_SIZE,
+    max_overflow=config.DB_READ_MAX_OVERFLOW,
+    read_only=True,
+)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Async read-only pool: the public router, so requests don't hold threadpool workers
+async_read_engine = create_async_db_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=config.DB_READ_POOL_SIZE,
+    max_overflow=config.DB_READ_MAX_OVERFLOW,
+    read_only=True,
+)
+AsyncReadSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=async_read_engine)
+
 Base = declarative_base()
 
 def get_db():
@@ -17,3 +95,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,182 @@
+"""
+Prometheus metrics, served at /metrics in the text exposition format.
+
+Counters and histograms are plain ints and lists that are only updated
+from the event loop thread (MetricsMiddleware and async endpoints), so
+recording a request takes no lock and allocates nothing once its series
+exists. Connection pool and cache gauges are read when /metrics is scraped.
+Values are per process: with several workers, each is scraped on its own.
+"""
+import time
+from bisect import bisect_left
+
+from app.core.cache import response_cache
+from app.core.database import engine, read_engine, async_read_engine
+
+# Upper bounds in seconds / bytes; an implicit +Inf bucket follows
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        # Per-bucket counts; made cumulative only when rendered
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def render(self, name: str, labels: str, lines: list):
+        prefix = f"{labels}," if labels else ""
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {total}')
+        total += self.counts[-1]
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {total}')
+        braces = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{braces} {self.sum}")
+        lines.append(f"{name}_count{braces} {total}")
+
+class Metrics:
+    def __init__(self):
+        self.in_flight = 0
+        # (method, route template, status) -> latency Histogram
+        self.requests = {}
+        self.upload_bytes = Histogram(SIZE_BUCKETS)
+        self.upload_seconds = Histogram(LATENCY_BUCKETS)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        key = (method, route, status)
+        histogram = self.requests.get(key)
+        if histogram is None:
+            histogram = self.requests[key] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+
+    def observe_upload(self, size: int, seconds: float):
+        self.upload_bytes.observe(size)
+        self.upload_seconds.observe(seconds)
+
+metrics = Metrics()
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _pool_stats(db_engine) -> dict:
+    pool = db_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        # overflow() counts down from -size while the pool is not full
+        "overflow": max(pool.overflow(), 0),
+    }
+
+def render() -> str:
+    """
+    Must run on the event loop, like the updates it reads.
+    """
+    lines = []
+
+    def header(name: str, kind: str, description: str):
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    requests = sorted(metrics.requests.items())
+
+    header("nayukiblog_http_requests_total", "counter", "HTTP requests by method, route template and status.")
+    for (method, route, status), histogram in requests:
+        lines.append(f'nayukiblog_http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {histogram.count}')
+
+    header("nayukiblog_http_request_duration_seconds", "histogram", "HTTP request latency by method, route template and status.")
+    for (method, route, status), histogram in requests:
+        labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+        histogram.render("nayukiblog_http_request_duration_seconds", labels, lines)
+
+    header("nayukiblog_http_requests_in_flight", "gauge", "HTTP requests currently being served.")
+    lines.append(f"nayukiblog_http_requests_in_flight {metrics.in_flight}")
+
+    pools = {"write": engine, "read": read_engine, "async_read": async_read_engine.sync_engine}
+    stats = {name: _pool_stats(db_engine) for name, db_engine in pools.items()}
+    for field, description in (
+        ("size", "Configured connections kept by the pool."),
+        ("checked_out", "Connections currently checked out of the pool."),
+        ("overflow", "Connections opened beyond the pool size."),
+    ):
+        name = f"nayukiblog_db_pool_{field}"
+        header(name, "gauge", description)
+        for pool_name, values in stats.items():
+            lines.append(f'{name}{{pool="{pool_name}"}} {values[field]}')
+
+    cache = response_cache.stats()
+    for field, kind, description in (
+        ("hits", "counter", "Response cache lookups served from the cache."),
+        ("misses", "counter", "Response cache lookups that had to query the database."),
+        ("not_modified", "counter", "Conditional requests answered with 304."),
+        ("entries", "gauge", "Entries in the response cache."),
+        ("hit_ratio", "gauge", "Response cache hits / lookups since startup."),
+    ):
+        name = f"nayukiblog_response_cache_{field}" + ("_total" if kind == "counter" else "")
+        header(name, kind, description)
+        lines.append(f"{name} {cache[field]}")
+
+    header("nayukiblog_article_upload_bytes", "histogram", "Size of files uploaded to /api/admin/articles/upload.")
+    metrics.upload_bytes.render("nayukiblog_article_upload_bytes", "", lines)
+    header("nayukiblog_article_upload_duration_seconds", "histogram", "Time to store an uploaded article, file and row.")
+    metrics.upload_seconds.render("nayukiblog_article_upload_duration_seconds", "", lines)
+
+    lines.append("")
+    return "\n".join(lines)
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return "unmatched"
+    # Routes of an included router may carry only their own path, without the
+    # include prefix: find where that path starts and keep the prefix as sent
+    path = scope["path"]
+    start = 0
+    while start != -1:
+        if route.path_regex.match(path[start:]):
+            return path[:start] + path_format
+        start = path.find("/", start + 1)
+    return path_format
+
+class MetricsMiddleware:
+    """
+    Counts HTTP requests and their latency per route template, so
+    /api/admin/articles/{post_id} is one series however many ids are hit.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.in_flight -= 1
+            # The router stores the matched route in the scope
+            metrics.observe_request(scope["method"], _route_template(scope), status, time.perf_counter() - start)
@@ -0,0 +1,134 @@
+import json
+from datetime import datetime, timezone
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+# Migrations are applied in order and recorded in schema_version.
+# Each step must be idempotent: a fresh database already gets the current
+# schema from Base.metadata.create_all, and the steps then run on top of it.
+
+def _add_content_indexes(conn: Connection):
+    statements = [
+        "CREATE INDEX IF NOT EXISTS ix_posts_status_date_id ON posts (status, date, id)",
+        "CREATE INDEX IF NOT EXISTS ix_posts_folder_status_date ON posts (folder, status, date)",
+        "CREATE INDEX IF NOT EXISTS ix_posts_date_id ON posts (date, id)",
+        "CREATE INDEX IF NOT EXISTS ix_gallery_status_date_id ON gallery (status, date, id)",
+        "CREATE INDEX IF NOT EXISTS ix_gallery_date_id ON gallery (date, id)",
+        "CREATE INDEX IF NOT EXISTS ix_diaries_date_id ON diaries (date, id)",
+        "CREATE INDEX IF NOT EXISTS ix_todos_status_id ON todos (status, id)",
+        "CREATE INDEX IF NOT EXISTS ix_tools_status_category ON tools (status, category)",
+        "CREATE INDEX IF NOT EXISTS ix_books_status ON books (status)",
+        "CREATE INDEX IF NOT EXISTS ix_projects_visibility ON projects (visibility)",
+    ]
+    for statement in statements:
+        conn.execute(text(statement))
+
+def _backfill_tag_index_and_facets(conn: Connection):
+    from app.crud import blog as crud
+
+    db = Session(bind=conn)
+    crud.rebuild_content_tags(db)
+    crud.rebuild_facet_counts(db)
+    db.close()
+
+def _create_search_index(conn: Connection):
+    from app.crud import blog as crud
+
+    # Trigram tokens make substring search work for CJK text, which has no word separators.
+    # rowid = item_id * 4 + resource code (see crud.SEARCH_RESOURCES).
+    conn.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "title, summary, body, tags, resource UNINDEXED, status UNINDEXED, date UNINDEXED, "
+        "tokenize = 'trigram')"
+    ))
+    # Default ranking: bm25 weighted title > tags > summary > body
+    conn.execute(text("INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(10.0, 4.0, 1.0, 5.0)')"))
+    db = Session(bind=conn)
+    crud.rebuild_search_index(db)
+    db.close()
+
+def _add_diary_year_month(conn: Connection):
+    columns = {row[1] for row in conn.execute(text("PRAGMA table_xinfo(diaries)"))}
+    # VIRTUAL generated columns can be added in place; existing rows need no rewrite
+    if "year" not in columns:
+        conn.execute(text(
+            "ALTER TABLE diaries ADD COLUMN year INTEGER "
+            "GENERATED ALWAYS AS (CAST(substr(date, 1, 4) AS INTEGER)) VIRTUAL"
+        ))
+    if "month" not in columns:
+        conn.execute(text(
+            "ALTER TABLE diaries ADD COLUMN month INTEGER "
+            "GENERATED ALWAYS AS (CAST(substr(date, 6, 2) AS INTEGER)) VIRTUAL"
+        ))
+    statements = [
+        "CREATE INDEX IF NOT EXISTS ix_diaries_year_date ON diaries (year, date, id)",
+        "CREATE INDEX IF NOT EXISTS ix_diaries_month_date ON diaries (month, date, id)",
+        "CREATE INDEX IF NOT EXISTS ix_diaries_archive ON diaries (year, month, mood, weather)",
+    ]
+    for statement in statements:
+        conn.execute(text(statement))
+
+def _add_post_url_index(conn: Connection):
+    # Article imports and the file sync match posts by url
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_posts_url ON posts (url)"))
+
+def _add_gallery_image_columns(conn: Connection):
+    columns = {row[1] for row in conn.execute(text("PRAGMA table_info(gallery)"))}
+    for name, type_ in (("width", "INTEGER"), ("height", "INTEGER"), ("placeholder", "TEXT"), ("variants", "TEXT")):
+        if name not in columns:
+            conn.execute(text(f"ALTER TABLE gallery ADD COLUMN {name} {type_}"))
+
+def _add_gallery_variant_widths(conn: Connection):
+    from app.services.image_service import variant_widths
+
+    # Sizes of images processed before their variant widths were recorded
+    columns = {row[1] for row in conn.execute(text("PRAGMA table_info(gallery)"))}
+    if "variant_widths" not in columns:
+        conn.execute(text("ALTER TABLE gallery ADD COLUMN variant_widths TEXT"))
+    rows = conn.execute(text(
+        "SELECT id, width, height FROM gallery "
+        "WHERE variants IS NOT NULL AND variant_widths IS NULL AND width > 0 AND height > 0"
+    )).all()
+    if rows:
+        conn.execute(
+            text("UPDATE gallery SET variant_widths = :widths WHERE id = :id"),
+            [{"id": row.id, "widths": json.dumps(variant_widths(row.width, row.height))} for row in rows]
+        )
+
+MIGRATIONS = [
+    (1, "composite indexes for content queries", _add_content_indexes),
+    (2, "backfill content_tags and facet_counts", _backfill_tag_index_and_facets),
+    (3, "fts5 search index over posts, diaries and projects", _create_search_index),
+    (4, "generated year/month columns and archive indexes for diaries", _add_diary_year_month),
+    (5, "posts url index for article imports and file sync", _add_post_url_index),
+    (6, "gallery image size, placeholder and variant columns", _add_gallery_image_columns),
+    (7, "gallery variant widths for srcset", _add_gallery_variant_widths),
+]
+
+def get_schema_version(conn: Connection) -> int:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, description TEXT, applied_at TEXT)"
+    ))
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar()
+
+def run_migrations(engine: Engine) -> list[int]:
+    """
+    Applies every pending migration, each in its own transaction.
+    Returns the versions that were applied.
+    """
+    applied = []
+    with engine.begin() as conn:
+        current = get_schema_version(conn)
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        with engine.begin() as conn:
+            step(conn)
+            conn.execute(
+                text("INSERT OR IGNORE INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {"v": version, "d": description, "t": datetime.now(timezone.utc).isoformat()}
+            )
+        applied.append(version)
+    return applied
@@ -0,0 +1,60 @@
+"""
+Fast JSON encoding of trusted ORM rows.
+
+Rows read from our own database already have the shape of their response
+schema (list columns are decoded by JSONList on load), so instead of
+validating every row with pydantic they are emitted as dicts holding the
+schema's fields and encoded with orjson. The schemas' mode="before" field
+validators (e.g. PostBase.normalize_status) still run on those fields.
+"""
+import typing
+import orjson
+from pydantic import BaseModel
+
+def _before_validators(schema) -> dict:
+    # {field name: [validator, ...]} for the schema's mode="before" field validators, in pydantic's order
+    validators = {}
+    for decorator in reversed(list(schema.__pydantic_decorators__.field_validators.values())):
+        if decorator.info.mode == "before":
+            for name in decorator.info.fields:
+                validators.setdefault(name, []).append(getattr(schema, decorator.cls_var_name))
+    return validators
+
+def _row_schemas(tp, found: dict):
+    # Collects {class name: (field names, before validators)} for every from_attributes schema reachable from tp
+    if isinstance(tp, type) and issubclass(tp, BaseModel):
+        if tp.__name__ in found:
+            return
+        if tp.model_config.get("from_attributes"):
+            found[tp.__name__] = (tuple(tp.model_fields), _before_validators(tp))
+        for field in tp.model_fields.values():
+            _row_schemas(field.annotation, found)
+        return
+    for arg in typing.get_args(tp):
+        _row_schemas(arg, found)
+
+def row_encoder(response_model: typing.Any = typing.Any):
+    """
+    Returns a function that encodes an endpoint result to JSON bytes.
+    ORM rows are written with the fields of the same-named schema in
+    `response_model` (e.g. models.Post -> schemas.Post), without validation
+    beyond the schema's mode="before" field validators.
+    """
+    fields = {}
+    _row_schemas(response_model, fields)
+
+    def default(obj):
+        schema = fields.get(type(obj).__name__)
+        if schema is None:
+            raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+        names, validators = schema
+        row = {name: getattr(obj, name) for name in names}
+        for name, funcs in validators.items():
+            for func in funcs:
+                row[name] = func(row[name])
+        return row
+
+    def encode(result) -> bytes:
+        return orjson.dumps(result, default=default)
+
+    return encode
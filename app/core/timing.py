@@ -0,0 +1,206 @@
+"""
+Per-request performance instrumentation.
+
+ServerTimingMiddleware opens a RequestTimings for every request, kept in a
+context variable, so SQLAlchemy cursor hooks (install_query_timing), the
+timed route class and `timed()` blocks can add to it from the event loop,
+the threadpool and the async DB greenlets alike. The totals are sent as a
+Server-Timing header; slow requests are logged as JSON, and at DEBUG level
+every request is.
+"""
+import functools
+import inspect
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+from app.core import config
+
+logger = logging.getLogger("nayukiblog.timing")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.propagate = False
+logger.setLevel(config.TIMING_LOG_LEVEL)
+
+# Statements kept per request for the slow-request log
+MAX_RECORDED_QUERIES = 200
+
+class RequestTimings:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_queries = 0
+        self.durations = {"db": 0.0, "serialize": 0.0, "file": 0.0}
+        self.queries = []
+        # Set by TimedRoute when the endpoint function returns
+        self.endpoint_done = None
+
+    def add(self, name: str, seconds: float):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def add_query(self, seconds: float, statement: str, parameters):
+        self.db_queries += 1
+        self.durations["db"] += seconds
+        if len(self.queries) < MAX_RECORDED_QUERIES:
+            self.queries.append((seconds, statement, parameters))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def server_timing(self, total: float) -> str:
+        parts = [f'db;dur={self.durations["db"] * 1000:.2f};desc="{self.db_queries} queries"']
+        parts += [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.durations.items() if name != "db" and seconds]
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+_current: ContextVar = ContextVar("request_timings", default=None)
+
+@contextmanager
+def timed(name: str):
+    """
+    Adds the duration of the block to the current request's `name` bucket;
+    a no-op outside a request.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+def _format_parameters(parameters) -> str:
+    text = repr(parameters)
+    return text if len(text) <= 500 else text[:500] + "..."
+
+def install_query_timing(db_engine):
+    """
+    Times every statement on a sync engine (for async engines, pass
+    `engine.sync_engine`), adds it to the current request and logs
+    statements slower than SLOW_QUERY_MS with their parameters.
+    """
+    @event.listens_for(db_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(db_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        timings = _current.get()
+        if timings is not None:
+            timings.add_query(seconds, statement, parameters)
+        if seconds * 1000 >= config.SLOW_QUERY_MS:
+            logger.warning(json.dumps({
+                "event": "slow_query",
+                "duration_ms": round(seconds * 1000, 2),
+                "statement": statement,
+                "parameters": _format_parameters(parameters),
+            }, ensure_ascii=False))
+
+class TimedRoute(APIRoute):
+    """
+    Route class that splits handler time into the endpoint itself and what
+    follows it (response_model validation, JSON rendering), which is
+    recorded as "serialize".
+    """
+    def __init__(self, path, endpoint, **kwargs):
+        if inspect.iscoroutinefunction(endpoint):
+            @functools.wraps(endpoint)
+            async def timed_endpoint(*args, **kw):
+                try:
+                    return await endpoint(*args, **kw)
+                finally:
+                    _mark_endpoint_done()
+        else:
+            @functools.wraps(endpoint)
+            def timed_endpoint(*args, **kw):
+                try:
+                    return endpoint(*args, **kw)
+                finally:
+                    _mark_endpoint_done()
+        super().__init__(path, timed_endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timings = _current.get()
+            if timings is not None and timings.endpoint_done is not None:
+                timings.add("serialize", time.perf_counter() - timings.endpoint_done)
+            return response
+
+        return timed_handler
+
+def _mark_endpoint_done():
+    timings = _current.get()
+    if timings is not None:
+        timings.endpoint_done = time.perf_counter()
+
+class ServerTimingMiddleware:
+    """
+    Adds a Server-Timing header (db, serialize, file, total) to every HTTP
+    response. Requests slower than SLOW_REQUEST_MS are logged at warning level
+    with their slowest statements; the others at debug level.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status = None
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if config.SERVER_TIMING_HEADER:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timings.server_timing(timings.elapsed()).encode("latin-1")))
+                    # Lets cross-origin pages (the Astro frontend) read the timings
+                    headers.append((b"timing-allow-origin", b"*"))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._log(scope, status, timings)
+
+    def _log(self, scope, status, timings: RequestTimings):
+        total = timings.elapsed()
+        slow = total * 1000 >= config.SLOW_REQUEST_MS
+        if not slow and not logger.isEnabledFor(logging.DEBUG):
+            return
+        record = {
+            "event": "slow_request" if slow else "request",
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status": status,
+            "total_ms": round(total * 1000, 2),
+            "db_queries": timings.db_queries,
+            **{f"{name}_ms": round(seconds * 1000, 2) for name, seconds in timings.durations.items()},
+        }
+        if slow:
+            slowest = sorted(timings.queries, key=lambda q: q[0], reverse=True)[:5]
+            record["slowest_queries"] = [
+                {"duration_ms": round(seconds * 1000, 2), "statement": statement, "parameters": _format_parameters(parameters)}
+                for seconds, statement, parameters in slowest
+            ]
+            logger.warning(json.dumps(record, ensure_ascii=False))
+        else:
+            logger.debug(json.dumps(record, ensure_ascii=False))
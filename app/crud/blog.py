@@ -1,15 +1,566 @@
+import json
+import re
+from collections import Counter
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, and_, false, select, intersect, insert, update, delete, func, tuple_, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.models import blog as models
+from app.core.cache import response_cache
+from app.utils.tag_utils import parse_tag_list
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.services.article_service import read_article_body
 
-def get_books(db: Session, skip: int = 0, limit: int = 100, status: str = None, tags: list[str] = None):
+# --- Content versions ---
+def _bump_version(db: Session, resource: str):
+    stmt = sqlite_insert(models.ContentVersion).values(
+        resource=resource, version=1, updated_at=datetime.now(timezone.utc).isoformat()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["resource"],
+        set_={"version": models.ContentVersion.version + 1, "updated_at": stmt.excluded.updated_at}
+    ).returning(models.ContentVersion.version, models.ContentVersion.updated_at)
+    return db.execute(stmt).one()
+
+def _journal(db: Session, resource: str, action: str, ids):
+    # One change_journal row per affected item, in the caller's transaction
+    if ids:
+        changed_at = datetime.now(timezone.utc).isoformat()
+        db.execute(insert(models.ChangeJournal), [
+            {"resource": resource, "item_id": item_id, "action": action, "changed_at": changed_at} for item_id in ids
+        ])
+
+def _commit(db: Session, resource: str, action: str, ids):
+    # Journal the changed ids and bump the resource's content version inside
+    # the write transaction, then publish the version once the write is visible.
+    _journal(db, resource, action, ids)
+    version, updated_at = _bump_version(db, resource)
+    db.commit()
+    response_cache.set_version(resource, version, updated_at)
+
+def get_content_versions(db: Session):
+    return db.query(models.ContentVersion).all()
+
+# --- Change journal ---
+def get_journal_head(db: Session) -> int:
+    # Id of the newest journal entry. Once every entry is trimmed, the last id
+    # handed out: AUTOINCREMENT keeps it in sqlite_sequence. 0 before the first write
+    head = db.query(func.max(models.ChangeJournal.id)).scalar()
+    if head is None:
+        head = db.execute(text("SELECT seq FROM sqlite_sequence WHERE name = 'change_journal'")).scalar()
+    return head or 0
+
+def get_journal_tail(db: Session) -> int:
+    # Id of the oldest entry still kept, 0 when empty
+    return db.query(func.min(models.ChangeJournal.id)).scalar() or 0
+
+def get_changes_since(db: Session, after_id: int, up_to_id: int) -> dict:
+    """
+    Returns {resource: set of changed item ids} for journal entries in (after_id, up_to_id].
+    """
+    changes = {}
+    rows = db.query(models.ChangeJournal.resource, models.ChangeJournal.item_id).filter(
+        models.ChangeJournal.id > after_id, models.ChangeJournal.id <= up_to_id
+    )
+    for resource, item_id in rows:
+        changes.setdefault(resource, set()).add(item_id)
+    return changes
+
+def trim_change_journal(db: Session, up_to_id: int) -> int:
+    # Drops entries every consumer has already read
+    removed = db.query(models.ChangeJournal).filter(models.ChangeJournal.id <= up_to_id).delete(synchronize_session=False)
+    db.commit()
+    return removed
+
+# --- Article files ---
+def get_article_files(db: Session) -> dict:
+    # {path: (mtime_ns, size, digest)}
+    rows = db.execute(select(
+        models.ArticleFile.path, models.ArticleFile.mtime_ns, models.ArticleFile.size, models.ArticleFile.digest
+    ))
+    return {path: (mtime_ns, size, digest) for path, mtime_ns, size, digest in rows}
+
+def put_article_files(db: Session, entries: list[dict]):
+    # Not committed here: lands with the posts written in the same transaction
+    if entries:
+        statement = sqlite_insert(models.ArticleFile)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[models.ArticleFile.path],
+            set_={"mtime_ns": statement.excluded.mtime_ns, "size": statement.excluded.size, "digest": statement.excluded.digest},
+        ), entries)
+
+def drop_article_files(db: Session, paths: list[str]):
+    # Not committed here, like put_article_files
+    if paths:
+        db.query(models.ArticleFile).filter(models.ArticleFile.path.in_(paths)).delete(synchronize_session=False)
+
+# --- Tag index ---
+# Tagged resources: content_tags.resource -> (model, JSON tag column)
+TAGGED_RESOURCES = {
+    "books": (models.Book, "tags"),
+    "gallery": (models.Gallery, "tags"),
+    "posts": (models.Post, "tags"),
+    "projects": (models.Project, "techStack"),
+}
+
+def _sync_tags(db: Session, resource: str, item_id: int, tags):
+    _sync_tags_many(db, resource, [(item_id, tags)])
+
+def _sync_tags_many(db: Session, resource: str, items: list):
+    # items: [(item_id, JSON tags or None), ...]
+    db.query(models.ContentTag).filter(
+        models.ContentTag.resource == resource,
+        models.ContentTag.item_id.in_([item_id for item_id, _ in items])
+    ).delete(synchronize_session=False)
+    rows = [
+        {"resource": resource, "tag": tag, "item_id": item_id}
+        for item_id, tags in items
+        for tag in set(parse_tag_list(tags))
+    ]
+    if rows:
+        db.execute(insert(models.ContentTag), rows)
+
+def _filter_by_tags(query, model, resource: str, tags: list[str]):
+    # AND semantics: ids carrying every requested tag, one indexed lookup per tag
+    selects = [
+        select(models.ContentTag.item_id).where(
+            models.ContentTag.resource == resource,
+            models.ContentTag.tag == tag
+        )
+        for tag in dict.fromkeys(tags)
+    ]
+    ids = selects[0] if len(selects) == 1 else intersect(*selects)
+    return query.filter(model.id.in_(ids))
+
+def rebuild_content_tags(db: Session):
+    """
+    Rebuilds the tag index from the JSON tag columns of every tagged resource.
+    """
+    db.query(models.ContentTag).delete(synchronize_session=False)
+    for resource, (model, field_name) in TAGGED_RESOURCES.items():
+        column = getattr(model, field_name)
+        rows = [
+            {"resource": resource, "tag": tag, "item_id": item_id}
+            for item_id, tags in db.query(model.id, column).filter(column.isnot(None))
+            for tag in set(parse_tag_list(tags))
+        ]
+        if rows:
+            db.execute(insert(models.ContentTag), rows)
+    db.commit()
+
+# --- Facet counts ---
+# Faceted resources: resource -> (model, status column, {facet column: is JSON list})
+FACETED_RESOURCES = {
+    "books": (models.Book, "status", {"tags": True}),
+    "gallery": (models.Gallery, "status", {"tags": True}),
+    "posts": (models.Post, "status", {"tags": True, "folder": False}),
+    "projects": (models.Project, "visibility", {"techStack": True}),
+    "todos": (models.Todo, "status", {"type": False}),
+    "tools": (models.Tool, "status", {"category": False}),
+}
+
+def _facet_entries(resource: str, obj) -> Counter:
+    entries = Counter()
+    if obj is None:
+        return entries
+    _, status_field, facets = FACETED_RESOURCES[resource]
+    status = getattr(obj, status_field) or ""
+    for facet, is_list in facets.items():
+        value = getattr(obj, facet)
+        values = set(parse_tag_list(value)) if is_list else ([value] if value else [])
+        for v in values:
+            entries[(facet, status, v)] += 1
+    return entries
+
+def _update_facets(db: Session, resource: str, before: Counter, obj):
+    """
+    Applies the difference between a row's facet entries before and after a write.
+    Pass before=None for inserts and obj=None for deletes.
+    """
+    delta = _facet_entries(resource, obj)
+    delta.subtract(before or Counter())
+    _apply_facet_delta(db, resource, delta)
+
+def _apply_facet_delta(db: Session, resource: str, delta: Counter):
+    changed = False
+    for (facet, status, value), diff in delta.items():
+        if diff == 0:
+            continue
+        changed = True
+        stmt = sqlite_insert(models.FacetCount).values(
+            resource=resource, facet=facet, status=status, value=value, count=diff
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["resource", "facet", "status", "value"],
+            set_={"count": models.FacetCount.count + diff}
+        ))
+    if changed:
+        db.query(models.FacetCount).filter(
+            models.FacetCount.resource == resource,
+            models.FacetCount.count <= 0
+        ).delete(synchronize_session=False)
+
+def get_facet_counts(db: Session, resource: str, facet: str, status: str = None):
+    """
+    Returns (value, count) pairs for one facet, sorted by value.
+    Without a status, counts are summed over every status.
+    """
+    query = db.query(models.FacetCount.value, func.sum(models.FacetCount.count)).filter(
+        models.FacetCount.resource == resource,
+        models.FacetCount.facet == facet
+    )
+    if status:
+        query = query.filter(models.FacetCount.status == status)
+    return query.group_by(models.FacetCount.value).order_by(models.FacetCount.value).all()
+
+def rebuild_facet_counts(db: Session):
+    """
+    Recomputes every facet count from the content tables.
+    """
+    db.query(models.FacetCount).delete(synchronize_session=False)
+    for resource, (model, status_field, facets) in FACETED_RESOURCES.items():
+        entries = Counter()
+        columns = [getattr(model, status_field)] + [getattr(model, facet) for facet in facets]
+        for row in db.query(*columns):
+            entries.update(_facet_entries(resource, row))
+        rows = [
+            {"resource": resource, "facet": facet, "status": status, "value": value, "count": count}
+            for (facet, status, value), count in entries.items()
+        ]
+        if rows:
+            db.execute(insert(models.FacetCount), rows)
+    db.commit()
+
+# --- Full-text search ---
+# Searchable resources: resource -> rowid code. A document's search_index rowid is
+# item_id * 4 + code, so replacing or removing it never needs a lookup.
+SEARCH_RESOURCES = {"posts": 1, "diaries": 2, "projects": 3}
+# Status the public search requires per resource, matching the user listings (None: any)
+PUBLIC_SEARCH_STATUS = {"posts": "public", "diaries": None, "projects": "published"}
+# The trigram tokenizer cannot use its index for terms shorter than this
+SEARCH_MIN_TERM_LENGTH = 3
+# Columns a search document is built from. Rebuilds select only these, so migrations
+# can run them before later migrations add other columns (e.g. diaries.year).
+SEARCH_COLUMNS = {
+    "posts": (models.Post, ("id", "title", "desc", "url", "tags", "status", "date")),
+    "diaries": (models.Diary, ("id", "date", "mood", "weather", "content")),
+    "projects": (models.Project, ("id", "name", "description", "techStack", "visibility")),
+}
+
+def _search_document(resource: str, obj, body: str = None) -> dict:
+    if resource == "posts":
+        return {
+            "title": obj.title, "summary": obj.desc or "",
+            "body": body if body is not None else read_article_body(obj.url),
+            "tags": " ".join(parse_tag_list(obj.tags)), "status": obj.status or "", "date": obj.date,
+        }
+    if resource == "diaries":
+        return {
+            "title": obj.date, "summary": " ".join(filter(None, [obj.mood, obj.weather])), "body": obj.content or "",
+            "tags": "", "status": "", "date": obj.date,
+        }
+    return {
+        "title": obj.name, "summary": obj.description or "", "body": "",
+        "tags": " ".join(parse_tag_list(obj.techStack)), "status": obj.visibility or "", "date": None,
+    }
+
+def _sync_search(db: Session, resource: str, item_id: int, obj, body: str = None):
+    """
+    Replaces a row's search document. Pass obj=None for deletes.
+    Posts read their article body from disk unless it is passed in.
+    """
+    _sync_search_many(db, resource, [(item_id, obj)], {obj.url: body} if body is not None else None)
+
+def _sync_search_many(db: Session, resource: str, items: list, bodies: dict = None):
+    # items: [(item_id, obj or None), ...]; bodies: {post url: article body} read before the write began
+    code = SEARCH_RESOURCES[resource]
+    db.execute(
+        text("DELETE FROM search_index WHERE rowid = :rowid"),
+        [{"rowid": item_id * 4 + code} for item_id, _ in items]
+    )
+    rows = [
+        {
+            "rowid": item_id * 4 + code, "resource": resource,
+            **_search_document(resource, obj, (bodies or {}).get(getattr(obj, "url", None))),
+        }
+        for item_id, obj in items
+        if obj is not None
+    ]
+    if rows:
+        db.execute(
+            text(
+                "INSERT INTO search_index (rowid, resource, title, summary, body, tags, status, date) "
+                "VALUES (:rowid, :resource, :title, :summary, :body, :tags, :status, :date)"
+            ),
+            rows
+        )
+
+def rebuild_search_index(db: Session):
+    """
+    Rebuilds the full-text index from posts (including their markdown files), diaries and projects.
+    """
+    db.execute(text("DELETE FROM search_index"))
+    for resource, (model, fields) in SEARCH_COLUMNS.items():
+        for row in db.query(*[getattr(model, name) for name in fields]).yield_per(500):
+            _sync_search(db, resource, row.id, row)
+    db.execute(text("INSERT INTO search_index (search_index) VALUES ('optimize')"))
+    db.commit()
+
+def _fallback_snippet(row, terms: list[str], width: int = 40) -> str:
+    # Highlights terms that were matched with LIKE instead of the FTS index
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+    for value in (row.body, row.summary, row.title, row.tags):
+        match = pattern.search(value or "")
+        if match:
+            start, end = max(match.start() - width, 0), match.end() + width
+            excerpt = pattern.sub(lambda m: f"<mark>{m.group(0)}</mark>", value[start:end])
+            return ("…" if start > 0 else "") + excerpt + ("…" if end < len(value) else "")
+    return ""
+
+def search(db: Session, q: str, skip: int = 0, limit: int = 20, types: list[str] = None, include_hidden: bool = False):
+    """
+    Searches posts, diaries and projects; every whitespace-separated term must match.
+    Returns (total, rows) ranked by bm25, each row carrying a highlighted snippet.
+    Terms shorter than SEARCH_MIN_TERM_LENGTH are matched with LIKE on top of the
+    index query; if every term is that short, the index is scanned and rows are ordered by date.
+    """
+    terms = list(dict.fromkeys(t for t in q.replace('"', " ").split() if t))
+    if not terms:
+        return 0, []
+    long_terms = [t for t in terms if len(t) >= SEARCH_MIN_TERM_LENGTH]
+    short_terms = [t for t in terms if len(t) < SEARCH_MIN_TERM_LENGTH]
+
+    conditions, params = [], {}
+    if long_terms:
+        conditions.append("search_index MATCH :match")
+        params["match"] = " AND ".join(f'"{t}"' for t in long_terms)
+    for i, term in enumerate(short_terms):
+        # Concatenating the columns keeps FTS5 from turning this into a (short, empty) trigram lookup
+        conditions.append(f"(title || ' ' || summary || ' ' || body || ' ' || tags) LIKE :like{i} ESCAPE '\\'")
+        params[f"like{i}"] = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    if types:
+        codes = [SEARCH_RESOURCES[t] for t in types if t in SEARCH_RESOURCES]
+        if not codes:
+            return 0, []
+        conditions.append(f"rowid % 4 IN ({', '.join(map(str, codes))})")
+    if not include_hidden:
+        visible = [
+            f"rowid % 4 = {SEARCH_RESOURCES[resource]}" + (f" AND status = '{status}'" if status else "")
+            for resource, status in PUBLIC_SEARCH_STATUS.items()
+        ]
+        conditions.append("(" + " OR ".join(f"({v})" for v in visible) + ")")
+    where = " AND ".join(conditions)
+
+    total = db.execute(text(f"SELECT count(*) FROM search_index WHERE {where}"), params).scalar()
+    if long_terms:
+        columns = "rank AS score, snippet(search_index, -1, '<mark>', '</mark>', '…', 64) AS snippet"
+        order = "rank"
+    else:
+        columns = "NULL AS score, NULL AS snippet"
+        order = "date DESC, rowid DESC"
+    rows = db.execute(
+        text(
+            f"SELECT rowid, resource, title, summary, body, tags, status, date, {columns} "
+            f"FROM search_index WHERE {where} ORDER BY {order} LIMIT :limit OFFSET :skip"
+        ),
+        {**params, "limit": limit, "skip": skip}
+    ).all()
+    results = [
+        {
+            "type": row.resource,
+            "id": row.rowid // 4,
+            "title": row.title,
+            "date": row.date,
+            "status": row.status or None,
+            "snippet": row.snippet if row.snippet is not None else _fallback_snippet(row, short_terms),
+            "score": -row.score if row.score is not None else None,
+        }
+        for row in rows
+    ]
+    return total, results
+
+# --- Batch mutations ---
+# Every admin-managed content resource
+CONTENT_MODELS = {
+    "books": models.Book,
+    "diaries": models.Diary,
+    "gallery": models.Gallery,
+    "posts": models.Post,
+    "projects": models.Project,
+    "todos": models.Todo,
+    "tools": models.Tool,
+}
+
+def _facet_snapshot(db: Session, resource: str, ids: list[int]) -> Counter:
+    # Combined facet entries of many rows, read in one query
+    entries = Counter()
+    if resource not in FACETED_RESOURCES or not ids:
+        return entries
+    model, status_field, facets = FACETED_RESOURCES[resource]
+    columns = [getattr(model, status_field)] + [getattr(model, facet) for facet in facets]
+    for row in db.query(*columns).filter(model.id.in_(ids)):
+        entries.update(_facet_entries(resource, row))
+    return entries
+
+def batch_set_status(db: Session, resource: str, ids: list[int], status: str) -> list[int]:
+    """
+    Sets the status (visibility for projects) of many rows with one UPDATE.
+    Returns the affected ids.
+    """
+    model, status_field, _ = FACETED_RESOURCES[resource]
+    before = _facet_snapshot(db, resource, ids)
+    affected = db.execute(
+        update(model).where(model.id.in_(ids)).values({status_field: status}).returning(model.id),
+        execution_options={"synchronize_session": False}
+    ).scalars().all()
+    delta = _facet_snapshot(db, resource, affected)
+    delta.subtract(before)
+    _apply_facet_delta(db, resource, delta)
+    if resource in SEARCH_RESOURCES and affected:
+        code = SEARCH_RESOURCES[resource]
+        db.execute(
+            text("UPDATE search_index SET status = :status WHERE rowid = :rowid"),
+            [{"status": status, "rowid": item_id * 4 + code} for item_id in affected]
+        )
+    _commit(db, resource, "update", affected)
+    return sorted(affected)
+
+def batch_update_tags(db: Session, resource: str, ids: list[int], add: list[str] = None, remove: list[str] = None) -> list[int]:
+    """
+    Adds and/or removes tags (tech stack for projects) on many rows in one transaction.
+    Returns the ids whose tags actually changed; with none, nothing is written.
+    """
+    model, field_name = TAGGED_RESOURCES[resource]
+    add, remove = list(dict.fromkeys(add or [])), set(remove or [])
+    changes = []
+    for item_id, value in db.query(model.id, getattr(model, field_name)).filter(model.id.in_(ids)):
+        tags = parse_tag_list(value)
+        new_tags = [t for t in tags if t not in remove] + [t for t in add if t not in tags and t not in remove]
+        if new_tags != tags:
+            changes.append({"id": item_id, field_name: json.dumps(new_tags, ensure_ascii=False)})
+    affected = [change["id"] for change in changes]
+    if not affected:
+        return []
+    # Facet snapshots before and after cover the same rows: those whose tags change
+    before = _facet_snapshot(db, resource, affected)
+    # Bulk UPDATE by primary key: one statement executed for every changed row
+    db.execute(update(model), changes)
+    _sync_tags_many(db, resource, [(change["id"], change[field_name]) for change in changes])
+    delta = _facet_snapshot(db, resource, affected)
+    delta.subtract(before)
+    _apply_facet_delta(db, resource, delta)
+    if resource in SEARCH_RESOURCES:
+        code = SEARCH_RESOURCES[resource]
+        db.execute(
+            text("UPDATE search_index SET tags = :tags WHERE rowid = :rowid"),
+            [
+                {"tags": " ".join(parse_tag_list(change[field_name])), "rowid": change["id"] * 4 + code}
+                for change in changes
+            ]
+        )
+    _commit(db, resource, "update", affected)
+    return sorted(affected)
+
+def batch_delete(db: Session, resource: str, ids: list[int]):
+    """
+    Deletes many rows with one DELETE, along with their tags, facet counts and search documents.
+    Returns the deleted rows as (id,) tuples, (id, url) for posts so their files can be removed.
+    """
+    model = CONTENT_MODELS[resource]
+    before = _facet_snapshot(db, resource, ids)
+    returning = [model.id, model.url] if resource == "posts" else [model.id]
+    rows = db.execute(
+        delete(model).where(model.id.in_(ids)).returning(*returning),
+        execution_options={"synchronize_session": False}
+    ).all()
+    affected = [row.id for row in rows]
+    if affected:
+        delta = Counter()
+        delta.subtract(before)
+        _apply_facet_delta(db, resource, delta)
+        if resource in TAGGED_RESOURCES:
+            _sync_tags_many(db, resource, [(item_id, None) for item_id in affected])
+        if resource in SEARCH_RESOURCES:
+            _sync_search_many(db, resource, [(item_id, None) for item_id in affected])
+    _commit(db, resource, "delete", affected)
+    return sorted(rows)
+
+# --- Totals ---
+def _cached_count(resource: str, query) -> int:
+    """
+    Counts a filtered query once per content version of `resource`.
+    Totals are kept in the response cache, keyed by the query's SQL, so paging
+    through a listing costs one COUNT per write instead of one per page.
+    """
+    if response_cache.versions_due():
+        response_cache.load_versions(get_content_versions(query.session))
+    query = query.order_by(None)
+    statement = query.statement.compile(dialect=query.session.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    key = ("count", resource, str(statement))
+    total = response_cache.get(key, (resource,))
+    if total is None:
+        generations = response_cache.generations((resource,))
+        total = query.count()
+        response_cache.set(key, generations, total)
+    return total
+
+# --- Keyset pagination ---
+def _keyset_zones(query, date_col, id_col, key: list, desc: bool):
+    # Ordered sub-queries that together continue after `key`.
+    # NULL dates are kept in their own zone (SQLite sorts them first ascending, last descending)
+    # so every zone stays a plain range scan on the (..., date, id) indexes.
+    order = (lambda c: c.desc()) if desc else (lambda c: c.asc())
+    after = (lambda c, v: c < v) if desc else (lambda c, v: c > v)
+    if date_col is None:
+        if key:
+            query = query.filter(after(id_col, key[0]))
+        return [query.order_by(order(id_col))]
+
+    dated = query.filter(date_col.isnot(None)).order_by(order(date_col), order(id_col))
+    undated = query.filter(date_col.is_(None)).order_by(order(id_col))
+    if not key:
+        return [dated, undated] if desc else [undated, dated]
+    date, item_id = key
+    if date is None:
+        undated = undated.filter(after(id_col, item_id))
+        return [undated] if desc else [undated, dated]
+    dated = dated.filter(after(tuple_(date_col, id_col), tuple_(date, item_id)))
+    return [dated, undated] if desc else [dated]
+
+def _keyset_page(query, date_col, id_col, cursor: str, limit: int, sort: str = "desc"):
+    """
+    Pages `query` by (date, id), or by id alone when date_col is None.
+    Returns (items, next_cursor); an empty cursor starts at the first page.
+    Raises ValueError for a malformed cursor.
+    """
+    columns = [id_col] if date_col is None else [date_col, id_col]
+    key = decode_cursor(cursor, size=len(columns)) if cursor else None
+
+    limit = max(limit, 1)
+    items = []
+    for zone in _keyset_zones(query, date_col, id_col, key, sort != "asc"):
+        items += zone.limit(limit + 1 - len(items)).all()
+        if len(items) > limit:
+            break
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    next_cursor = encode_cursor([getattr(items[-1], c.key) for c in columns])
+    return items, next_cursor
+
+def _books_query(db: Session, status: str = None, tags: list[str] = None):
     query = db.query(models.Book)
     if status:
         query = query.filter(models.Book.status == status)
     if tags:
-        for tag in tags:
-            query = query.filter(models.Book.tags.like(f'%"{tag}"%'))
-    return query.offset(skip).limit(limit).all()
+        query = _filter_by_tags(query, models.Book, "books", tags)
+    return query
+
+def get_books(db: Session, skip: int = 0, limit: int = 100, status: str = None, tags: list[str] = None):
+    return _books_query(db, status=status, tags=tags).offset(skip).limit(limit).all()
+
+def get_books_count(db: Session, status: str = None, tags: list[str] = None):
+    return _cached_count("books", _books_query(db, status=status, tags=tags))
 
 def create_book(db: Session, title: str, cover: str, url: str, status: str, rating: int, tags: str):
     db_book = models.Book(
@@ -21,20 +572,27 @@ def create_book(db: Session, title: str, cover: str, url: str, status: str, rati
         tags=tags
     )
     db.add(db_book)
-    db.commit()
+    db.flush()
+    _update_facets(db, "books", None, db_book)
+    _sync_tags(db, "books", db_book.id, tags)
+    _commit(db, "books", "create", [db_book.id])
     db.refresh(db_book)
     return db_book
 
 def update_book(db: Session, book_id: int, title: str = None, cover: str = None, url: str = None, status: str = None, rating: int = None, tags: str = None):
     db_book = db.query(models.Book).filter(models.Book.id == book_id).first()
     if db_book:
+        before = _facet_entries("books", db_book)
         if title: db_book.title = title
         if cover: db_book.cover = cover
         if url: db_book.url = url
         if status: db_book.status = status
         if rating is not None: db_book.rating = rating
-        if tags: db_book.tags = tags
-        db.commit()
+        if tags:
+            db_book.tags = tags
+            _sync_tags(db, "books", db_book.id, tags)
+        _update_facets(db, "books", before, db_book)
+        _commit(db, "books", "update", [db_book.id])
         db.refresh(db_book)
         return db_book
     return None
@@ -45,34 +603,63 @@ def get_book(db: Session, book_id: int):
 def delete_book(db: Session, book_id: int):
     db_book = db.query(models.Book).filter(models.Book.id == book_id).first()
     if db_book:
+        _update_facets(db, "books", _facet_entries("books", db_book), None)
         db.delete(db_book)
-        db.commit()
+        _sync_tags(db, "books", db_book.id, None)
+        _commit(db, "books", "delete", [db_book.id])
         return True
     return False
 
-def get_diaries(db: Session, skip: int = 0, limit: int = 100, year: str = None, month: str = None):
+def _diaries_query(db: Session, year: str = None, month: str = None):
     query = db.query(models.Diary)
-    
-    if year and month:
-        query = query.filter(models.Diary.date.like(f"{year}-{month.zfill(2)}%"))
-    elif year:
-        query = query.filter(models.Diary.date.like(f"{year}%"))
-    elif month:
-        query = query.filter(models.Diary.date.like(f"%-{month.zfill(2)}-%"))
-        
-    return query.order_by(models.Diary.date.desc()).offset(skip).limit(limit).all()
+
+    # Generated year/month columns: every combination is an index range
+    for column, value in ((models.Diary.year, year), (models.Diary.month, month)):
+        if value:
+            query = query.filter(column == int(value) if value.isdigit() else false())
+
+    return query
+
+def get_diaries(db: Session, skip: int = 0, limit: int = 100, year: str = None, month: str = None):
+    query = _diaries_query(db, year=year, month=month)
+    return query.order_by(models.Diary.date.desc(), models.Diary.id.desc()).offset(skip).limit(limit).all()
+
+def get_diaries_page(db: Session, cursor: str = None, limit: int = 100, year: str = None, month: str = None):
+    query = _diaries_query(db, year=year, month=month)
+    return _keyset_page(query, models.Diary.date, models.Diary.id, cursor, limit)
+
+def get_diary_archive(db: Session):
+    """
+    Returns per-year and per-month diary counts with mood and weather distributions,
+    newest first, from a single GROUP BY over the archive index.
+    """
+    rows = db.query(
+        models.Diary.year, models.Diary.month, models.Diary.mood, models.Diary.weather, func.count()
+    ).group_by(models.Diary.year, models.Diary.month, models.Diary.mood, models.Diary.weather).all()
+
+    years = {}
+    for year, month, mood, weather, count in rows:
+        year_entry = years.setdefault(year, {"year": year, "count": 0, "moods": Counter(), "weathers": Counter(), "months": {}})
+        month_entry = year_entry["months"].setdefault(month, {"month": month, "count": 0, "moods": Counter(), "weathers": Counter()})
+        for entry in (year_entry, month_entry):
+            entry["count"] += count
+            if mood:
+                entry["moods"][mood] += count
+            if weather:
+                entry["weathers"][weather] += count
+
+    def newest_first(values):
+        return sorted(values, key=lambda v: -1 if v is None else v, reverse=True)
+
+    archive = []
+    for year in newest_first(years):
+        year_entry = years[year]
+        year_entry["months"] = [year_entry["months"][month] for month in newest_first(year_entry["months"])]
+        archive.append(year_entry)
+    return {"total": sum(entry["count"] for entry in archive), "years": archive}
 
 def get_diaries_count(db: Session, year: str = None, month: str = None):
-    query = db.query(models.Diary)
-    
-    if year and month:
-        query = query.filter(models.Diary.date.like(f"{year}-{month.zfill(2)}%"))
-    elif year:
-        query = query.filter(models.Diary.date.like(f"{year}%"))
-    elif month:
-        query = query.filter(models.Diary.date.like(f"%-{month.zfill(2)}-%"))
-        
-    return query.count()
+    return _cached_count("diaries", _diaries_query(db, year=year, month=month))
 
 def create_diary(db: Session, date: str, content: str, mood: str, weather: str, images: str):
     db_diary = models.Diary(
@@ -83,7 +670,9 @@ def create_diary(db: Session, date: str, content: str, mood: str, weather: str,
         images=images
     )
     db.add(db_diary)
-    db.commit()
+    db.flush()
+    _sync_search(db, "diaries", db_diary.id, db_diary)
+    _commit(db, "diaries", "create", [db_diary.id])
     db.refresh(db_diary)
     return db_diary
 
@@ -95,7 +684,8 @@ def update_diary(db: Session, diary_id: int, date: str = None, content: str = No
         if mood: db_diary.mood = mood
         if weather: db_diary.weather = weather
         if images: db_diary.images = images
-        db.commit()
+        _sync_search(db, "diaries", db_diary.id, db_diary)
+        _commit(db, "diaries", "update", [db_diary.id])
         db.refresh(db_diary)
         return db_diary
     return None
@@ -107,47 +697,75 @@ def delete_diary(db: Session, diary_id: int):
     db_diary = db.query(models.Diary).filter(models.Diary.id == diary_id).first()
     if db_diary:
         db.delete(db_diary)
-        db.commit()
+        _sync_search(db, "diaries", db_diary.id, None)
+        _commit(db, "diaries", "delete", [db_diary.id])
         return True
     return False
 
-def get_gallery(db: Session, skip: int = 0, limit: int = 100, status: str = None, tags: list[str] = None, sort: str = "desc"):
+def _gallery_query(db: Session, status: str = None, tags: list[str] = None):
     query = db.query(models.Gallery)
     if status:
         query = query.filter(models.Gallery.status == status)
     if tags:
-        for tag in tags:
-            query = query.filter(models.Gallery.tags.like(f'%"{tag}"%'))
+        query = _filter_by_tags(query, models.Gallery, "gallery", tags)
+    return query
+
+def get_gallery(db: Session, skip: int = 0, limit: int = 100, status: str = None, tags: list[str] = None, sort: str = "desc"):
+    query = _gallery_query(db, status=status, tags=tags)
             
     if sort == "asc":
-        query = query.order_by(models.Gallery.date.asc())
+        query = query.order_by(models.Gallery.date.asc(), models.Gallery.id.asc())
     else:
-        query = query.order_by(models.Gallery.date.desc())
+        query = query.order_by(models.Gallery.date.desc(), models.Gallery.id.desc())
 
     return query.offset(skip).limit(limit).all()
 
-def create_gallery(db: Session, title: str, url: str, date: str, tags: str, status: str):
+def get_gallery_count(db: Session, status: str = None, tags: list[str] = None):
+    return _cached_count("gallery", _gallery_query(db, status=status, tags=tags))
+
+def get_gallery_page(db: Session, cursor: str = None, limit: int = 100, status: str = None, tags: list[str] = None, sort: str = "desc"):
+    query = _gallery_query(db, status=status, tags=tags)
+    return _keyset_page(query, models.Gallery.date, models.Gallery.id, cursor, limit, sort)
+
+# Set from app.services.image_service.store_image for uploaded images
+GALLERY_IMAGE_FIELDS = ("width", "height", "placeholder", "variants", "variant_widths")
+
+def create_gallery(db: Session, title: str, url: str, date: str, tags: str, status: str, image: dict = None):
     db_gallery = models.Gallery(
         title=title,
         url=url,
         date=date,
         tags=tags,
-        status=status
+        status=status,
+        **{key: (image or {}).get(key) for key in GALLERY_IMAGE_FIELDS}
     )
     db.add(db_gallery)
-    db.commit()
+    db.flush()
+    _update_facets(db, "gallery", None, db_gallery)
+    _sync_tags(db, "gallery", db_gallery.id, tags)
+    _commit(db, "gallery", "create", [db_gallery.id])
     db.refresh(db_gallery)
     return db_gallery
 
-def update_gallery(db: Session, gallery_id: int, title: str = None, url: str = None, date: str = None, tags: str = None, status: str = None):
+def update_gallery(db: Session, gallery_id: int, title: str = None, url: str = None, date: str = None, tags: str = None, status: str = None, image: dict = None):
+    """
+    image replaces the uploaded image fields; an empty dict clears them.
+    """
     db_gallery = db.query(models.Gallery).filter(models.Gallery.id == gallery_id).first()
     if db_gallery:
+        before = _facet_entries("gallery", db_gallery)
         if title: db_gallery.title = title
         if url: db_gallery.url = url
+        if image is not None:
+            for key in GALLERY_IMAGE_FIELDS:
+                setattr(db_gallery, key, image.get(key))
         if date: db_gallery.date = date
-        if tags: db_gallery.tags = tags
+        if tags:
+            db_gallery.tags = tags
+            _sync_tags(db, "gallery", db_gallery.id, tags)
         if status: db_gallery.status = status
-        db.commit()
+        _update_facets(db, "gallery", before, db_gallery)
+        _commit(db, "gallery", "update", [db_gallery.id])
         db.refresh(db_gallery)
         return db_gallery
     return None
@@ -158,12 +776,16 @@ def get_gallery_item(db: Session, gallery_id: int):
 def delete_gallery(db: Session, gallery_id: int):
     db_gallery = db.query(models.Gallery).filter(models.Gallery.id == gallery_id).first()
     if db_gallery:
+        _update_facets(db, "gallery", _facet_entries("gallery", db_gallery), None)
         db.delete(db_gallery)
-        db.commit()
+        _sync_tags(db, "gallery", db_gallery.id, None)
+        _commit(db, "gallery", "delete", [db_gallery.id])
         return True
     return False
 
 def create_post(db: Session, title: str, date: str, folder: str, tags: str, status: str, desc: str, url: str, image: str = None):
+    # Read the article file before the write transaction starts, not while holding the lock
+    body = read_article_body(url)
     db_post = models.Post(
         title=title,
         date=date,
@@ -175,56 +797,123 @@ def create_post(db: Session, title: str, date: str, folder: str, tags: str, stat
         image=image
     )
     db.add(db_post)
-    db.commit()
+    db.flush()
+    _update_facets(db, "posts", None, db_post)
+    _sync_tags(db, "posts", db_post.id, tags)
+    _sync_search(db, "posts", db_post.id, db_post, body)
+    _commit(db, "posts", "create", [db_post.id])
     db.refresh(db_post)
     return db_post
 
 def update_post(db: Session, post_id: int, title: str = None, date: str = None, folder: str = None, tags: str = None, status: str = None, desc: str = None, url: str = None, image: str = None):
     db_post = db.query(models.Post).filter(models.Post.id == post_id).first()
     if db_post:
+        body = read_article_body(url or db_post.url)
+        before = _facet_entries("posts", db_post)
         if title: db_post.title = title
         if date: db_post.date = date
         if folder: db_post.folder = folder
-        if tags: db_post.tags = tags
+        if tags:
+            db_post.tags = tags
+            _sync_tags(db, "posts", db_post.id, tags)
         if status: db_post.status = status
         if desc: db_post.desc = desc
         if url: db_post.url = url
         if image: db_post.image = image
-        db.commit()
+        _update_facets(db, "posts", before, db_post)
+        _sync_search(db, "posts", db_post.id, db_post, body)
+        _commit(db, "posts", "update", [db_post.id])
         db.refresh(db_post)
         return db_post
     return None
 
+def upsert_posts(db: Session, rows: list[dict], create_only: tuple = (), bodies: dict = None):
+    """
+    Creates or updates many posts, matched by url, in one transaction.
+    Fields named in create_only are set on new posts but left alone on existing ones.
+    bodies maps url -> article body for the search index; missing ones are read from disk.
+    Returns [(post_id, created), ...] in the order of rows.
+    """
+    urls = [row["url"] for row in rows]
+    # Article files are read before the write transaction starts
+    bodies = {url: bodies[url] if bodies and url in bodies else read_article_body(url) for url in urls}
+    existing = {post.url: post for post in db.query(models.Post).filter(models.Post.url.in_(urls))}
+    pending = []
+    for row in rows:
+        db_post = existing.get(row["url"])
+        if db_post is None:
+            db_post = models.Post(**row)
+            db.add(db_post)
+            pending.append((db_post, True, None))
+        else:
+            before = _facet_entries("posts", db_post)
+            for field, value in row.items():
+                if field not in create_only:
+                    setattr(db_post, field, value)
+            pending.append((db_post, False, before))
+    db.flush()
+    # Tag index, facet counts and search documents are synced once for the whole batch
+    delta = Counter()
+    for db_post, _, before in pending:
+        delta.update(_facet_entries("posts", db_post))
+        delta.subtract(before or Counter())
+    _apply_facet_delta(db, "posts", delta)
+    _sync_tags_many(db, "posts", [(db_post.id, db_post.tags) for db_post, _, _ in pending])
+    _sync_search_many(db, "posts", [(db_post.id, db_post) for db_post, _, _ in pending], bodies)
+    results = [(db_post.id, created) for db_post, created, _ in pending]
+    _journal(db, "posts", "create", [post_id for post_id, created in results if created])
+    _commit(db, "posts", "update", [post_id for post_id, created in results if not created])
+    return results
+
+def get_post_ids_by_url(db: Session, urls: list[str]) -> list[int]:
+    return [post_id for post_id, in db.query(models.Post.id).filter(models.Post.url.in_(urls))]
+
 def get_post(db: Session, post_id: int):
     return db.query(models.Post).filter(models.Post.id == post_id).first()
 
 def delete_post(db: Session, post_id: int):
     db_post = db.query(models.Post).filter(models.Post.id == post_id).first()
     if db_post:
+        _update_facets(db, "posts", _facet_entries("posts", db_post), None)
         db.delete(db_post)
-        db.commit()
+        _sync_tags(db, "posts", db_post.id, None)
+        _sync_search(db, "posts", db_post.id, None)
+        _commit(db, "posts", "delete", [db_post.id])
         return True
     return False
 
-def get_posts(db: Session, skip: int = 0, limit: int = 100, status: str = None, folder: str = None, tags: list[str] = None, sort: str = "desc"):
+def _posts_query(db: Session, status: str = None, folder: str = None, tags: list[str] = None):
     query = db.query(models.Post)
     if status:
-        print(f"Filtering posts by status: {status} (Type: {type(status)})")
         query = query.filter(models.Post.status == status)
     if folder:
-        # Filter by folder (exact match or subfolder)
-        query = query.filter(or_(models.Post.folder == folder, models.Post.folder.like(f"{folder}/%")))
+        # Filter by folder (exact match or subfolder). A range instead of LIKE 'folder/%',
+        # which SQLite cannot match with an index ("0" is the character after "/").
+        query = query.filter(or_(
+            models.Post.folder == folder,
+            and_(models.Post.folder >= f"{folder}/", models.Post.folder < f"{folder}0")
+        ))
     if tags:
-        for tag in tags:
-            query = query.filter(models.Post.tags.like(f'%"{tag}"%'))
+        query = _filter_by_tags(query, models.Post, "posts", tags)
+    return query
+
+def get_posts(db: Session, skip: int = 0, limit: int = 100, status: str = None, folder: str = None, tags: list[str] = None, sort: str = "desc"):
+    query = _posts_query(db, status=status, folder=folder, tags=tags)
     
     if sort == "asc":
-        query = query.order_by(models.Post.date.asc())
+        query = query.order_by(models.Post.date.asc(), models.Post.id.asc())
     else:
-        query = query.order_by(models.Post.date.desc())
+        query = query.order_by(models.Post.date.desc(), models.Post.id.desc())
 
     return query.offset(skip).limit(limit).all()
 
+def get_posts_count(db: Session, status: str = None, folder: str = None, tags: list[str] = None):
+    return _cached_count("posts", _posts_query(db, status=status, folder=folder, tags=tags))
+
+def get_posts_page(db: Session, cursor: str = None, limit: int = 100, status: str = None, folder: str = None, tags: list[str] = None, sort: str = "desc"):
+    query = _posts_query(db, status=status, folder=folder, tags=tags)
+    return _keyset_page(query, models.Post.date, models.Post.id, cursor, limit, sort)
+
 def get_projects(db: Session, skip: int = 0, limit: int = 100, visibility: str = None, tech_stack: list[str] = None, project_status: str = None):
     query = db.query(models.Project)
     if visibility:
@@ -232,8 +921,7 @@ def get_projects(db: Session, skip: int = 0, limit: int = 100, visibility: str =
     if project_status:
         query = query.filter(models.Project.status == project_status)
     if tech_stack:
-        for tech in tech_stack:
-            query = query.filter(models.Project.techStack.like(f'%"{tech}"%'))
+        query = _filter_by_tags(query, models.Project, "projects", tech_stack)
     return query.offset(skip).limit(limit).all()
 
 def create_project(db: Session, name: str, description: str, link: str, techStack: str, status: str, visibility: str):
@@ -246,20 +934,29 @@ def create_project(db: Session, name: str, description: str, link: str, techStac
         visibility=visibility
     )
     db.add(db_project)
-    db.commit()
+    db.flush()
+    _update_facets(db, "projects", None, db_project)
+    _sync_tags(db, "projects", db_project.id, techStack)
+    _sync_search(db, "projects", db_project.id, db_project)
+    _commit(db, "projects", "create", [db_project.id])
     db.refresh(db_project)
     return db_project
 
 def update_project(db: Session, project_id: int, name: str = None, description: str = None, link: str = None, techStack: str = None, status: str = None, visibility: str = None):
     db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
     if db_project:
+        before = _facet_entries("projects", db_project)
         if name: db_project.name = name
         if description: db_project.description = description
         if link: db_project.link = link
-        if techStack: db_project.techStack = techStack
+        if techStack:
+            db_project.techStack = techStack
+            _sync_tags(db, "projects", db_project.id, techStack)
         if status: db_project.status = status
         if visibility: db_project.visibility = visibility
-        db.commit()
+        _update_facets(db, "projects", before, db_project)
+        _sync_search(db, "projects", db_project.id, db_project)
+        _commit(db, "projects", "update", [db_project.id])
         db.refresh(db_project)
         return db_project
     return None
@@ -270,12 +967,15 @@ def get_project(db: Session, project_id: int):
 def delete_project(db: Session, project_id: int):
     db_project = db.query(models.Project).filter(models.Project.id == project_id).first()
     if db_project:
+        _update_facets(db, "projects", _facet_entries("projects", db_project), None)
         db.delete(db_project)
-        db.commit()
+        _sync_tags(db, "projects", db_project.id, None)
+        _sync_search(db, "projects", db_project.id, None)
+        _commit(db, "projects", "delete", [db_project.id])
         return True
     return False
 
-def get_todos(db: Session, skip: int = 0, limit: int = 100, status: str = None, priority: str = None, type: str = None, completed: bool = None, sort: str = "desc"):
+def _todos_query(db: Session, status: str = None, priority: str = None, type: str = None, completed: bool = None):
     query = db.query(models.Todo)
     if status:
         query = query.filter(models.Todo.status == status)
@@ -285,6 +985,10 @@ def get_todos(db: Session, skip: int = 0, limit: int = 100, status: str = None,
         query = query.filter(models.Todo.type == type)
     if completed is not None:
         query = query.filter(models.Todo.completed == completed)
+    return query
+
+def get_todos(db: Session, skip: int = 0, limit: int = 100, status: str = None, priority: str = None, type: str = None, completed: bool = None, sort: str = "desc"):
+    query = _todos_query(db, status=status, priority=priority, type=type, completed=completed)
         
     if sort == "asc":
         query = query.order_by(models.Todo.id.asc())
@@ -293,6 +997,13 @@ def get_todos(db: Session, skip: int = 0, limit: int = 100, status: str = None,
         
     return query.offset(skip).limit(limit).all()
 
+def get_todos_count(db: Session, status: str = None, priority: str = None, type: str = None, completed: bool = None):
+    return _cached_count("todos", _todos_query(db, status=status, priority=priority, type=type, completed=completed))
+
+def get_todos_page(db: Session, cursor: str = None, limit: int = 100, status: str = None, priority: str = None, type: str = None, completed: bool = None, sort: str = "desc"):
+    query = _todos_query(db, status=status, priority=priority, type=type, completed=completed)
+    return _keyset_page(query, None, models.Todo.id, cursor, limit, sort)
+
 def get_tools(db: Session, skip: int = 0, limit: int = 100, status: str = None, category: str = None):
     query = db.query(models.Tool)
     if status:
@@ -314,7 +1025,9 @@ def create_tool(db: Session, name: str, url: str, description: str = None, icon:
         status=status
     )
     db.add(db_tool)
-    db.commit()
+    db.flush()
+    _update_facets(db, "tools", None, db_tool)
+    _commit(db, "tools", "create", [db_tool.id])
     db.refresh(db_tool)
     return db_tool
 
@@ -322,15 +1035,17 @@ def update_tool(db: Session, tool_id: int, name: str = None, url: str = None, de
     db_tool = get_tool(db, tool_id)
     if not db_tool:
         return None
-    
+
+    before = _facet_entries("tools", db_tool)
     if name is not None: db_tool.name = name
     if url is not None: db_tool.url = url
     if description is not None: db_tool.description = description
     if icon is not None: db_tool.icon = icon
     if category is not None: db_tool.category = category
     if status is not None: db_tool.status = status
+    _update_facets(db, "tools", before, db_tool)
     
-    db.commit()
+    _commit(db, "tools", "update", [db_tool.id])
     db.refresh(db_tool)
     return db_tool
 
@@ -338,13 +1053,19 @@ def delete_tool(db: Session, tool_id: int):
     db_tool = get_tool(db, tool_id)
     if not db_tool:
         return False
+    _update_facets(db, "tools", _facet_entries("tools", db_tool), None)
     db.delete(db_tool)
-    db.commit()
+    _commit(db, "tools", "delete", [db_tool.id])
     return True
 
 def get_admin_by_username(db: Session, username: str):
     return db.query(models.Admin).filter(models.Admin.username == username).first()
 
+def update_admin_password(db: Session, admin: models.Admin, hashed_password: str):
+    # Not published content: no version bump
+    admin.password = hashed_password
+    db.commit()
+
 def create_todo(db: Session, task: str, priority: str, type: str, progress: int, icon: str, status: str, completed: bool):
     db_todo = models.Todo(
         task=task,
@@ -356,13 +1077,16 @@ def create_todo(db: Session, task: str, priority: str, type: str, progress: int,
         completed=completed
     )
     db.add(db_todo)
-    db.commit()
+    db.flush()
+    _update_facets(db, "todos", None, db_todo)
+    _commit(db, "todos", "create", [db_todo.id])
     db.refresh(db_todo)
     return db_todo
 
 def update_todo(db: Session, todo_id: int, task: str = None, priority: str = None, type: str = None, progress: int = None, icon: str = None, status: str = None, completed: bool = None):
     db_todo = db.query(models.Todo).filter(models.Todo.id == todo_id).first()
     if db_todo:
+        before = _facet_entries("todos", db_todo)
         if task: db_todo.task = task
         if priority: db_todo.priority = priority
         if type: db_todo.type = type
@@ -370,7 +1094,8 @@ def update_todo(db: Session, todo_id: int, task: str = None, priority: str = Non
         if icon: db_todo.icon = icon
         if status: db_todo.status = status
         if completed is not None: db_todo.completed = completed
-        db.commit()
+        _update_facets(db, "todos", before, db_todo)
+        _commit(db, "todos", "update", [db_todo.id])
         db.refresh(db_todo)
         return db_todo
     return None
@@ -381,7 +1106,8 @@ def get_todo(db: Session, todo_id: int):
 def delete_todo(db: Session, todo_id: int):
     db_todo = db.query(models.Todo).filter(models.Todo.id == todo_id).first()
     if db_todo:
+        _update_facets(db, "todos", _facet_entries("todos", db_todo), None)
         db.delete(db_todo)
-        db.commit()
+        _commit(db, "todos", "delete", [db_todo.id])
         return True
     return False
@@ -0,0 +1,42 @@
+"""
+Async versions of the read functions in app.crud.blog.
+
+Each one runs the sync implementation on the AsyncSession's connection via
+run_sync, so both paths share exactly the same query building.
+"""
+import functools
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud import blog
+
+def _run_sync(fn):
+    @functools.wraps(fn)
+    async def wrapper(db: AsyncSession, *args, **kwargs):
+        return await db.run_sync(fn, *args, **kwargs)
+    return wrapper
+
+get_books = _run_sync(blog.get_books)
+get_books_count = _run_sync(blog.get_books_count)
+get_book = _run_sync(blog.get_book)
+get_diaries = _run_sync(blog.get_diaries)
+get_diaries_page = _run_sync(blog.get_diaries_page)
+get_diaries_count = _run_sync(blog.get_diaries_count)
+get_diary_archive = _run_sync(blog.get_diary_archive)
+get_diary = _run_sync(blog.get_diary)
+get_gallery = _run_sync(blog.get_gallery)
+get_gallery_page = _run_sync(blog.get_gallery_page)
+get_gallery_count = _run_sync(blog.get_gallery_count)
+get_gallery_item = _run_sync(blog.get_gallery_item)
+get_posts = _run_sync(blog.get_posts)
+get_posts_page = _run_sync(blog.get_posts_page)
+get_posts_count = _run_sync(blog.get_posts_count)
+get_post = _run_sync(blog.get_post)
+get_projects = _run_sync(blog.get_projects)
+get_project = _run_sync(blog.get_project)
+get_todos = _run_sync(blog.get_todos)
+get_todos_page = _run_sync(blog.get_todos_page)
+get_todos_count = _run_sync(blog.get_todos_count)
+get_todo = _run_sync(blog.get_todo)
+get_tools = _run_sync(blog.get_tools)
+get_tool = _run_sync(blog.get_tool)
+get_facet_counts = _run_sync(blog.get_facet_counts)
+search = _run_sync(blog.search)
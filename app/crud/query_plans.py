@@ -0,0 +1,80 @@
+"""
+EXPLAIN QUERY PLAN checks for the crud query shapes.
+
+Run with `python -m app.crud.query_plans` against a migrated database;
+it exits non-zero if any shape reads a table or index other than through
+an indexed SEARCH, or sorts its whole result set, so missing indexes
+cannot come back unnoticed.
+"""
+import sys
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from app.crud import blog as crud
+from app.models import blog as models
+
+# Allowances a query shape may need on top of indexed SEARCH steps:
+# SORT - a temp b-tree sort. Tag filters intersect content_tags lookups and folder
+#        filters match two ranges, so sorting those already narrowed rows is expected.
+# SCAN - an index scan. Only for unfiltered listings, which read their LIMIT in index
+#        order and stop, and for aggregates over every row.
+SORT = "sort"
+SCAN = "scan"
+
+# (name, query factory, allowances)
+QUERY_SHAPES = [
+    ("posts by status", lambda db: crud._posts_query(db, status="public").order_by(models.Post.date.desc(), models.Post.id.desc()).limit(10), ()),
+    ("posts by folder and status", lambda db: crud._posts_query(db, status="public", folder="notes").order_by(models.Post.date.desc(), models.Post.id.desc()).limit(10), (SORT,)),
+    ("posts by folder", lambda db: crud._posts_query(db, folder="notes").order_by(models.Post.date.desc(), models.Post.id.desc()).limit(10), (SORT,)),
+    ("posts by tags", lambda db: crud._posts_query(db, status="public", tags=["a", "b"]).order_by(models.Post.date.desc(), models.Post.id.desc()).limit(10), (SORT,)),
+    ("posts by url", lambda db: db.query(models.Post.id).filter(models.Post.url.in_(["/user/posts/a", "/user/posts/b"])), ()),
+    ("posts admin listing", lambda db: db.query(models.Post).order_by(models.Post.date.desc(), models.Post.id.desc()).limit(10), (SCAN,)),
+    ("posts keyset page", lambda db: crud._keyset_zones(crud._posts_query(db, status="public"), models.Post.date, models.Post.id, ["2024-01-01", 1], True)[0].limit(10), ()),
+    ("posts keyset page ascending", lambda db: crud._keyset_zones(crud._posts_query(db, status="public"), models.Post.date, models.Post.id, ["2024-01-01", 1], False)[0].limit(10), ()),
+    ("posts keyset undated zone", lambda db: crud._keyset_zones(crud._posts_query(db, status="public"), models.Post.date, models.Post.id, [None, 1], True)[0].limit(10), ()),
+    ("gallery by status", lambda db: crud._gallery_query(db, status="published").order_by(models.Gallery.date.desc(), models.Gallery.id.desc()).limit(10), ()),
+    ("gallery admin listing", lambda db: db.query(models.Gallery).order_by(models.Gallery.date.desc(), models.Gallery.id.desc()).limit(10), (SCAN,)),
+    ("gallery by tags", lambda db: crud._gallery_query(db, tags=["a"]).order_by(models.Gallery.date.desc(), models.Gallery.id.desc()).limit(10), (SORT,)),
+    ("gallery keyset page", lambda db: crud._keyset_zones(crud._gallery_query(db, status="published"), models.Gallery.date, models.Gallery.id, ["2024-01-01", 1], True)[0].limit(10), ()),
+    ("diaries listing", lambda db: crud._diaries_query(db).order_by(models.Diary.date.desc(), models.Diary.id.desc()).limit(10), (SCAN,)),
+    ("diaries by year", lambda db: crud._diaries_query(db, year="2024").order_by(models.Diary.date.desc(), models.Diary.id.desc()).limit(10), ()),
+    ("diaries by year and month", lambda db: crud._diaries_query(db, year="2024", month="5").order_by(models.Diary.date.desc(), models.Diary.id.desc()).limit(10), ()),
+    ("diaries by month", lambda db: crud._diaries_query(db, month="5").order_by(models.Diary.date.desc(), models.Diary.id.desc()).limit(10), ()),
+    ("diary archive", lambda db: db.query(models.Diary.year, models.Diary.month, models.Diary.mood, models.Diary.weather, func.count()).group_by(models.Diary.year, models.Diary.month, models.Diary.mood, models.Diary.weather), (SCAN,)),
+    ("todos by status", lambda db: crud._todos_query(db, status="published").order_by(models.Todo.id.desc()).limit(10), ()),
+    ("todos keyset page", lambda db: crud._keyset_zones(crud._todos_query(db, status="published"), None, models.Todo.id, [10], True)[0].limit(10), ()),
+    ("todos keyset page ascending", lambda db: crud._keyset_zones(crud._todos_query(db, status="published"), None, models.Todo.id, [10], False)[0].limit(10), ()),
+    ("tools by status and category", lambda db: db.query(models.Tool).filter(models.Tool.status == "published", models.Tool.category == "dev").limit(10), ()),
+    ("books by status", lambda db: db.query(models.Book).filter(models.Book.status == "published").limit(10), ()),
+    ("projects by visibility", lambda db: db.query(models.Project).filter(models.Project.visibility == "published").limit(10), ()),
+    ("facet counts", lambda db: db.query(models.FacetCount.value).filter(models.FacetCount.resource == "posts", models.FacetCount.facet == "tags", models.FacetCount.status == "public"), ()),
+]
+
+def explain(db: Session, query) -> list[str]:
+    statement = query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    return [row[3] for row in db.execute(text(f"EXPLAIN QUERY PLAN {statement}"))]
+
+def check_query_plans(db: Session) -> list[str]:
+    """
+    Returns one message per plan step that reads a table or index other than
+    through an indexed SEARCH (or sorts) without the shape allowing it;
+    an empty list means all good.
+    """
+    problems = []
+    for name, factory, allowed in QUERY_SHAPES:
+        for detail in explain(db, factory(db)):
+            table_scan = detail.startswith("SCAN ") and "INDEX" not in detail
+            index_scan = detail.startswith("SCAN ") and "INDEX" in detail and SCAN not in allowed
+            bad_sort = "TEMP B-TREE" in detail and SORT not in allowed
+            if table_scan or index_scan or bad_sort:
+                problems.append(f"{name}: {detail}")
+    return problems
+
+if __name__ == "__main__":
+    from app.core.database import SessionLocal
+
+    with SessionLocal() as db:
+        problems = check_query_plans(db)
+    for problem in problems:
+        print(problem)
+    print(f"{len(QUERY_SHAPES)} query shapes checked, {len(problems)} problem(s).")
+    sys.exit(1 if problems else 0)
@@ -2,6 +2,8 @@ import os
 from dotenv import load_dotenv
 from app.core.database import SessionLocal, engine
 from app.models import blog as models
+from app.crud import blog as crud
+from app.core.migrations import run_migrations, get_schema_version
 from app.utils.security import hash_password
 
 # Load environment variables
@@ -15,7 +17,25 @@ def init_db():
     models.Base.metadata.create_all(bind=engine)
     print("Tables created successfully.")
 
-    # 2. Import/Update Admin User
+    # 2. Apply pending schema migrations
+    print("Running migrations...")
+    applied = run_migrations(engine)
+    with engine.connect() as conn:
+        version = get_schema_version(conn)
+    print(f"Applied {len(applied)} migration(s), schema version is now {version}.")
+
+    # 3. Rebuild tag index, facet counts and search index from the content tables
+    print("Rebuilding tag index, facet counts and search index...")
+    db = SessionLocal()
+    try:
+        crud.rebuild_content_tags(db)
+        crud.rebuild_facet_counts(db)
+        crud.rebuild_search_index(db)
+        print("Tag index, facet counts and search index rebuilt successfully.")
+    finally:
+        db.close()
+
+    # 4. Import/Update Admin User
     print("Importing admin user...")
     username = os.getenv("ADMIN_NAME")
     password = os.getenv("ADMIN_PASSWORD")
@@ -0,0 +1,39 @@
+import argparse
+from dotenv import load_dotenv
+from app.core.database import ReadSessionLocal, SessionLocal
+from app.crud import blog as crud
+from app.services.export_service import export_static
+
+# Load environment variables
+load_dotenv()
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the public API as content-hashed static JSON files.")
+    parser.add_argument("out_dir", help="output directory (manifest.json is written at its root)")
+    parser.add_argument("--page-size", type=int, default=100, help="items per list page (default: 100)")
+    parser.add_argument("--workers", type=int, default=8, help="page writer threads")
+    parser.add_argument("--prune", action="store_true", help="delete files the new manifest no longer references")
+    parser.add_argument("--full", action="store_true", help="rebuild every file instead of only what changed since the last export")
+    parser.add_argument("--trim-journal", action="store_true", help="delete the change journal entries this export has consumed")
+    args = parser.parse_args()
+
+    db = ReadSessionLocal()
+    try:
+        report = export_static(db, args.out_dir, page_size=args.page_size, workers=args.workers, prune=args.prune, full=args.full)
+    finally:
+        db.close()
+
+    print(f"Exported ({report['mode']}) {report['files']} file(s) in {report['seconds']}s: "
+          f"{report['rebuilt']} rebuilt, {report['written']} written, {report['pruned']} pruned.")
+
+    if args.trim_journal:
+        # Other exports still behind this point fall back to a full rebuild
+        db = SessionLocal()
+        try:
+            removed = crud.trim_change_journal(db, report["journal_id"])
+        finally:
+            db.close()
+        print(f"Trimmed {removed} change journal entries.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import argparse
+from dotenv import load_dotenv
+from app.core.database import SessionLocal, Base, engine
+from app.core.migrations import run_migrations
+from app.services.import_service import import_articles
+
+# Load environment variables
+load_dotenv()
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a zip/tar archive of .md/.mdx files as articles.")
+    parser.add_argument("archive", help="path to a .zip, .tar, .tar.gz or .tgz file")
+    parser.add_argument("--status", default="draft", help="status of the imported articles (default: draft)")
+    parser.add_argument("--workers", type=int, default=8, help="file writer threads")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    db = SessionLocal()
+    try:
+        report = import_articles(db, args.archive, status=args.status, workers=args.workers)
+    finally:
+        db.close()
+
+    failed = [entry for entry in report if entry["status"] == "error"]
+    for entry in failed:
+        print(f"Error: {entry['file']}: {entry['error']}")
+    created = sum(1 for entry in report if entry["status"] == "created")
+    updated = sum(1 for entry in report if entry["status"] == "updated")
+    print(f"Imported {len(report)} file(s): {created} created, {updated} updated, {len(failed)} failed.")
+
+if __name__ == "__main__":
+    main()
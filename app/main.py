@@ -1,12 +1,45 @@
-from fastapi import FastAPI
+import threading
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.staticfiles import StaticFiles
 from app.api import user, admin
-from app.core.database import Base, engine
+from app.core import config
+from app.core.cache import response_cache
+from app.core.database import Base, engine, SessionLocal, ReadSessionLocal
+from app.core.metrics import MetricsMiddleware, CONTENT_TYPE as METRICS_CONTENT_TYPE, render as render_metrics
+from app.core.timing import ServerTimingMiddleware
+from app.core.migrations import run_migrations
+from app.crud import blog as crud
+from app.services.image_service import shutdown_image_pool
+from app.services.render_service import render_cache
 
 # Create tables if they don't exist (though we already created them manually)
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="NayukiBlog API")
+# Bring existing databases up to the current schema version
+run_migrations(engine)
+
+# Resume content versions so ETags stay stable across restarts
+with SessionLocal() as db:
+    response_cache.load_versions(crud.get_content_versions(db))
+
+def _warm_render_cache():
+    with ReadSessionLocal() as db:
+        urls = [post.url for post in crud.get_posts(db, limit=config.RENDER_WARMUP, status="public")]
+    warmed = render_cache.warm_up(urls)
+    print(f"Render cache warmed with {warmed} article(s).")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if config.RENDER_WARMUP:
+        # In the background, so the server accepts requests right away
+        threading.Thread(target=_warm_render_cache, name="render-warmup", daemon=True).start()
+    yield
+    shutdown_image_pool()
+
+app = FastAPI(title="NayukiBlog API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -17,7 +50,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compresses responses that are not already encoded; cached /api/user
+# responses carry their own precompressed bodies (see app.core.cache)
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=config.COMPRESSION_MIN_SIZE,
+    compresslevel=config.GZIP_MIDDLEWARE_LEVEL,
+)
+
+# Outermost, so the total includes compression and the other middleware
+app.add_middleware(ServerTimingMiddleware)
+
+if config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+    # async: metrics are only read and written on the event loop
+    @app.get("/metrics", include_in_schema=False)
+    async def read_metrics():
+        return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+class UploadFiles(StaticFiles):
+    """
+    Uploaded images are stored under their content hash, so a URL's bytes never change.
+    """
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+# check_dir=False: the directory is created by the first upload
+app.mount("/uploads", UploadFiles(directory=config.UPLOAD_DIR, check_dir=False), name="uploads")
+
 app.include_router(user.router, prefix="/api/user", tags=["user"])
+app.include_router(admin.auth_router, prefix="/api/admin", tags=["admin"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 @app.get("/")
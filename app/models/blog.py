@@ -1,6 +1,44 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, Enum
+from sqlalchemy import Column, Integer, String, Boolean, Text, Enum, Index, Computed
+from sqlalchemy.types import TypeDecorator
 from app.core.database import Base
 import enum
+import json
+
+class JSONList(TypeDecorator):
+    """
+    A JSON list stored as TEXT, decoded once when the row is loaded.
+    Writes accept a list or an already-encoded JSON string (as sent by the admin forms).
+    NULL, invalid and non-list values load as an empty list, the schemas' default.
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return json.dumps(value, ensure_ascii=False)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return []
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+        return value if isinstance(value, list) else []
+
+class JSONDict(JSONList):
+    """
+    A JSON object stored as TEXT, like JSONList. Invalid or non-object values load as None.
+    """
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+        return value if isinstance(value, dict) else None
 
 class PostStatus(str, enum.Enum):
     PUBLIC = "public"
@@ -20,7 +58,10 @@ class Book(Base):
     url = Column(String)
     status = Column(String, default="published")
     rating = Column(Integer)
-    tags = Column(Text) # JSON string
+    tags = Column(JSONList)
+    __table_args__ = (
+        Index("ix_books_status", "status"),
+    )
 
 class Diary(Base):
     __tablename__ = "diaries"
@@ -29,7 +70,17 @@ class Diary(Base):
     content = Column(Text)
     mood = Column(String)
     weather = Column(String)
-    images = Column(Text) # JSON string
+    images = Column(JSONList)
+    # Generated from the "YYYY-MM-DD" date string, so year/month filters are plain index lookups
+    year = Column(Integer, Computed("CAST(substr(date, 1, 4) AS INTEGER)", persisted=False))
+    month = Column(Integer, Computed("CAST(substr(date, 6, 2) AS INTEGER)", persisted=False))
+    __table_args__ = (
+        Index("ix_diaries_date_id", "date", "id"),
+        Index("ix_diaries_year_date", "year", "date", "id"),
+        Index("ix_diaries_month_date", "month", "date", "id"),
+        # Covers the archive GROUP BY without touching the table
+        Index("ix_diaries_archive", "year", "month", "mood", "weather"),
+    )
 
 class Gallery(Base):
     __tablename__ = "gallery"
@@ -37,8 +88,18 @@ class Gallery(Base):
     title = Column(String)
     url = Column(String, nullable=False)
     date = Column(String)
-    tags = Column(Text) # JSON string
+    tags = Column(JSONList)
     status = Column(String, default="published")
+    # Set for uploaded images (app.services.image_service); null for external URLs
+    width = Column(Integer)
+    height = Column(Integer)
+    placeholder = Column(Text)
+    variants = Column(JSONDict)
+    variant_widths = Column(JSONDict)
+    __table_args__ = (
+        Index("ix_gallery_status_date_id", "status", "date", "id"),
+        Index("ix_gallery_date_id", "date", "id"),
+    )
 
 class Post(Base):
     __tablename__ = "posts"
@@ -47,10 +108,16 @@ class Post(Base):
     date = Column(String)
     desc = Column(Text)
     url = Column(String)
-    tags = Column(Text) # JSON string
+    tags = Column(JSONList)
     image = Column(String)
     folder = Column(String)
     status = Column(String, default="public")
+    __table_args__ = (
+        Index("ix_posts_status_date_id", "status", "date", "id"),
+        Index("ix_posts_folder_status_date", "folder", "status", "date"),
+        Index("ix_posts_date_id", "date", "id"),
+        Index("ix_posts_url", "url"),
+    )
 
 class Project(Base):
     __tablename__ = "projects"
@@ -58,9 +125,12 @@ class Project(Base):
     name = Column(String, nullable=False)
     description = Column(Text)
     link = Column(String)
-    techStack = Column(Text) # JSON string
+    techStack = Column(JSONList)
     status = Column(String) # Project status: completed, ongoing, etc.
     visibility = Column(String, default="published")
+    __table_args__ = (
+        Index("ix_projects_visibility", "visibility"),
+    )
 
 class Todo(Base):
     __tablename__ = "todos"
@@ -72,6 +142,9 @@ class Todo(Base):
     progress = Column(Integer, default=0)
     icon = Column(String)
     status = Column(String, default="published")
+    __table_args__ = (
+        Index("ix_todos_status_id", "status", "id"),
+    )
 
 class Tool(Base):
     __tablename__ = "tools"
@@ -82,9 +155,80 @@ class Tool(Base):
     icon = Column(String)
     category = Column(String)
     status = Column(String, default="published")
+    __table_args__ = (
+        Index("ix_tools_status_category", "status", "category"),
+    )
 
 class Admin(Base):
     __tablename__ = "admins"
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, nullable=False)
     password = Column(String, nullable=False)
+
+
+class ContentTag(Base):
+    """
+    Normalized tag index shared by every tagged resource.
+    The JSON columns stay the API representation; this table is what tag filters query.
+    """
+    __tablename__ = "content_tags"
+    resource = Column(String, primary_key=True) # table name of the tagged row, e.g. "posts"
+    tag = Column(String, primary_key=True)
+    item_id = Column(Integer, primary_key=True)
+    __table_args__ = (
+        Index("ix_content_tags_item", "resource", "item_id"),
+        {"sqlite_with_rowid": False},
+    )
+
+class FacetCount(Base):
+    """
+    Materialized tag/category/type counts per resource, split by status.
+    Maintained incrementally by the crud write paths.
+    """
+    __tablename__ = "facet_counts"
+    resource = Column(String, primary_key=True)
+    facet = Column(String, primary_key=True) # column name, e.g. "tags", "folder", "type"
+    status = Column(String, primary_key=True) # status/visibility of the counted rows, "" when unset
+    value = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    __table_args__ = (
+        {"sqlite_with_rowid": False},
+    )
+
+class ContentVersion(Base):
+    """
+    Per-resource content version, bumped in the same transaction as every write.
+    Drives response cache invalidation, ETags and Last-Modified.
+    """
+    __tablename__ = "content_versions"
+    resource = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(String, nullable=False) # ISO 8601, UTC
+
+class ChangeJournal(Base):
+    """
+    Append-only log of content changes, one row per changed item, written in
+    the same transaction as the change. Incremental exports replay it from
+    the last id they consumed.
+    """
+    __tablename__ = "change_journal"
+    id = Column(Integer, primary_key=True)
+    resource = Column(String, nullable=False)
+    item_id = Column(Integer, nullable=False)
+    action = Column(String, nullable=False) # create, update or delete
+    changed_at = Column(String, nullable=False) # ISO 8601, UTC
+    # AUTOINCREMENT: ids are never reused after old entries are trimmed
+    __table_args__ = (
+        {"sqlite_autoincrement": True},
+    )
+
+class ArticleFile(Base):
+    """
+    Article files seen by the last sync of frontend/blog, so rescans skip
+    unchanged files and only delete posts whose file the sync has seen go.
+    """
+    __tablename__ = "article_files"
+    path = Column(String, primary_key=True) # relative to the article root, "/"-separated
+    mtime_ns = Column(Integer, nullable=False)
+    size = Column(Integer, nullable=False)
+    digest = Column(String, nullable=False) # blake2b of the content
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, field_validator
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 import json
 from app.models.blog import PostStatus, ContentStatus
 
@@ -31,6 +31,10 @@ class Book(BookBase):
     class Config:
         from_attributes = True
 
+class BookPagination(BaseModel):
+    total: int
+    items: List[Book]
+
 # --- Diaries ---
 class DiaryBase(BaseModel):
     date: str
@@ -53,6 +57,41 @@ class DiaryPagination(BaseModel):
     total: int
     items: List[Diary]
 
+class DiaryCursorPage(BaseModel):
+    items: List[Diary]
+    next_cursor: Optional[str] = None
+
+class DiaryArchiveCounts(BaseModel):
+    count: int
+    moods: Dict[str, int] = {}
+    weathers: Dict[str, int] = {}
+
+class DiaryArchiveMonth(DiaryArchiveCounts):
+    month: Optional[int] = None
+
+class DiaryArchiveYear(DiaryArchiveCounts):
+    year: Optional[int] = None
+    months: List[DiaryArchiveMonth] = []
+
+class DiaryArchive(BaseModel):
+    total: int
+    years: List[DiaryArchiveYear]
+
+# --- Images ---
+class ImageVariants(BaseModel):
+    thumb: str
+    medium: str
+    large: str
+
+class ImageUpload(BaseModel):
+    hash: str
+    url: str # the original
+    width: int
+    height: int
+    placeholder: str # tiny WebP data URI
+    variants: ImageVariants
+    variant_widths: Dict[str, int] # pixel width of each variant, for srcset
+
 # --- Gallery ---
 class GalleryBase(BaseModel):
     title: Optional[str] = None
@@ -60,6 +99,12 @@ class GalleryBase(BaseModel):
     date: Optional[str] = None
     tags: Optional[List[str]] = []
     status: Optional[ContentStatus] = ContentStatus.PUBLISHED
+    # Uploaded images only: grids load variants.thumb and reserve width x height
+    width: Optional[int] = None
+    height: Optional[int] = None
+    placeholder: Optional[str] = None
+    variants: Optional[ImageVariants] = None
+    variant_widths: Optional[Dict[str, int]] = None
 
     @field_validator('tags', mode='before')
     @classmethod
@@ -71,6 +116,14 @@ class Gallery(GalleryBase):
     class Config:
         from_attributes = True
 
+class GalleryCursorPage(BaseModel):
+    items: List[Gallery]
+    next_cursor: Optional[str] = None
+
+class GalleryPagination(BaseModel):
+    total: int
+    items: List[Gallery]
+
 # --- Posts ---
 class PostBase(BaseModel):
     title: str
@@ -99,6 +152,24 @@ class Post(PostBase):
     class Config:
         from_attributes = True
 
+class PostCursorPage(BaseModel):
+    items: List[Post]
+    next_cursor: Optional[str] = None
+
+class PostPagination(BaseModel):
+    total: int
+    items: List[Post]
+
+class TocEntry(BaseModel):
+    depth: int
+    slug: str
+    text: str
+
+class PostContent(BaseModel):
+    id: int
+    html: str
+    toc: List[TocEntry]
+
 # --- Projects ---
 class ProjectBase(BaseModel):
     name: str
@@ -133,6 +204,14 @@ class Todo(TodoBase):
     class Config:
         from_attributes = True
 
+class TodoCursorPage(BaseModel):
+    items: List[Todo]
+    next_cursor: Optional[str] = None
+
+class TodoPagination(BaseModel):
+    total: int
+    items: List[Todo]
+
 # --- Tools ---
 class ToolBase(BaseModel):
     name: str
@@ -147,7 +226,40 @@ class Tool(ToolBase):
     class Config:
         from_attributes = True
 
+# --- Search ---
+class SearchResult(BaseModel):
+    type: str # posts, diaries or projects
+    id: int
+    title: Optional[str] = None
+    date: Optional[str] = None
+    status: Optional[str] = None
+    snippet: str = "" # excerpt with matches wrapped in <mark>
+    score: Optional[float] = None # bm25 relevance, higher is better
+
+class SearchPage(BaseModel):
+    total: int
+    items: List[SearchResult]
+
+# --- Batch ---
+class BatchAction(BaseModel):
+    ids: List[int]
+    action: Literal["set_status", "add_tags", "remove_tags", "delete"]
+    status: Optional[str] = None # for set_status (visibility for projects)
+    tags: List[str] = [] # for add_tags / remove_tags (tech stack for projects)
+
+class BatchResult(BaseModel):
+    status: str = "success"
+    action: str
+    affected: List[int]
+
 # --- Auth ---
 class LoginRequest(BaseModel):
     username: str
     password: str
+
+class LoginResponse(BaseModel):
+    message: str
+    status: str
+    access_token: str # send as "Authorization: Bearer <token>" to /api/admin
+    token_type: str = "bearer"
+    expires_in: int # seconds
@@ -1,5 +1,116 @@
+import codecs
 import os
+import tempfile
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.timing import timed
+from app.utils.tag_utils import parse_tag_list
+
+# Upload read size; memory use stays around one chunk regardless of file size
+CHUNK_SIZE = 64 * 1024
+
+def _current_umask() -> int:
+    # The umask can only be read by setting it
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+# Mode of a file created with open(): mkstemp's 0600 would hide articles from the web server.
+# Read once at import, before the server starts any threads.
+ARTICLE_FILE_MODE = 0o666 & ~_current_umask()
+
+def build_frontmatter(title: str, date: str, tags: str, desc: str) -> str:
+    # The admin forms send tags as a JSON array, imports as "a,b"
+    if tags and tags.lstrip().startswith("["):
+        tags_list = parse_tag_list(tags)
+    else:
+        tags_list = tags.split(",") if tags else []
+    tags_str = ", ".join([f"'{t.strip()}'" for t in tags_list])
+    use_desc = desc if desc else ""
+
+    return f"""---
+layout: ../../../layouts/MarkdownLayout.astro
+title: {title}
+date: {date}
+tags: [{tags_str}]
+description: {use_desc}
+---
+
+"""
+
+def _iter_normalized_text(src, encoding: str, errors: str = "strict"):
+    """
+    Decodes a binary file chunk by chunk, normalizing line endings on the fly.
+    A trailing "\r" is held back until the next chunk shows whether it starts a "\r\n".
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+    pending = ""
+    while True:
+        chunk = src.read(CHUNK_SIZE)
+        final = not chunk
+        text = pending + decoder.decode(chunk, final=final)
+        pending = ""
+        if not final and text.endswith("\r"):
+            text, pending = text[:-1], "\r"
+        # Normalize line endings to prevent double newlines on Windows
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        if text:
+            yield text
+        if final:
+            return
+
+def _write_normalized(src, dst, encoding: str, errors: str, frontmatter: str):
+    chunks = _iter_normalized_text(src, encoding, errors)
+    # Buffer only until the first non-whitespace characters decide whether frontmatter is present
+    head = ""
+    for text in chunks:
+        head += text
+        if len(head.lstrip()) >= 3:
+            break
+    if not head.lstrip().startswith("---"):
+        dst.write(frontmatter)
+    dst.write(head)
+    for text in chunks:
+        dst.write(text)
+
+def stage_article(src, file_path: str, frontmatter: str) -> str:
+    """
+    Writes an article to a temp file next to file_path and returns the temp path.
+    os.replace() it onto file_path to publish it, or unlink it to discard it.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or ".", prefix=".upload-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as dst:
+            try:
+                _write_normalized(src, dst, "utf-8", "strict", frontmatter)
+            except UnicodeDecodeError:
+                # Not UTF-8: start over as GBK
+                src.seek(0)
+                dst.seek(0)
+                dst.truncate()
+                _write_normalized(src, dst, "gbk", "ignore", frontmatter)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.chmod(tmp_path, ARTICLE_FILE_MODE)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+def write_article_atomically(src, file_path: str, frontmatter: str):
+    # Write next to the target and rename over it, so readers see the old or the new file, never a partial one
+    tmp_path = stage_article(src, file_path, frontmatter)
+    try:
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def _forget_rendered(file_path: str):
+    # Imported here: render_service builds on this module
+    from app.services.render_service import render_cache
+    render_cache.invalidate(file_path)
 
 async def save_article_file(
     file: UploadFile,
@@ -11,46 +122,97 @@ async def save_article_file(
 ) -> str:
     """
     Saves an uploaded article file with frontmatter and normalized line endings.
+    The upload is streamed in chunks to a temp file that is renamed into place,
+    all in a worker thread so the event loop is never blocked.
     Returns the relative URL path for the article.
     """
     os.makedirs(base_path, exist_ok=True)
     file_path = os.path.join(base_path, file.filename)
-    
-    content = await file.read()
-    try:
-        content_str = content.decode("utf-8")
-    except UnicodeDecodeError:
-        content_str = content.decode("gbk", errors="ignore")
 
-    # Normalize line endings to prevent double newlines on Windows
-    content_str = content_str.replace("\r\n", "\n").replace("\r", "\n")
+    frontmatter = build_frontmatter(title, date, tags, desc)
+    await file.seek(0)
+    with timed("file"):
+        await run_in_threadpool(write_article_atomically, file.file, file_path, frontmatter)
+    _forget_rendered(file_path)
 
-    if not content_str.strip().startswith("---"):
-        # Create frontmatter
-        tags_list = tags.split(",") if tags else []
-        tags_str = ", ".join([f"'{t.strip()}'" for t in tags_list])
-        use_desc = desc if desc else ""
-        
-        frontmatter = f"""---
-layout: ../../../layouts/MarkdownLayout.astro
-title: {title}
-date: {date}
-tags: [{tags_str}]
-description: {use_desc}
----
-
-"""
-        content_str = frontmatter + content_str
-    
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(content_str)
-        
     filename_no_ext = os.path.splitext(file.filename)[0]
     return f"/user/posts/{filename_no_ext}"
 
-def delete_article_file(url: str, base_path: str = "frontend/blog") -> bool:
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    return value
+
+def parse_frontmatter(content_str: str):
     """
-    Deletes the physical file associated with an article URL.
+    Splits a markdown document into (frontmatter dict, body).
+    Understands the subset of YAML used by article frontmatter:
+    `key: value` scalars, inline `[a, 'b']` lists and `- item` block lists.
+    """
+    if not content_str.startswith("---"):
+        return {}, content_str
+    end = content_str.find("\n---", 3)
+    if end == -1:
+        return {}, content_str
+    block = content_str[3:end]
+    body = content_str[end + 4:]
+    body = body[body.find("\n") + 1:] if "\n" in body else ""
+
+    meta = {}
+    list_key = None
+    for line in block.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and list_key:
+            meta[list_key].append(_unquote(stripped[2:]))
+            continue
+        key, sep, value = line.partition(":")
+        if not sep:
+            continue
+        key, value = key.strip(), value.strip()
+        if not value:
+            # Start of a block list (or an empty value)
+            meta[key] = []
+            list_key = key
+            continue
+        list_key = None
+        if value.startswith("[") and value.endswith("]"):
+            meta[key] = [_unquote(v) for v in value[1:-1].split(",") if v.strip()]
+        else:
+            meta[key] = _unquote(value)
+    return meta, body
+
+def frontmatter_fields(meta: dict) -> dict:
+    """
+    Maps parsed frontmatter to posts columns (title, date, tags as a list,
+    desc, image), leaving out the keys the frontmatter does not set.
+    """
+    fields = {}
+    if meta.get("title"):
+        fields["title"] = str(meta["title"])
+    if meta.get("date"):
+        fields["date"] = str(meta["date"])
+    if "tags" in meta:
+        tags = meta["tags"]
+        if isinstance(tags, str):
+            tags = [t.strip() for t in tags.split(",") if t.strip()]
+        elif tags and tags[0].startswith("["):
+            # Written by older uploads, which split the form's JSON array on commas
+            tags = parse_tag_list(",".join(tags)) or tags
+        fields["tags"] = tags
+    desc = meta.get("description") or meta.get("desc")
+    if desc:
+        fields["desc"] = desc
+    image = meta.get("image") or meta.get("cover")
+    if image:
+        fields["image"] = image
+    return fields
+
+def resolve_article_path(url: str, base_path: str = "frontend/blog"):
+    """
+    Returns the existing .md/.mdx file behind an article URL, or None.
     """
     if url and "/user/posts/" in url:
         filename_no_ext = url.split("/user/posts/")[-1]
@@ -58,10 +220,35 @@ def delete_article_file(url: str, base_path: str = "frontend/blog") -> bool:
         for ext in possible_extensions:
             file_path = os.path.join(base_path, filename_no_ext + ext)
             if os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                    print(f"Deleted old file: {file_path}")
-                    return True
-                except Exception as e:
-                    print(f"Error deleting old file {file_path}: {e}")
+                return file_path
+    return None
+
+def read_article_body(url: str, base_path: str = "frontend/blog") -> str:
+    """
+    Reads the markdown body of an article file, without its frontmatter.
+    Returns an empty string if the file does not exist.
+    """
+    with timed("file"):
+        file_path = resolve_article_path(url, base_path)
+        if not file_path:
+            return ""
+        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+            content = f.read()
+    _, body = parse_frontmatter(content)
+    return body.strip()
+
+def delete_article_file(url: str, base_path: str = "frontend/blog") -> bool:
+    """
+    Deletes the physical file associated with an article URL.
+    """
+    with timed("file"):
+        file_path = resolve_article_path(url, base_path)
+        if file_path:
+            try:
+                os.remove(file_path)
+                _forget_rendered(file_path)
+                print(f"Deleted old file: {file_path}")
+                return True
+            except Exception as e:
+                print(f"Error deleting old file {file_path}: {e}")
     return False
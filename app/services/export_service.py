@@ -0,0 +1,400 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.core.database import ReadSessionLocal
+from app.crud import blog as crud
+from app.core.serialization import row_encoder
+from app.models import blog as models
+from app.schemas import blog as schemas
+from app.utils.tag_utils import format_facet_values
+
+MANIFEST_NAME = "manifest.json"
+# Chunk membership of every exported list, kept for incremental runs.
+# Dot-named so static hosts don't serve it
+STATE_NAME = ".export-state.json"
+FEED_NAME = "feed.json"
+FEED_SIZE = 20
+# Bump when the layout of the exported tree changes; older trees are rebuilt in full
+EXPORT_FORMAT = 2
+# Rows loaded per IN (...) query when only some chunks are rebuilt
+LOAD_BATCH_SIZE = 500
+
+def _folder_and_parents(folder: str) -> list[str]:
+    # A category lists its subfolders' posts too, like ?folder= on the API
+    parts = folder.split("/")
+    return ["/".join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+def _diary_months(row) -> list[str]:
+    return [f"{row.year}-{row.month:02d}"] if row.year is not None and row.month is not None else []
+
+# Same rows and order as the /api/user list endpoints, plus the filtered lists
+# (groups) derived from them. "newest_first" lists gain new items at their head.
+EXPORTED_RESOURCES = {
+    "posts": {
+        "model": models.Post, "schema": schemas.Post, "where": models.Post.status == "public",
+        "order": (models.Post.date.desc(), models.Post.id.desc()), "newest_first": True,
+        "key_columns": (models.Post.tags, models.Post.folder),
+        "groups": {
+            "posts/tags": lambda row: row.tags or [],
+            "posts/categories": lambda row: _folder_and_parents(row.folder) if row.folder else [],
+        },
+    },
+    "diaries": {
+        "model": models.Diary, "schema": schemas.Diary, "where": None,
+        "order": (models.Diary.date.desc(), models.Diary.id.desc()), "newest_first": True,
+        "key_columns": (models.Diary.year, models.Diary.month),
+        "groups": {
+            "diaries/years": lambda row: [str(row.year)] if row.year is not None else [],
+            "diaries/months": _diary_months,
+        },
+    },
+    "gallery": {
+        "model": models.Gallery, "schema": schemas.Gallery, "where": models.Gallery.status == "published",
+        "order": (models.Gallery.date.desc(), models.Gallery.id.desc()), "newest_first": True,
+        "key_columns": (models.Gallery.tags,),
+        "groups": {"gallery/tags": lambda row: row.tags or []},
+    },
+    "books": {
+        "model": models.Book, "schema": schemas.Book, "where": models.Book.status == "published",
+        "order": (models.Book.id,), "newest_first": False,
+        "key_columns": (models.Book.tags,),
+        "groups": {"books/tags": lambda row: row.tags or []},
+    },
+    "projects": {
+        "model": models.Project, "schema": schemas.Project, "where": models.Project.visibility == "published",
+        "order": (models.Project.id,), "newest_first": False, "key_columns": (), "groups": {},
+    },
+    "todos": {
+        "model": models.Todo, "schema": schemas.Todo, "where": models.Todo.status == "published",
+        "order": (models.Todo.id.desc(),), "newest_first": True, "key_columns": (), "groups": {},
+    },
+    "tools": {
+        "model": models.Tool, "schema": schemas.Tool, "where": models.Tool.status == "published",
+        "order": (models.Tool.id,), "newest_first": False, "key_columns": (), "groups": {},
+    },
+}
+
+def _facets(db: Session, resource: str, facet: str, key: str, status: str = None) -> list:
+    return format_facet_values(crud.get_facet_counts(db, resource, facet, status=status), key=key, with_counts=True)
+
+def _feed(db: Session) -> dict:
+    # JSON Feed 1.1 of the newest public posts
+    feed = {"version": "https://jsonfeed.org/version/1.1", "title": config.SITE_TITLE, "items": []}
+    if config.SITE_URL:
+        feed["home_page_url"] = config.SITE_URL
+    for post in crud.get_posts(db, limit=FEED_SIZE, status="public"):
+        item = {
+            "id": str(post.id),
+            "url": f"{config.SITE_URL}{post.url or ''}",
+            "title": post.title,
+            "summary": post.desc or "",
+            "date_published": post.date,
+            "tags": post.tags or [],
+        }
+        if post.image:
+            item["image"] = post.image
+        feed["items"].append(item)
+    return feed
+
+# The index endpoints, in their ?counts=true form, by the resource they are built from
+DOCUMENTS = {
+    "articles/tags": ("posts", lambda db: {"tags": _facets(db, "posts", "tags", "tag", status="public")}),
+    "articles/categories": ("posts", lambda db: {"categories": [
+        {"path": folder, "count": count} for folder, count in crud.get_facet_counts(db, "posts", "folder", status="public")
+    ]}),
+    "books/tags": ("books", lambda db: {"tags": _facets(db, "books", "tags", "tag")}),
+    "gallery/tags": ("gallery", lambda db: {"tags": _facets(db, "gallery", "tags", "tag")}),
+    "todos/types": ("todos", lambda db: {"types": _facets(db, "todos", "type", "type")}),
+    "projects/tech-stacks": ("projects", lambda db: _facets(db, "projects", "techStack", "tag", status="published")),
+    "diaries/archive": ("diaries", crud.get_diary_archive),
+}
+
+def _value_dir(value: str) -> str:
+    # Tags and folders may hold "/", spaces or any script: name their directory by digest
+    return hashlib.blake2b(value.encode(), digest_size=6).hexdigest()
+
+def _write_atomic(target: str, body: bytes):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, target)
+
+def _write_file(out_dir: str, path: str, body: bytes) -> tuple[str, bool]:
+    """
+    Writes body under its content-hashed name unless that file already exists.
+    Returns (relative name, written).
+    """
+    name = f"{path}.{hashlib.blake2b(body, digest_size=8).hexdigest()}.json"
+    target = os.path.join(out_dir, name)
+    if os.path.exists(target):
+        return name, False
+    _write_atomic(target, body)
+    return name, True
+
+def _write_stable(out_dir: str, name: str, body: bytes) -> tuple[str, bool]:
+    # Files with a fixed name (the feed) are rewritten only when their content changes
+    target = os.path.join(out_dir, name)
+    if os.path.exists(target):
+        with open(target, "rb") as f:
+            if f.read() == body:
+                return name, False
+    _write_atomic(target, body)
+    return name, True
+
+def _read_json(path: str):
+    try:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return None
+
+def _chunks(ids: list[int], page_size: int, newest_first: bool) -> list[list[int]]:
+    """
+    Splits a list into chunks counted from its oldest end, so new items only
+    change the newest chunk and the others keep their content.
+    """
+    anchored = ids[::-1] if newest_first else ids
+    return [anchored[i:i + page_size] for i in range(0, len(anchored), page_size)]
+
+def _load_encoded(db: Session, spec: dict, ids: set, list_size: int) -> dict:
+    # {id: encoded row} for the rows of the chunks being rebuilt
+    model = spec["model"]
+    encode = row_encoder(spec["schema"])
+    query = db.query(model)
+    # Both paths keep the public filter, so a hidden row is never exported
+    if spec["where"] is not None:
+        query = query.filter(spec["where"])
+    if len(ids) > list_size // 2:
+        return {row.id: encode(row) for row in query if row.id in ids}
+    encoded = {}
+    ordered = sorted(ids)
+    for i in range(0, len(ordered), LOAD_BATCH_SIZE):
+        for row in query.filter(model.id.in_(ordered[i:i + LOAD_BATCH_SIZE])):
+            encoded[row.id] = encode(row)
+    return encoded
+
+def _build_resource(db: Session, executor, out_dir: str, resource: str, page_size: int, old_state: dict, changed, counts: dict):
+    """
+    Rebuilds the list and groups of one resource. A chunk is rewritten only if
+    its members differ from old_state or include an id in `changed` (None
+    rewrites every chunk). Returns (manifest entries, new state).
+    """
+    spec = EXPORTED_RESOURCES[resource]
+    model = spec["model"]
+    query = db.query(model.id, *spec["key_columns"])
+    if spec["where"] is not None:
+        query = query.filter(spec["where"])
+    # Only ids and group values here: full rows are loaded for rebuilt chunks alone
+    lists = {resource: []}
+    members = {group: {} for group in spec["groups"]}
+    for row in query.order_by(*spec["order"]):
+        lists[resource].append(row.id)
+        for group, values_of in spec["groups"].items():
+            for value in dict.fromkeys(values_of(row)):
+                members[group].setdefault(value, []).append(row.id)
+    for group, values in members.items():
+        for value, ids in values.items():
+            lists[f"{group}/{_value_dir(value)}"] = ids
+
+    state, rebuild, needed = {}, [], set()
+    for path, ids in lists.items():
+        chunks = _chunks(ids, page_size, spec["newest_first"])
+        old = old_state.get(path, {"chunks": [], "names": []})
+        names = []
+        for index, chunk in enumerate(chunks):
+            unchanged = (
+                changed is not None and index < len(old["chunks"])
+                and old["chunks"][index] == chunk and changed.isdisjoint(chunk)
+            )
+            names.append(old["names"][index] if unchanged else None)
+            if not unchanged:
+                rebuild.append((path, index, chunk))
+                needed.update(chunk)
+        state[path] = {"chunks": chunks, "names": names}
+
+    encoded = _load_encoded(db, spec, needed, len(lists[resource]))
+    futures = []
+    for path, index, chunk in rebuild:
+        # Rows are listed and loaded in one snapshot; skip any id that still went missing
+        items = [encoded[item_id] for item_id in (chunk[::-1] if spec["newest_first"] else chunk) if item_id in encoded]
+        body = b'{"items":[' + b",".join(items) + b"]}"
+        futures.append((path, index, executor.submit(_write_file, out_dir, f"{path}/chunk-{index + 1}", body)))
+    for path, index, future in futures:
+        state[path]["names"][index], written = future.result()
+        counts["rebuilt"] += 1
+        counts["written"] += written
+
+    def entry(path):
+        # Pages in API order: for newest-first lists the newest (possibly partial) chunk comes first
+        names = state[path]["names"]
+        return {"total": len(lists[path]), "pages": names[::-1] if spec["newest_first"] else names}
+
+    entries = {
+        "lists": {resource: entry(resource)},
+        "groups": {
+            group: {value: entry(f"{group}/{_value_dir(value)}") for value in sorted(values)}
+            for group, values in members.items()
+        },
+    }
+    return entries, state
+
+def prune_export(out_dir: str, manifest: dict) -> int:
+    """
+    Deletes exported JSON files the manifest no longer references.
+    Returns the number of files removed.
+    """
+    keep = {MANIFEST_NAME, STATE_NAME}
+
+    def collect(entry):
+        if isinstance(entry, str):
+            keep.add(entry)
+        elif isinstance(entry, list):
+            for value in entry:
+                collect(value)
+        elif isinstance(entry, dict):
+            for value in entry.values():
+                collect(value)
+
+    collect([manifest["lists"], manifest["groups"], manifest["documents"]])
+    removed = 0
+    for root, _, files in os.walk(out_dir):
+        for file_name in files:
+            rel_path = os.path.relpath(os.path.join(root, file_name), out_dir).replace(os.sep, "/")
+            if rel_path.endswith(".json") and rel_path not in keep:
+                os.remove(os.path.join(root, file_name))
+                removed += 1
+    return removed
+
+def export_static(db: Session, out_dir: str, page_size: int = 100, workers: int = 8, prune: bool = False, full: bool = False) -> dict:
+    """
+    Renders the public API into a tree of static JSON files under out_dir:
+
+    - every list endpoint, in chunks of page_size items ({"items": [...]});
+    - per-tag / per-category (posts, gallery, books) and per-year / per-month
+      (diaries) filtered lists, chunked the same way;
+    - the tag, category, type and archive index documents, and feed.json,
+      a JSON Feed of the newest posts.
+
+    Chunks are counted from the oldest end of each list, so a new item only
+    changes the newest chunk. File names carry a digest of their content:
+    unchanged files keep their names (and CDN cache entries). manifest.json,
+    written last, maps every list ({"total", "pages"} in API order), group
+    and document to its files.
+
+    Unless `full` is set, the previous export is updated in place: only
+    resources with change_journal entries since then are rebuilt, and of
+    those only the chunks whose items changed. Without a usable previous
+    export (none yet, other format or page size, journal trimmed past it)
+    everything is rebuilt.
+    Returns a summary: {"mode", "journal_id", "files", "rebuilt", "written", "pruned", "seconds"}.
+    """
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    # pysqlite only opens transactions for writes: begin one explicitly, so every
+    # read below sees the snapshot taken with the journal head
+    connection = db.connection()
+    if not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN")
+    head = crud.get_journal_head(db)
+    old_manifest = _read_json(os.path.join(out_dir, MANIFEST_NAME))
+    old_state = _read_json(os.path.join(out_dir, STATE_NAME))
+    incremental = (
+        not full and old_manifest is not None and old_state is not None
+        and old_state.get("format") == EXPORT_FORMAT and old_state.get("page_size") == page_size
+        and old_state["journal_id"] <= head
+        # Every entry after the previous export must still be in the journal
+        and crud.get_journal_tail(db) <= old_state["journal_id"] + 1
+    )
+    if incremental:
+        changes = crud.get_changes_since(db, old_state["journal_id"], head)
+        touched = [resource for resource in EXPORTED_RESOURCES if resource in changes]
+        manifest, state = old_manifest, old_state
+    else:
+        changes, touched = {}, list(EXPORTED_RESOURCES)
+        manifest = {"lists": {}, "groups": {}, "documents": {}}
+        state = {"resources": {}}
+
+    counts = {"rebuilt": 0, "written": 0}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for resource in touched:
+            entries, state["resources"][resource] = _build_resource(
+                db, executor, out_dir, resource, page_size, state["resources"].get(resource, {}),
+                changes.get(resource) if incremental else None, counts,
+            )
+            manifest["lists"].update(entries["lists"])
+            manifest["groups"].update(entries["groups"])
+
+        futures = [
+            (path, executor.submit(_write_file, out_dir, path, orjson.dumps(build(db))))
+            for path, (resource, build) in DOCUMENTS.items() if resource in touched
+        ]
+        if "posts" in touched:
+            futures.append(("feed", executor.submit(_write_stable, out_dir, FEED_NAME, orjson.dumps(_feed(db)))))
+        for path, future in futures:
+            manifest["documents"][path], written = future.result()
+            counts["rebuilt"] += 1
+            counts["written"] += written
+    # Every read is done: end the snapshot so it does not hold back WAL checkpoints
+    db.rollback()
+
+    if touched:
+        generated_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        manifest = {"format": EXPORT_FORMAT, "generated_at": generated_at, "journal_id": head, "page_size": page_size,
+                    "lists": manifest["lists"], "groups": manifest["groups"], "documents": manifest["documents"]}
+        state = {"format": EXPORT_FORMAT, "journal_id": head, "page_size": page_size, "resources": state["resources"]}
+        # State first, manifest last: a reader never sees a manifest naming missing files
+        _write_atomic(os.path.join(out_dir, STATE_NAME), orjson.dumps(state))
+        _write_atomic(os.path.join(out_dir, MANIFEST_NAME), orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+
+    pruned = prune_export(out_dir, manifest) if prune else 0
+    files = sum(len(entry["pages"]) for entry in manifest["lists"].values())
+    files += sum(len(entry["pages"]) for values in manifest["groups"].values() for entry in values.values())
+    return {
+        "mode": "incremental" if incremental else "full",
+        "journal_id": head,
+        "files": files + len(manifest["documents"]),
+        **counts,
+        "pruned": pruned,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+class ExportScheduler:
+    """
+    Updates the export in EXPORT_DIR from a background thread after admin
+    writes. Writes less than EXPORT_DEBOUNCE_MS apart share one run.
+    """
+    def __init__(self):
+        self._pending = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def notify(self):
+        if not config.EXPORT_DIR:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="static-export", daemon=True)
+                self._thread.start()
+        self._pending.set()
+
+    def _run(self):
+        while True:
+            self._pending.wait()
+            time.sleep(config.EXPORT_DEBOUNCE_MS / 1000)
+            self._pending.clear()
+            try:
+                with ReadSessionLocal() as db:
+                    report = export_static(db, config.EXPORT_DIR, page_size=config.EXPORT_PAGE_SIZE)
+                print(f"Static export ({report['mode']}) up to change {report['journal_id']}: {report['written']} file(s) written.")
+            except Exception as e:
+                print(f"Error updating static export: {e}")
+
+export_scheduler = ExportScheduler()
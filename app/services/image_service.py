@@ -0,0 +1,174 @@
+import asyncio
+import base64
+import hashlib
+import io
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import orjson
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from app.core import config
+from app.core.timing import timed
+
+# Longest edge of each generated WebP variant; smaller images are not upscaled
+IMAGE_VARIANTS = {"thumb": 320, "medium": 960, "large": 1920}
+# Longest edge of the blurred placeholder, inlined as a data URI
+PLACEHOLDER_EDGE = 16
+# Accepted originals and the extension they are stored with
+IMAGE_FORMATS = {"JPEG": "jpg", "PNG": "png", "GIF": "gif", "WEBP": "webp"}
+# Upload read size; an oversized upload is rejected after at most one chunk past the limit
+READ_CHUNK_SIZE = 1024 * 1024
+
+def _relative_path(kind: str, digest: str, ext: str) -> str:
+    # Two-character fan-out keeps directories small
+    return f"images/{kind}/{digest[:2]}/{digest}.{ext}"
+
+def _meta_path(digest: str) -> str:
+    # {"ext", "width", "height", "placeholder", "variant_widths"} of a processed image
+    return _relative_path("meta", digest, "json")
+
+def _write_once(root: str, relative_path: str, data: bytes):
+    # Content-addressed: an existing file already has these bytes
+    path = os.path.join(root, relative_path)
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _encode_webp(image: Image.Image, edge: int, quality: int) -> tuple[bytes, int]:
+    # (WebP bytes, width of the resized image)
+    resized = image.copy()
+    resized.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    resized.save(buffer, "WEBP", quality=quality, method=4)
+    return buffer.getvalue(), resized.width
+
+def variant_widths(width: int, height: int) -> dict:
+    """
+    Width of each IMAGE_VARIANTS entry for a width x height image, sized as
+    Image.thumbnail does. For images processed before the widths were stored.
+    """
+    widths = {}
+    for name, edge in IMAGE_VARIANTS.items():
+        if width <= edge and height <= edge:
+            widths[name] = width
+        elif width >= height:
+            widths[name] = edge
+        else:
+            # thumbnail rounds to whichever neighbour keeps the aspect ratio closest
+            exact = edge * width / height
+            widths[name] = max(min(math.floor(exact), math.ceil(exact), key=lambda n: abs(width / height - n / edge)), 1)
+    return widths
+
+def process_image(data: bytes, digest: str, upload_dir: str, quality: int) -> dict:
+    """
+    Decodes an uploaded image, stores the original and its WebP variants
+    under upload_dir and returns its metadata.
+    Runs on the process pool; raises ValueError for files that are not a
+    supported image.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        ext = IMAGE_FORMATS.get(image.format)
+        if ext is None:
+            raise ValueError(f"Unsupported image format: {image.format}")
+        # Animated GIF/WebP: the first frame
+        image.load()
+    except UnidentifiedImageError:
+        raise ValueError("Not an image file")
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Invalid image: {e}")
+    # Phone photos are stored sideways with an EXIF rotation
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    _write_once(upload_dir, _relative_path("original", digest, ext), data)
+    widths = {}
+    for name, edge in IMAGE_VARIANTS.items():
+        body, widths[name] = _encode_webp(image, edge, quality)
+        _write_once(upload_dir, _relative_path(name, digest, "webp"), body)
+    placeholder, _ = _encode_webp(image, PLACEHOLDER_EDGE, 30)
+    meta = {
+        "ext": ext,
+        "width": image.width,
+        "height": image.height,
+        "placeholder": "data:image/webp;base64," + base64.b64encode(placeholder).decode(),
+        # Variants are never upscaled: srcset needs their real widths
+        "variant_widths": widths,
+    }
+    # Written last: its presence means every variant is on disk
+    _write_once(upload_dir, _meta_path(digest), orjson.dumps(meta))
+    return meta
+
+def _public_url(relative_path: str) -> str:
+    return f"{config.UPLOAD_URL}/{relative_path}"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs threads (the server's threadpool) is unsafe
+            _pool = ProcessPoolExecutor(max_workers=config.IMAGE_WORKERS or None, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def shutdown_image_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+def _load_meta(digest: str):
+    try:
+        with open(os.path.join(config.UPLOAD_DIR, _meta_path(digest)), "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+async def store_image(file: UploadFile) -> dict:
+    """
+    Stores an uploaded image by the hash of its contents and returns
+    {"hash", "url", "width", "height", "placeholder", "variants", "variant_widths"},
+    url being the original, variants {"thumb", "medium", "large"} WebP URLs
+    and variant_widths their widths in pixels.
+    An image uploaded before is not processed again. Decoding and resizing
+    run on a process pool, off the event loop and the GIL.
+    Raises ValueError for files that are too large or not an image.
+    """
+    limit = config.IMAGE_MAX_MB * 1024 * 1024
+    chunks, size = [], 0
+    while chunk := await file.read(READ_CHUNK_SIZE):
+        size += len(chunk)
+        if size > limit:
+            raise ValueError(f"Image larger than {config.IMAGE_MAX_MB} MB")
+        chunks.append(chunk)
+    data = b"".join(chunks)
+    digest = await run_in_threadpool(lambda: hashlib.blake2b(data, digest_size=16).hexdigest())
+    meta = await run_in_threadpool(_load_meta, digest)
+    if meta is None:
+        with timed("image"):
+            meta = await asyncio.get_running_loop().run_in_executor(
+                _get_pool(), process_image, data, digest, config.UPLOAD_DIR, config.IMAGE_WEBP_QUALITY
+            )
+    return {
+        "hash": digest,
+        "url": _public_url(_relative_path("original", digest, meta["ext"])),
+        "width": meta["width"],
+        "height": meta["height"],
+        "placeholder": meta["placeholder"],
+        "variants": {name: _public_url(_relative_path(name, digest, "webp")) for name in IMAGE_VARIANTS},
+        "variant_widths": meta.get("variant_widths") or variant_widths(meta["width"], meta["height"]),
+    }
@@ -0,0 +1,208 @@
+import io
+import json
+import os
+import posixpath
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.crud import blog as crud
+from app.services.article_service import build_frontmatter, stage_article, parse_frontmatter, frontmatter_fields
+
+ARTICLE_EXTENSIONS = (".md", ".mdx")
+# Rows per posts transaction
+IMPORT_BATCH_SIZE = 500
+
+def _member_path(name: str):
+    """
+    Returns (path, error) for an archive member name; (None, None) for
+    members that are not articles or are metadata (__MACOSX/, dotfiles).
+    """
+    if not name.lower().endswith(ARTICLE_EXTENSIONS):
+        return None, None
+    # Archive paths are untrusted: reject anything that would land outside base_path
+    path = posixpath.normpath(name.replace("\\", "/")).lstrip("/")
+    if path == ".." or path.startswith("../"):
+        return None, "Unsafe path"
+    if path.startswith("__MACOSX/") or "/." in f"/{path}":
+        return None, None
+    return path, None
+
+def _check_member(name: str, size: int):
+    # (path, error) as in _member_path, with the size limit applied before anything is read
+    path, error = _member_path(name)
+    if path and size > config.IMPORT_MAX_FILE_MB * 1024 * 1024:
+        return path, f"File larger than {config.IMPORT_MAX_FILE_MB} MB"
+    return path, error
+
+def iter_archive_articles(archive):
+    """
+    Yields (path, bytes, error) for every .md/.mdx file in a zip or tar archive:
+    bytes is None and error set for unsafe paths and oversized files.
+    `archive` is a path or a seekable binary file object.
+    """
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                # file_size is the uncompressed size; reads stop there even if the header lies
+                path, error = _check_member(info.filename, info.file_size)
+                if error:
+                    yield path or info.filename, None, error
+                elif path:
+                    yield path, zf.read(info), None
+        return
+    if hasattr(archive, "seek"):
+        archive.seek(0)
+    try:
+        tf = tarfile.open(archive, mode="r:*") if isinstance(archive, (str, os.PathLike)) else tarfile.open(fileobj=archive, mode="r:*")
+    except tarfile.TarError:
+        raise ValueError("Unsupported archive, expected a zip or tar file")
+    with tf:
+        for member in tf:
+            if not member.isfile():
+                continue
+            path, error = _check_member(member.name, member.size)
+            if error:
+                yield path or member.name, None, error
+            elif path:
+                yield path, tf.extractfile(member).read(), None
+
+def _decode(data: bytes) -> str:
+    try:
+        content_str = data.decode("utf-8")
+    except UnicodeDecodeError:
+        content_str = data.decode("gbk", errors="ignore")
+    return content_str.replace("\r\n", "\n").replace("\r", "\n")
+
+def _stage_article(path: str, data: bytes, status: str, base_path: str):
+    """
+    Writes one archive member to a temp file under base_path.
+    Returns (posts row, article body, temp path, file path); runs on the worker pool.
+    """
+    meta, _ = parse_frontmatter(_decode(data).lstrip())
+    fields = frontmatter_fields(meta)
+    folder, filename = posixpath.split(path)
+    stem = posixpath.splitext(path)[0]
+    title = fields.get("title") or posixpath.splitext(filename)[0]
+    tags = fields.get("tags") or []
+    desc = fields.get("desc")
+    date = fields.get("date")
+
+    file_path = os.path.join(base_path, *path.split("/"))
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    frontmatter = build_frontmatter(title, date or "", ",".join(tags), desc)
+    tmp_path = stage_article(io.BytesIO(data), file_path, frontmatter)
+    # The search index reads the body from here, the target is not replaced until the row commits
+    with open(tmp_path, "r", encoding="utf-8", errors="ignore") as f:
+        _, body = parse_frontmatter(f.read())
+
+    row = {
+        "title": title,
+        "date": date,
+        "folder": folder or None,
+        "tags": json.dumps(tags, ensure_ascii=False),
+        "status": status,
+        "desc": desc,
+        "url": f"/user/posts/{stem}",
+        "image": fields.get("image"),
+    }
+    return row, body.strip(), tmp_path, file_path
+
+def import_articles(
+    db: Session,
+    archive,
+    status: str = "draft",
+    base_path: str = "frontend/blog",
+    workers: int = 8,
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> list[dict]:
+    """
+    Imports every .md/.mdx file of an archive as an article.
+
+    Files are staged on a worker pool; posts rows are upserted (matched by url)
+    in batched transactions, and a batch's files replace the old ones only once
+    its transaction has committed. The folder is the file's directory in the archive,
+    and title/date/tags/description come from its frontmatter when present.
+    New posts get `status`; posts that already exist keep theirs.
+    Returns one report entry per file: {"file", "status", "id"?, "url"?, "error"?}.
+    """
+    if status == "published":
+        status = "public"
+    report = []
+    batch = []
+    seen_urls = set()
+
+    def flush():
+        if not batch:
+            return
+        try:
+            # Re-importing a file updates its content but keeps the status it was given since
+            results = crud.upsert_posts(
+                db, [row for _, (row, *_) in batch], create_only=("status",),
+                bodies={row["url"]: body for _, (row, body, *_) in batch}
+            )
+        except Exception as e:
+            db.rollback()
+            for entry, (_, _, tmp_path, _) in batch:
+                os.unlink(tmp_path)
+                entry.update(status="error", error=f"Database error: {e}")
+        else:
+            for (entry, (row, _, tmp_path, file_path)), (post_id, created) in zip(batch, results):
+                try:
+                    os.replace(tmp_path, file_path)
+                except OSError as e:
+                    os.unlink(tmp_path)
+                    entry.update(status="error", id=post_id, url=row["url"], error=f"File error: {e}")
+                    continue
+                entry.update(status="created" if created else "updated", id=post_id, url=row["url"])
+        batch.clear()
+
+    def collect(done):
+        for future in done:
+            entry = futures.pop(future)
+            try:
+                staged = future.result()
+            except Exception as e:
+                entry.update(status="error", error=str(e))
+                continue
+            batch.append((entry, staged))
+            if len(batch) >= batch_size:
+                flush()
+
+    futures = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for path, data, error in iter_archive_articles(archive):
+                entry = {"file": path}
+                report.append(entry)
+                if error:
+                    entry.update(status="error", error=error)
+                    continue
+                url = posixpath.splitext(path)[0]
+                if url in seen_urls:
+                    # a.md and a.mdx would map to the same article
+                    entry.update(status="error", error="Duplicate article path")
+                    continue
+                seen_urls.add(url)
+                futures[executor.submit(_stage_article, path, data, status, base_path)] = entry
+                # Bound the number of archive members held in memory
+                if len(futures) >= workers * 4:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    collect(done)
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                collect(done)
+        flush()
+    except BaseException:
+        # An aborted import leaves no staged temp files behind
+        staged = [item for _, item in batch]
+        staged += [f.result() for f in futures if not f.cancelled() and f.exception() is None]
+        for _, _, tmp_path, _ in staged:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        raise
+    return report
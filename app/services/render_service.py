@@ -0,0 +1,211 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import orjson
+from markdown_it import MarkdownIt
+
+from app.core import config
+from app.core.timing import timed
+from app.services.article_service import parse_frontmatter, resolve_article_path
+
+# Part of every cache key: bump it when the rendered output changes
+RENDERER_VERSION = 1
+
+# CommonMark plus the GFM tables and strikethrough the frontend enables (remark-gfm).
+# Raw HTML is kept: articles are written by the admin
+_markdown = MarkdownIt("commonmark", {"html": True}).enable(["table", "strikethrough"])
+
+def _slugify(text: str) -> str:
+    # Same ids as the frontend (github-slugger): lowercase, punctuation dropped, spaces to "-"
+    return re.sub(r"[^\w\- ]", "", text.lower()).replace(" ", "-")
+
+def render_markdown(source: str) -> dict:
+    """
+    Renders an article file's text, frontmatter excluded, to {"html", "toc"}.
+    Headings get id attributes; toc lists them as {"depth", "slug", "text"},
+    like the frontend's getHeadings().
+    """
+    _, body = parse_frontmatter(source.replace("\r\n", "\n").lstrip())
+    env = {}
+    tokens = _markdown.parse(body, env)
+    toc = []
+    seen = {}
+    for index, token in enumerate(tokens):
+        if token.type != "heading_open":
+            continue
+        inline = tokens[index + 1]
+        text = "".join(child.content for child in inline.children or [] if child.type in ("text", "code_inline"))
+        slug = _slugify(text)
+        if slug in seen:
+            seen[slug] += 1
+            slug = f"{slug}-{seen[slug]}"
+        else:
+            seen[slug] = 0
+        token.attrSet("id", slug)
+        toc.append({"depth": int(token.tag[1]), "slug": slug, "text": text})
+    return {"html": _markdown.renderer.render(tokens, _markdown.options, env), "toc": toc}
+
+class RenderCache:
+    """
+    Rendered articles keyed by a digest of the file contents: an in-memory
+    LRU of RENDER_CACHE_SIZE entries in front of JSON files in
+    RENDER_CACHE_DIR, which are evicted least recently used past
+    RENDER_CACHE_DISK_MB. Each path's digest is remembered with the file's
+    mtime and size, so a hit costs one stat. Safe to use from threads.
+    """
+    def __init__(self, directory: str, size: int, disk_bytes: int):
+        self.directory = directory
+        self.size = size
+        self.disk_bytes = disk_bytes
+        self._lock = threading.Lock()
+        # digest -> {"html", "toc"}, least recently used first
+        self._memory = OrderedDict()
+        # digest -> file size on disk, least recently used first; read from the directory on first use
+        self._disk = None
+        self._disk_total = 0
+        # path -> (mtime_ns, size, digest)
+        self._files = {}
+
+    def _disk_path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _load_disk_index(self):
+        # Called with the lock held
+        if self._disk is not None:
+            return
+        entries = []
+        if os.path.isdir(self.directory):
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime_ns, entry.name[:-5], stat.st_size))
+        entries.sort()
+        self._disk = OrderedDict((digest, size) for _, digest, size in entries)
+        self._disk_total = sum(self._disk.values())
+
+    def _remember(self, digest: str, rendered: dict):
+        # Called with the lock held
+        self._memory[digest] = rendered
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.size:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, digest: str):
+        with self._lock:
+            rendered = self._memory.get(digest)
+            if rendered is not None:
+                self._memory.move_to_end(digest)
+                return rendered
+            self._load_disk_index()
+            if digest not in self._disk:
+                return None
+            self._disk.move_to_end(digest)
+        try:
+            with open(self._disk_path(digest), "rb") as f:
+                rendered = orjson.loads(f.read())
+            # mtime is the last use, so the LRU order survives restarts
+            os.utime(self._disk_path(digest))
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        with self._lock:
+            self._remember(digest, rendered)
+        return rendered
+
+    def _store(self, digest: str, rendered: dict):
+        body = orjson.dumps(rendered)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._disk_path(digest)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, self._disk_path(digest))
+        evicted = []
+        with self._lock:
+            self._remember(digest, rendered)
+            self._load_disk_index()
+            self._disk_total += len(body) - self._disk.pop(digest, 0)
+            self._disk[digest] = len(body)
+            while self._disk_total > self.disk_bytes and len(self._disk) > 1:
+                old, size = self._disk.popitem(last=False)
+                self._disk_total -= size
+                evicted.append(old)
+        for old in evicted:
+            try:
+                os.remove(self._disk_path(old))
+            except FileNotFoundError:
+                pass
+
+    def get(self, file_path: str):
+        """
+        Returns the rendered article at file_path, rendering it on a miss,
+        or None if the file does not exist.
+        """
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        data = None
+        known = self._files.get(file_path)
+        if known is not None and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+            digest = known[2]
+        else:
+            with open(file_path, "rb") as f:
+                data = f.read()
+            digest = f"v{RENDERER_VERSION}-{hashlib.blake2b(data, digest_size=16).hexdigest()}"
+            self._files[file_path] = (stat.st_mtime_ns, stat.st_size, digest)
+        rendered = self._lookup(digest)
+        if rendered is None:
+            if data is None:
+                with open(file_path, "rb") as f:
+                    data = f.read()
+            with timed("render"):
+                rendered = render_markdown(data.decode("utf-8", errors="ignore"))
+            self._store(digest, rendered)
+        return rendered
+
+    def invalidate(self, file_path: str):
+        """
+        Forgets the file at file_path and drops its rendered entry, for
+        articles that were re-uploaded or deleted.
+        """
+        known = self._files.pop(file_path, None)
+        if known is None:
+            return
+        digest = known[2]
+        with self._lock:
+            self._memory.pop(digest, None)
+            size = self._disk.pop(digest, None) if self._disk is not None else None
+            if size is not None:
+                self._disk_total -= size
+        try:
+            os.remove(self._disk_path(digest))
+        except FileNotFoundError:
+            pass
+
+    def warm_up(self, urls: list[str], base_path: str = "frontend/blog") -> int:
+        """
+        Loads (rendering if needed) the given articles into memory.
+        Returns the number of articles found.
+        """
+        warmed = 0
+        for url in urls:
+            file_path = resolve_article_path(url, base_path)
+            if file_path and self.get(file_path) is not None:
+                warmed += 1
+        return warmed
+
+render_cache = RenderCache(config.RENDER_CACHE_DIR, config.RENDER_CACHE_SIZE, config.RENDER_CACHE_DISK_MB * 1024 * 1024)
+
+def render_article(url: str, base_path: str = "frontend/blog"):
+    """
+    Returns {"html", "toc"} for the article file behind a post url, or None
+    if there is no such file.
+    """
+    with timed("file"):
+        file_path = resolve_article_path(url, base_path)
+    if not file_path:
+        return None
+    return render_cache.get(file_path)
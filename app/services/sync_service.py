@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import posixpath
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.orm import Session
+
+from app.crud import blog as crud
+from app.services.article_service import parse_frontmatter, frontmatter_fields
+from app.services.import_service import ARTICLE_EXTENSIONS
+
+# Files per posts transaction
+SYNC_BATCH_SIZE = 500
+
+def scan_articles(base_path: str) -> dict:
+    """
+    Lists the .md/.mdx files under base_path as {relative path: (mtime_ns, size)}.
+    Dot-files and dot-directories (editor and upload temp files) are skipped.
+    """
+    files = {}
+    pending = [("", base_path)]
+    while pending:
+        prefix, directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((f"{prefix}{entry.name}/", entry.path))
+                elif entry.name.lower().endswith(ARTICLE_EXTENSIONS):
+                    stat = entry.stat()
+                    files[prefix + entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+def _url(path: str) -> str:
+    return f"/user/posts/{posixpath.splitext(path)[0]}"
+
+def _try(func, *args):
+    # (result, None) or (None, error message), so one unreadable file doesn't stop the batch
+    try:
+        return func(*args), None
+    except (OSError, ValueError) as e:
+        return None, str(e)
+
+def _read_article(file_path: str):
+    """
+    Returns (digest, frontmatter fields) of one article file.
+    Runs on the worker pool.
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    try:
+        content = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        content = data.decode("gbk", errors="ignore")
+    meta, _ = parse_frontmatter(content.replace("\r\n", "\n").lstrip())
+    return digest, frontmatter_fields(meta)
+
+def sync_articles(
+    db: Session,
+    base_path: str = "frontend/blog",
+    status: str = "draft",
+    workers: int = 8,
+    batch_size: int = SYNC_BATCH_SIZE
+) -> dict:
+    """
+    Brings the posts table in line with the article files under base_path.
+
+    Files whose mtime and size match the last sync are skipped unread; the
+    others are hashed, and those whose content changed are parsed and
+    upserted (matched by url) in batched transactions. The frontmatter wins
+    for the keys it sets; status and folder (the file's directory) are only
+    set on new posts. Posts whose file was seen by an earlier sync and is
+    gone now are deleted. Posts that never had a file are left alone.
+    Returns {"scanned", "unchanged", "created", "updated", "deleted", "errors", "seconds"},
+    errors being [{"file", "error"}].
+    """
+    start = time.perf_counter()
+    if not os.path.isdir(base_path):
+        # A missing root would read as every article deleted
+        raise FileNotFoundError(f"Article directory not found: {base_path}")
+    if status == "published":
+        status = "public"
+
+    files = scan_articles(base_path)
+    known = crud.get_article_files(db)
+    report = {"scanned": len(files), "unchanged": 0, "created": 0, "updated": 0, "deleted": 0, "errors": []}
+
+    changed = []
+    for path, stat in files.items():
+        entry = known.get(path)
+        if entry is not None and entry[0] == stat[0] and entry[1] == stat[1]:
+            report["unchanged"] += 1
+        elif path.lower().endswith(".mdx") and f"{path[:-4]}.md" in files:
+            # a.md and a.mdx would map to the same article
+            report["errors"].append({"file": path, "error": f"Same article as {path[:-4]}.md"})
+        else:
+            changed.append(path)
+    changed.sort()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for i in range(0, len(changed), batch_size):
+            batch = changed[i:i + batch_size]
+            entries, rows = [], []
+            results = executor.map(lambda path: _try(_read_article, os.path.join(base_path, path)), batch)
+            for path, (result, error) in zip(batch, results):
+                if error:
+                    report["errors"].append({"file": path, "error": error})
+                    continue
+                digest, fields = result
+                mtime_ns, size = files[path]
+                entries.append({"path": path, "mtime_ns": mtime_ns, "size": size, "digest": digest})
+                if path in known and known[path][2] == digest:
+                    # Touched but not changed (checkout, copy): only the stat is new
+                    report["unchanged"] += 1
+                    continue
+                folder, filename = posixpath.split(path)
+                fields.setdefault("title", posixpath.splitext(filename)[0])
+                if "tags" in fields:
+                    fields["tags"] = json.dumps(fields["tags"], ensure_ascii=False)
+                rows.append({**fields, "url": _url(path), "status": status, "folder": folder or None})
+            try:
+                crud.put_article_files(db, entries)
+                if rows:
+                    for _, created in crud.upsert_posts(db, rows, create_only=("status", "folder")):
+                        report["created" if created else "updated"] += 1
+                else:
+                    db.commit()
+            except Exception as e:
+                db.rollback()
+                report["errors"].extend({"file": entry["path"], "error": f"Database error: {e}"} for entry in entries)
+
+    removed = [path for path in known if path not in files]
+    for i in range(0, len(removed), batch_size):
+        batch = removed[i:i + batch_size]
+        ids = crud.get_post_ids_by_url(db, [_url(path) for path in batch])
+        crud.drop_article_files(db, batch)
+        if ids:
+            report["deleted"] += len(crud.batch_delete(db, "posts", ids))
+        else:
+            db.commit()
+
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
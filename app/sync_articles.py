@@ -0,0 +1,50 @@
+import argparse
+from dotenv import load_dotenv
+from app.core.database import SessionLocal, Base, engine
+from app.core.migrations import run_migrations
+from app.services.sync_service import sync_articles
+from app.utils.watch import TreeWatcher
+
+# Load environment variables
+load_dotenv()
+
+def _run(args):
+    db = SessionLocal()
+    try:
+        report = sync_articles(db, args.base_path, status=args.status, workers=args.workers)
+    finally:
+        db.close()
+    for entry in report["errors"]:
+        print(f"Error: {entry['file']}: {entry['error']}")
+    print(f"Synced {report['scanned']} file(s) in {report['seconds']}s: {report['created']} created, "
+          f"{report['updated']} updated, {report['deleted']} deleted, {report['unchanged']} unchanged, "
+          f"{len(report['errors'])} failed.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the posts table with the article files under frontend/blog.")
+    parser.add_argument("--base-path", default="frontend/blog", help="article root (default: frontend/blog)")
+    parser.add_argument("--status", default="draft", help="status of newly found articles (default: draft)")
+    parser.add_argument("--workers", type=int, default=8, help="file reader threads")
+    parser.add_argument("--watch", action="store_true", help="keep running and sync again whenever files change")
+    parser.add_argument("--debounce", type=float, default=0.5, help="seconds of quiet before a rescan in watch mode")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    _run(args)
+    if not args.watch:
+        return
+    watcher = TreeWatcher(args.base_path)
+    print(f"Watching {args.base_path} ({'inotify' if watcher.native else f'polling every {watcher.poll_seconds}s'}), Ctrl+C to stop.")
+    try:
+        while True:
+            watcher.wait(args.debounce)
+            _run(args)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import base64
+import json
+from typing import Any, List
+
+def encode_cursor(key: List[Any]) -> str:
+    """
+    Encodes a keyset position (e.g. [date, id]) as an opaque URL-safe cursor.
+    """
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decodes a cursor produced by encode_cursor.
+    Raises ValueError if it is malformed or does not hold `size` values.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, list) or len(key) != size or not isinstance(key[-1], int):
+        raise ValueError("Invalid cursor")
+    return key
@@ -1,15 +1,92 @@
+import base64
 import hashlib
+import hmac
+import json
+import os
+import re
+import time
+
+from app.core import config
+
+SCRYPT_PREFIX = "scrypt"
+SHA256_HEX = re.compile(r"[0-9a-f]{64}")
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # maxmem must cover 128 * n * r bytes, plus headroom
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024, dklen=32)
 
 def hash_password(password: str) -> str:
     """
-    Hashes a password using SHA-256.
-    This is a one-way function: you cannot decrypt the password.
-    To verify, you hash the input and compare it with the stored hash.
+    Hashes a password with scrypt, using the PASSWORD_SCRYPT_* cost settings.
+    The result stores its parameters and salt: scrypt$n$r$p$salt$hash.
+    This is slow on purpose; call it off the event loop.
     """
-    return hashlib.sha256(password.encode()).hexdigest()
+    n, r, p = config.PASSWORD_SCRYPT_N, config.PASSWORD_SCRYPT_R, config.PASSWORD_SCRYPT_P
+    salt = os.urandom(16)
+    digest = _scrypt(password, salt, n, r, p)
+    return f"{SCRYPT_PREFIX}${n}${r}${p}${_b64encode(salt)}${_b64encode(digest)}"
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Verifies a plain password against a hashed password.
+    Verifies a plain password against a scrypt hash or a legacy SHA-256 hex digest.
+    """
+    if hashed_password.startswith(SCRYPT_PREFIX + "$"):
+        try:
+            _, n, r, p, salt, digest = hashed_password.split("$")
+            expected = _scrypt(plain_password, _b64decode(salt), int(n), int(r), int(p))
+        except ValueError:
+            return False
+        return hmac.compare_digest(expected, _b64decode(digest))
+    legacy = hashlib.sha256(plain_password.encode()).hexdigest()
+    # Bytes: compare_digest rejects non-ASCII str, and a plain-text row may hold any text
+    return hmac.compare_digest(legacy.encode(), hashed_password.encode())
+
+def is_password_hash(value: str) -> bool:
+    """
+    True for a scrypt hash or a legacy SHA-256 hex digest, False for a
+    legacy plain-text password.
+    """
+    return value.startswith(SCRYPT_PREFIX + "$") or SHA256_HEX.fullmatch(value) is not None
+
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    True for legacy SHA-256 / plain-text rows and for scrypt hashes made with
+    other cost settings than the current ones.
+    """
+    current = f"{SCRYPT_PREFIX}${config.PASSWORD_SCRYPT_N}${config.PASSWORD_SCRYPT_R}${config.PASSWORD_SCRYPT_P}$"
+    return not hashed_password.startswith(current)
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(config.ADMIN_TOKEN_SECRET.encode(), payload.encode(), hashlib.sha256).digest())
+
+def create_admin_token(username: str) -> str:
+    """
+    Issues a stateless admin token, valid for ADMIN_TOKEN_TTL seconds:
+    base64url(JSON claims) "." base64url(HMAC-SHA256 of the claims).
+    """
+    claims = {"sub": username, "exp": int(time.time()) + config.ADMIN_TOKEN_TTL}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}"
+
+def verify_admin_token(token: str):
+    """
+    Returns the token's claims if the signature matches and it has not
+    expired, otherwise None. Needs no database access.
     """
-    return hash_password(plain_password) == hashed_password
+    payload, _, signature = token.partition(".")
+    # Bytes: compare_digest raises TypeError for non-ASCII str
+    if not signature or not hmac.compare_digest(_sign(payload).encode(), signature.encode()):
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+    if not isinstance(claims, dict) or not isinstance(claims.get("exp"), int) or claims["exp"] <= time.time():
+        return None
+    return claims
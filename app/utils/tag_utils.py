@@ -1,25 +1,40 @@
 import json
 from typing import List, Any
 
+def parse_tag_list(val: Any) -> List[str]:
+    """
+    Parses a tag field stored as a JSON string or list into a list of tags.
+    Invalid or non-list values yield an empty list.
+    """
+    if not val:
+        return []
+    try:
+        # If it's already a list
+        if isinstance(val, list):
+            tags_list = val
+        else:
+            # Assume JSON string
+            tags_list = json.loads(val)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    if not isinstance(tags_list, list):
+        return []
+    return [tag for tag in tags_list if isinstance(tag, str) and tag]
+
 def extract_unique_tags(items: List[Any], field_name: str = "tags") -> List[str]:
     """
     Extracts unique tags from a list of objects where tags are stored as a JSON string or list.
     """
     all_tags = set()
     for item in items:
-        val = getattr(item, field_name, None)
-        if val:
-            try:
-                # If it's already a list
-                if isinstance(val, list):
-                    tags_list = val
-                else:
-                    # Assume JSON string
-                    tags_list = json.loads(val)
-                
-                if isinstance(tags_list, list):
-                    for tag in tags_list:
-                        all_tags.add(tag)
-            except (json.JSONDecodeError, TypeError):
-                pass
+        all_tags.update(parse_tag_list(getattr(item, field_name, None)))
     return list(sorted(all_tags))
+
+def format_facet_values(rows: List[Any], key: str = "tag", with_counts: bool = False) -> List[Any]:
+    """
+    Formats (value, count) facet rows as a plain value list,
+    or as [{key: value, "count": count}, ...] when with_counts is set.
+    """
+    if with_counts:
+        return [{key: value, "count": count} for value, count in rows]
+    return [value for value, _ in rows]
@@ -0,0 +1,84 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# From <sys/inotify.h>
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII") # wd, mask, cookie, name length
+
+def _inotify():
+    # libc with inotify, or None where it is not available (macOS, Windows)
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+class TreeWatcher:
+    """
+    Waits for changes anywhere under a directory tree. Uses Linux inotify,
+    watching every directory (new ones included); elsewhere it falls back to
+    waking up every poll_seconds.
+    """
+    def __init__(self, root: str, poll_seconds: float = 2.0):
+        self.root = root
+        self.poll_seconds = poll_seconds
+        self._libc = _inotify()
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC) if self._libc else -1
+        self._dirs = {}
+        if self._fd >= 0:
+            self._watch_tree(root)
+
+    @property
+    def native(self) -> bool:
+        return self._fd >= 0
+
+    def _watch_tree(self, top: str):
+        for path, dirs, _ in os.walk(top):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+            if wd >= 0:
+                self._dirs[wd] = path
+
+    def _drain(self) -> bool:
+        # Reads pending events and starts watching new directories; True if any arrived
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and wd in self._dirs:
+                self._watch_tree(os.path.join(self._dirs[wd], os.fsdecode(name)))
+        return True
+
+    def wait(self, debounce_seconds: float = 0.5):
+        """
+        Blocks until something changed, then until debounce_seconds pass
+        without further changes, so a git pull triggers one rescan.
+        """
+        if not self.native:
+            time.sleep(self.poll_seconds)
+            return
+        select.select([self._fd], [], [])
+        self._drain()
+        while select.select([self._fd], [], [], debounce_seconds)[0]:
+            self._drain()
+
+    def close(self):
+        if self.native:
+            os.close(self._fd)
+            self._fd = -1
@@ -0,0 +1,355 @@
+"""
+Load test of every /api/user and /api/admin endpoint, in-process through
+the ASGI app.
+
+A fresh database is seeded with benchmarks.datagen (or --db reuses one made
+by it), then each endpoint is driven with randomized but seeded parameters
+at the given concurrency. Read endpoints run first, writes last, so reads
+measure the seeded data set. Results are per endpoint: throughput and
+p50/p95/p99 latency, written as JSON. With --compare, the run is checked
+against a stored baseline and the exit code is 1 on regressions.
+
+Usage:
+    uv run python -m benchmarks.api_load --posts 100000 --diaries 50000 --gallery 20000 --output results.json
+    uv run python -m benchmarks.api_load --db /tmp/bench/bench.db --compare baseline.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import re
+import sqlite3
+import statistics
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timezone
+
+from benchmarks import compare as compare_results
+from benchmarks import datagen
+
+# Frequent terms; most searches use a random vocabulary word instead (see Context.term)
+SEARCH_TERMS = ["sqlite", "fastapi", "python", "weekly review", "数据库", "build release"]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="reuse a database seeded by benchmarks.datagen (writes modify it)")
+    datagen.add_count_arguments(parser)
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent in-flight requests")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per endpoint")
+    parser.add_argument("--only", help="regex; run only endpoints whose name matches")
+    parser.add_argument("--skip-writes", action="store_true", help="run read endpoints only")
+    parser.add_argument("--output", help="write the JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="flag regressions against a stored result file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore latency changes smaller than this")
+    return parser.parse_args()
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+class Context:
+    """
+    Seeded request parameters over the existing row ids. Updates and batches
+    touch the lower half of each id list; deletes consume ids from the top,
+    so every delete hits an existing row.
+    """
+    def __init__(self, seed: int, ids: dict, article_ids: list = ()):
+        self.rng = random.Random(seed)
+        self.counts = {resource: len(values) for resource, values in ids.items()}
+        self.generator = datagen.Generator(seed)
+        self._ids = {resource: list(values) for resource, values in ids.items()}
+        self._updatable = {resource: values[:len(values) // 2] or values for resource, values in self._ids.items()}
+        self._article_ids = list(article_ids)
+        self._uploads = 0
+        self._search_words = [word for word in self.generator.words if len(word) >= 3]
+
+    def id(self, resource: str) -> int:
+        return self.rng.choice(self._updatable[resource])
+
+    def article_id(self) -> int:
+        # A public post with a markdown file, so the content route renders instead of 404ing
+        return self.rng.choice(self._article_ids) if self._article_ids else self.id("posts")
+
+    def ids(self, resource: str, k: int = 20) -> list:
+        return [self.id(resource) for _ in range(k)]
+
+    def delete_id(self, resource: str) -> int:
+        # Runs past the upper half only if more deletes are requested than rows exist
+        return self._ids[resource].pop() if len(self._ids[resource]) > len(self._updatable[resource]) else 0
+
+    def skip(self, resource: str, limit: int) -> int:
+        # Mostly early pages, sometimes deep ones
+        pages = max(1, self.counts[resource] // limit)
+        return limit * min(pages - 1, int(self.rng.paretovariate(1.2)) - 1)
+
+    def tag(self) -> str:
+        return self.generator.pick_tags(1, 1)[0]
+
+    def folder(self) -> str:
+        return self.rng.choices(self.generator.folders, cum_weights=self.generator.folder_weights)[0]
+
+    def year(self) -> str:
+        return str(self.rng.randint(2016, 2025))
+
+    def term(self) -> str:
+        if self.rng.random() < 0.2:
+            return self.rng.choice(SEARCH_TERMS)
+        # Terms under 3 characters bypass the trigram index and scan, so keep them out
+        # of the mix; any vocabulary rank is equally likely, like real queries
+        return self.rng.choice(self._search_words)
+
+    def tags_json(self) -> str:
+        return json.dumps(self.generator.pick_tags(), ensure_ascii=False)
+
+    def upload_name(self) -> str:
+        self._uploads += 1
+        return f"bench-upload-{self._uploads}"
+
+    def article_file(self, name: str):
+        return {"file": (f"{name}.md", self.generator.text(300).encode(), "text/markdown")}
+
+    def image(self):
+        # A new photo-sized JPEG each time, so uploads are processed rather than deduplicated
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        noise = Image.effect_noise((1600, 1200), self.rng.randint(20, 80))
+        Image.merge("RGB", (noise, Image.linear_gradient("L").resize(noise.size), noise)).save(buffer, "JPEG", quality=85)
+        return {"file": (f"{self.upload_name()}.jpg", buffer.getvalue(), "image/jpeg")}
+
+    def archive(self, files: int = 5):
+        buffer = io.BytesIO()
+        prefix = self.upload_name()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            for i in range(files):
+                zf.writestr(f"{prefix}/{i}.md", f"---\ntitle: {prefix} {i}\ntags: {self.tag()}\n---\n{self.generator.text(200)}\n")
+        return {"file": (f"{prefix}.zip", buffer.getvalue(), "application/zip")}
+
+# (name, route, request factory). The route is "METHOD /path/template" and
+# is used to check that every registered endpoint is covered.
+READ_SCENARIOS = [
+    ("user.books", "GET /api/user/books", lambda c: {"params": {"skip": c.skip("books", 20), "limit": 20}}),
+    ("user.books.with_total", "GET /api/user/books", lambda c: {"params": {"limit": 20, "with_total": True}}),
+    ("user.books.tags", "GET /api/user/books/tags", lambda c: {"params": {"counts": True}}),
+    ("user.diaries", "GET /api/user/diaries", lambda c: {"params": {"skip": c.skip("diaries", 20), "limit": 20}}),
+    ("user.diaries.cursor", "GET /api/user/diaries", lambda c: {"params": {"cursor": "", "limit": 20}}),
+    ("user.diaries.year_month", "GET /api/user/diaries", lambda c: {"params": {"year": c.year(), "month": c.rng.randint(1, 12), "limit": 20}}),
+    ("user.diaries.archive", "GET /api/user/diaries/archive", lambda c: {}),
+    ("user.gallery", "GET /api/user/gallery", lambda c: {"params": {"skip": c.skip("gallery", 30), "limit": 30}}),
+    ("user.gallery.cursor_tags", "GET /api/user/gallery", lambda c: {"params": {"cursor": "", "tags": c.tag(), "limit": 30}}),
+    ("user.gallery.with_total", "GET /api/user/gallery", lambda c: {"params": {"limit": 30, "with_total": True}}),
+    ("user.gallery.tags", "GET /api/user/gallery/tags", lambda c: {"params": {"counts": True}}),
+    ("user.posts", "GET /api/user/posts", lambda c: {"params": {"skip": c.skip("posts", 10), "limit": 10}}),
+    ("user.posts.cursor", "GET /api/user/posts", lambda c: {"params": {"cursor": "", "limit": 10}}),
+    ("user.posts.with_total", "GET /api/user/posts", lambda c: {"params": {"limit": 10, "with_total": True}}),
+    ("user.posts.content", "GET /api/user/posts/{post_id}/content", lambda c: {"path": {"post_id": c.article_id()}}),
+    ("user.articles.categories", "GET /api/user/articles/categories", lambda c: {}),
+    ("user.articles.tags", "GET /api/user/articles/tags", lambda c: {"params": {"counts": True}}),
+    ("user.projects", "GET /api/user/projects", lambda c: {"params": {"limit": 100}}),
+    ("user.projects.tech_stacks", "GET /api/user/projects/tech-stacks", lambda c: {"params": {"counts": True}}),
+    ("user.todos", "GET /api/user/todos", lambda c: {"params": {"skip": c.skip("todos", 50), "limit": 50}}),
+    ("user.todos.cursor", "GET /api/user/todos", lambda c: {"params": {"cursor": "", "limit": 50}}),
+    ("user.todos.types", "GET /api/user/todos/types", lambda c: {"params": {"counts": True}}),
+    ("user.tools", "GET /api/user/tools", lambda c: {"params": {"limit": 100}}),
+    ("user.search", "GET /api/user/search", lambda c: {"params": {"q": c.term(), "limit": 20}}),
+    ("admin.cache", "GET /api/admin/cache", lambda c: {}),
+    ("admin.search", "GET /api/admin/search", lambda c: {"params": {"q": c.term(), "limit": 20}}),
+    ("admin.articles", "GET /api/admin/articles", lambda c: {"params": {"skip": c.skip("posts", 10), "limit": 10, "with_total": True}}),
+    ("admin.articles.filtered", "GET /api/admin/articles", lambda c: {"params": {"category": c.folder(), "tags": c.tag(), "status": "public", "limit": 10}}),
+    ("admin.articles.cursor", "GET /api/admin/articles", lambda c: {"params": {"cursor": "", "limit": 10, "sort": c.rng.choice(("asc", "desc"))}}),
+    ("admin.articles.tags", "GET /api/admin/articles/tags", lambda c: {"params": {"counts": True}}),
+    ("admin.books", "GET /api/admin/books", lambda c: {"params": {"tags": c.tag(), "limit": 100}}),
+    ("admin.books.tags", "GET /api/admin/books/tags", lambda c: {"params": {"counts": True}}),
+    ("admin.projects", "GET /api/admin/projects", lambda c: {"params": {"limit": 100}}),
+    ("admin.projects.tech_stacks", "GET /api/admin/projects/tech-stacks", lambda c: {"params": {"counts": True}}),
+    ("admin.diaries", "GET /api/admin/diaries", lambda c: {"params": {"year": c.year(), "limit": 20}}),
+    ("admin.diaries.cursor", "GET /api/admin/diaries", lambda c: {"params": {"cursor": "", "limit": 20}}),
+    ("admin.gallery", "GET /api/admin/gallery", lambda c: {"params": {"skip": c.skip("gallery", 30), "limit": 30, "with_total": True}}),
+    ("admin.gallery.cursor_tags", "GET /api/admin/gallery", lambda c: {"params": {"cursor": "", "tags": c.tag(), "limit": 30}}),
+    ("admin.gallery.tags", "GET /api/admin/gallery/tags", lambda c: {"params": {"counts": True}}),
+    ("admin.todos", "GET /api/admin/todos", lambda c: {"params": {"priority": c.rng.choice(datagen.PRIORITIES), "completed": False, "limit": 50, "with_total": True}}),
+    ("admin.todos.cursor", "GET /api/admin/todos", lambda c: {"params": {"cursor": "", "limit": 50}}),
+    ("admin.todos.types", "GET /api/admin/todos/types", lambda c: {"params": {"counts": True}}),
+    ("admin.tools", "GET /api/admin/tools", lambda c: {"params": {"category": c.rng.choice(datagen.TOOL_CATEGORIES), "limit": 100}}),
+    ("admin.tools.categories", "GET /api/admin/tools/categories", lambda c: {"params": {"counts": True}}),
+]
+
+WRITE_SCENARIOS = [
+    ("admin.login", "POST /api/admin/login", lambda c: {"json": {"username": datagen.ADMIN_USERNAME, "password": datagen.ADMIN_PASSWORD}}),
+    ("admin.articles.upload", "POST /api/admin/articles/upload", lambda c: (lambda name: {"data": {"title": name, "date": c.generator.day(), "category": c.folder(), "tags": c.tags_json(), "status": "public"}, "files": c.article_file(name)})(c.upload_name())),
+    ("admin.articles.update", "PUT /api/admin/articles/{post_id}", lambda c: {"path": {"post_id": c.id("posts")}, "data": {"tags": c.tags_json(), "status": c.rng.choice(("public", "draft"))}}),
+    ("admin.articles.batch", "POST /api/admin/articles/batch", lambda c: {"json": {"ids": c.ids("posts"), "action": "add_tags", "tags": [c.tag()]}}),
+    ("admin.articles.delete", "DELETE /api/admin/articles/{post_id}", lambda c: {"path": {"post_id": c.delete_id("posts")}}),
+    ("admin.articles.import", "POST /api/admin/articles/import", lambda c: {"data": {"status": "draft"}, "files": c.archive()}),
+    ("admin.books.upload", "POST /api/admin/books/upload", lambda c: {"data": {"title": c.generator.text(3), "status": "published", "rating": 4, "tags": c.tags_json()}}),
+    ("admin.books.update", "PUT /api/admin/books/{book_id}", lambda c: {"path": {"book_id": c.id("books")}, "data": {"rating": c.rng.randint(1, 5), "tags": c.tags_json()}}),
+    ("admin.books.batch", "POST /api/admin/books/batch", lambda c: {"json": {"ids": c.ids("books"), "action": "set_status", "status": c.rng.choice(("published", "draft"))}}),
+    ("admin.books.delete", "DELETE /api/admin/books/{book_id}", lambda c: {"path": {"book_id": c.delete_id("books")}}),
+    ("admin.projects.upload", "POST /api/admin/projects/upload", lambda c: {"data": {"name": c.upload_name(), "techStack": json.dumps(["Python", "SQLite"]), "status": "ongoing"}}),
+    ("admin.projects.update", "PUT /api/admin/projects/{project_id}", lambda c: {"path": {"project_id": c.id("projects")}, "data": {"description": c.generator.text(20)}}),
+    ("admin.projects.batch", "POST /api/admin/projects/batch", lambda c: {"json": {"ids": c.ids("projects", 5), "action": "add_tags", "tags": [c.rng.choice(datagen.TECH)]}}),
+    ("admin.projects.delete", "DELETE /api/admin/projects/{project_id}", lambda c: {"path": {"project_id": c.delete_id("projects")}}),
+    ("admin.diaries.upload", "POST /api/admin/diaries/upload", lambda c: {"data": {"date": c.generator.day(), "content": c.generator.text(80), "mood": "calm", "images": "[]"}}),
+    ("admin.diaries.update", "PUT /api/admin/diaries/{diary_id}", lambda c: {"path": {"diary_id": c.id("diaries")}, "data": {"content": c.generator.text(80)}}),
+    ("admin.diaries.batch", "POST /api/admin/diaries/batch", lambda c: {"json": {"ids": [c.delete_id("diaries") for _ in range(5)], "action": "delete"}}),
+    ("admin.diaries.delete", "DELETE /api/admin/diaries/{diary_id}", lambda c: {"path": {"diary_id": c.delete_id("diaries")}}),
+    ("admin.gallery.upload", "POST /api/admin/gallery/upload", lambda c: {"data": {"title": c.generator.text(3), "url": f"https://img.example.com/{c.upload_name()}.jpg", "date": c.generator.day(), "tags": c.tags_json()}}),
+    ("admin.gallery.upload_file", "POST /api/admin/gallery/upload", lambda c: {"data": {"title": c.generator.text(3), "date": c.generator.day(), "tags": c.tags_json()}, "files": c.image()}),
+    ("admin.images.upload", "POST /api/admin/images", lambda c: {"files": c.image()}),
+    ("admin.gallery.update", "PUT /api/admin/gallery/{gallery_id}", lambda c: {"path": {"gallery_id": c.id("gallery")}, "data": {"tags": c.tags_json()}}),
+    ("admin.gallery.batch", "POST /api/admin/gallery/batch", lambda c: {"json": {"ids": c.ids("gallery"), "action": "remove_tags", "tags": [c.tag()]}}),
+    ("admin.gallery.delete", "DELETE /api/admin/gallery/{gallery_id}", lambda c: {"path": {"gallery_id": c.delete_id("gallery")}}),
+    ("admin.todos.upload", "POST /api/admin/todos/upload", lambda c: {"data": {"task": c.generator.text(6), "priority": c.rng.choice(datagen.PRIORITIES), "type": "habit"}}),
+    ("admin.todos.update", "PUT /api/admin/todos/{todo_id}", lambda c: {"path": {"todo_id": c.id("todos")}, "data": {"progress": c.rng.randrange(0, 101, 10), "completed": c.rng.random() < 0.5}}),
+    ("admin.todos.batch", "POST /api/admin/todos/batch", lambda c: {"json": {"ids": c.ids("todos"), "action": "set_status", "status": "published"}}),
+    ("admin.todos.delete", "DELETE /api/admin/todos/{todo_id}", lambda c: {"path": {"todo_id": c.delete_id("todos")}}),
+    ("admin.tools.upload", "POST /api/admin/tools/upload", lambda c: {"data": {"name": c.upload_name(), "url": "https://tools.example.com", "category": c.rng.choice(datagen.TOOL_CATEGORIES)}}),
+    ("admin.tools.update", "PUT /api/admin/tools/{tool_id}", lambda c: {"path": {"tool_id": c.id("tools")}, "data": {"description": c.generator.text(12)}}),
+    ("admin.tools.batch", "POST /api/admin/tools/batch", lambda c: {"json": {"ids": c.ids("tools", 5), "action": "set_status", "status": "published"}}),
+    ("admin.tools.delete", "DELETE /api/admin/tools/{tool_id}", lambda c: {"path": {"tool_id": c.delete_id("tools")}}),
+]
+
+def uncovered_routes(app) -> list[str]:
+    # The OpenAPI paths carry the include prefixes, unlike app.routes on newer FastAPI
+    covered = {route for _, route, _ in READ_SCENARIOS + WRITE_SCENARIOS}
+    missing = []
+    for path, operations in app.openapi()["paths"].items():
+        if not path.startswith(("/api/user", "/api/admin")):
+            continue
+        for method in operations:
+            if f"{method.upper()} {path}" not in covered:
+                missing.append(f"{method.upper()} {path}")
+    return missing
+
+async def drive(client, route: str, factory, context: Context, total: int, concurrency: int) -> dict:
+    method, template = route.split(" ", 1)
+    latencies = []
+    errors = []
+    queue = iter(range(total))
+
+    async def worker():
+        for _ in queue:
+            request = factory(context)
+            url = template.format(**request.pop("path", {}))
+            start = time.perf_counter()
+            response = await client.request(method, url, **request)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors.append(f"{response.status_code} {response.text[:200]}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    result = {
+        "route": route,
+        "requests": total,
+        "errors": len(errors),
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2),
+    }
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+def load_ids(db_path: str) -> dict:
+    with sqlite3.connect(db_path) as conn:
+        return {resource: [row[0] for row in conn.execute(f"SELECT id FROM {resource} ORDER BY id")] for resource in datagen.DEFAULT_COUNTS}
+
+def load_article_ids(db_path: str) -> list:
+    # Only the first --article-files posts have a file; paths are relative to the database directory
+    base_path = os.path.join(os.path.dirname(db_path), "frontend", "blog")
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT id, url FROM posts WHERE status = 'public' ORDER BY id").fetchall()
+    return [post_id for post_id, url in rows if os.path.exists(os.path.join(base_path, url.split("/user/posts/")[-1] + ".md"))]
+
+async def run(args, ids: dict, article_ids: list = ()) -> dict:
+    import httpx
+    from app.main import app
+
+    missing = uncovered_routes(app)
+    if missing:
+        print(f"warning: no scenario for {', '.join(missing)}")
+
+    scenarios = READ_SCENARIOS + ([] if args.skip_writes else WRITE_SCENARIOS)
+    if args.only:
+        scenarios = [s for s in scenarios if re.search(args.only, s[0])]
+    context = Context(args.seed, ids, article_ids)
+    endpoints = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Every admin route but login needs a token
+        response = await client.post("/api/admin/login", json={"username": datagen.ADMIN_USERNAME, "password": datagen.ADMIN_PASSWORD})
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        for name, route, factory in scenarios:
+            if args.warmup:
+                await drive(client, route, factory, context, args.warmup, min(args.concurrency, args.warmup))
+            endpoints[name] = await drive(client, route, factory, context, args.requests, args.concurrency)
+            print(f"{name:<32} {endpoints[name]['throughput_rps']:>9} req/s  p95 {endpoints[name]['p95_ms']} ms", flush=True)
+    return endpoints
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+    if args.db:
+        db_path = os.path.abspath(args.db)
+    else:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="nayukiblog-bench-"), "bench.db")
+    # Must be set before app.core.database creates its engines; the app resolves
+    # article files relative to the working directory
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    # One log line per request would dominate the measured latency
+    os.environ.setdefault("TIMING_LOG_LEVEL", "WARNING")
+    # Outlive a long run
+    os.environ.setdefault("ADMIN_TOKEN_TTL", str(7 * 24 * 3600))
+    os.chdir(os.path.dirname(db_path))
+    if not args.db:
+        start = time.perf_counter()
+        datagen.seed_database(args)
+        print(f"seeded in {time.perf_counter() - start:.1f}s", flush=True)
+    ids = load_ids(db_path)
+    counts = {resource: len(values) for resource, values in ids.items()}
+
+    endpoints = asyncio.run(run(args, ids, load_article_ids(db_path)))
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "seed": args.seed,
+            "counts": counts,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "cpus": os.cpu_count(),
+        },
+        "endpoints": endpoints,
+    }
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare_results.compare(baseline, results, args.threshold, args.min_delta_ms)
+        print(compare_results.format_report(rows))
+        regressed = [row["endpoint"] for row in rows if row["regressions"]]
+        print(f"{len(rows)} endpoints compared, {len(regressed)} regression(s).")
+        return 1 if regressed else 0
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
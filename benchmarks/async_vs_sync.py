@@ -0,0 +1,98 @@
+"""
+Compares the sync (threadpool + Session) and async (AsyncSession + aiosqlite)
+read paths under concurrent load, in-process through the ASGI app.
+
+Usage:
+    uv run python -m benchmarks.async_vs_sync --posts 5000 --concurrency 200 --requests 4000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=5000, help="number of seeded posts")
+    parser.add_argument("--concurrency", type=int, default=200, help="concurrent in-flight requests")
+    parser.add_argument("--requests", type=int, default=4000, help="requests per variant")
+    parser.add_argument("--limit", type=int, default=20, help="page size of each request")
+    return parser.parse_args()
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def drive(client, path: str, total: int, concurrency: int) -> dict:
+    latencies = []
+    queue = iter(range(total))
+
+    async def worker():
+        for _ in queue:
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+async def main(args):
+    import httpx
+    from typing import List
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import insert
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from app.core.database import Base, engine, SessionLocal, ReadSessionLocal, get_async_db
+    from app.crud import blog as crud, blog_async as crud_async
+    from app.models import blog as models
+    from app.schemas import blog as schemas
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.execute(insert(models.Post), [
+            {"title": f"Post {i}", "date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}", "status": "public",
+             "desc": "benchmark post " * 10, "tags": json.dumps(["bench", f"t{i % 50}"]), "folder": "bench"}
+            for i in range(args.posts)
+        ])
+        db.commit()
+
+    app = FastAPI()
+
+    # The session is closed inside the handler: with a generator dependency the
+    # connection is only released by a teardown that itself needs a free threadpool
+    # worker, which deadlocks once concurrency exceeds the pool size.
+    @app.get("/sync/posts", response_model=List[schemas.Post])
+    def sync_posts(limit: int = 20):
+        with ReadSessionLocal() as db:
+            return crud.get_posts(db, skip=0, limit=limit, status="public")
+
+    @app.get("/async/posts", response_model=List[schemas.Post])
+    async def async_posts(limit: int = 20, db: AsyncSession = Depends(get_async_db)):
+        return await crud_async.get_posts(db, skip=0, limit=limit, status="public")
+
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for variant in ("sync", "async"):
+            path = f"/{variant}/posts?limit={args.limit}"
+            await drive(client, path, min(200, args.requests), args.concurrency) # warm up pools
+            results[variant] = await drive(client, path, args.requests, args.concurrency)
+    print(json.dumps({"posts": args.posts, "concurrency": args.concurrency, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="nayukiblog-bench-")
+    # Must be set before app.core.database creates its engines
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    asyncio.run(main(args))
@@ -0,0 +1,72 @@
+"""
+Compares two api_load result files and flags regressions.
+
+An endpoint regresses when a latency percentile grows by more than
+--threshold (relative) and --min-delta-ms (absolute, to ignore noise on
+sub-millisecond endpoints), when throughput drops by more than --threshold,
+or when it returns errors the baseline did not.
+
+Usage:
+    uv run python -m benchmarks.compare baseline.json current.json --threshold 0.2
+"""
+import argparse
+import json
+import sys
+
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2, min_delta_ms: float = 1.0) -> list[dict]:
+    """
+    Returns one row per endpoint present in either run:
+    {"endpoint", "changes": {metric: (old, new)}, "regressions": [...], "note"?}.
+    """
+    rows = []
+    old_endpoints = baseline["endpoints"]
+    new_endpoints = current["endpoints"]
+    for name in sorted(set(old_endpoints) | set(new_endpoints)):
+        old, new = old_endpoints.get(name), new_endpoints.get(name)
+        if old is None or new is None:
+            rows.append({"endpoint": name, "changes": {}, "regressions": [], "note": "only in baseline" if new is None else "new endpoint"})
+            continue
+        regressions = []
+        for metric in LATENCY_METRICS:
+            if new[metric] > old[metric] * (1 + threshold) and new[metric] - old[metric] > min_delta_ms:
+                regressions.append(metric)
+        if new["throughput_rps"] < old["throughput_rps"] * (1 - threshold):
+            regressions.append("throughput_rps")
+        if new["errors"] > old["errors"]:
+            regressions.append("errors")
+        changes = {metric: (old[metric], new[metric]) for metric in (*LATENCY_METRICS, "throughput_rps", "errors")}
+        rows.append({"endpoint": name, "changes": changes, "regressions": regressions})
+    return rows
+
+def format_report(rows: list[dict]) -> str:
+    lines = [f"{'endpoint':<40} {'p50 ms':>17} {'p95 ms':>17} {'p99 ms':>17} {'req/s':>17}  flags"]
+    for row in rows:
+        if "note" in row:
+            lines.append(f"{row['endpoint']:<40} {row['note']}")
+            continue
+        cells = [f"{old:>7.2f} -> {new:<7.2f}" for old, new in (row["changes"][m] for m in (*LATENCY_METRICS, "throughput_rps"))]
+        flags = ", ".join(row["regressions"]) or "ok"
+        lines.append(f"{row['endpoint']:<40} {' '.join(cells)}  {flags}")
+    return "\n".join(lines)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", help="stored result file")
+    parser.add_argument("current", help="new result file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore latency changes smaller than this")
+    args = parser.parse_args(argv)
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold, args.min_delta_ms)
+    print(format_report(rows))
+    regressed = [row["endpoint"] for row in rows if row["regressions"]]
+    print(f"{len(rows)} endpoints compared, {len(regressed)} regression(s).")
+    return 1 if regressed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
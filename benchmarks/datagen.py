@@ -0,0 +1,252 @@
+"""
+Seeded data generator for benchmarks.
+
+Fills a database with content shaped like a long-running blog: tags and
+folders follow a Zipf distribution (a few very common, a long tail of rare
+ones), dates span ten years, and most items are public. The same seed and
+counts always produce the same rows.
+
+Usage:
+    uv run python -m benchmarks.datagen --db /tmp/bench/bench.db --posts 100000 --diaries 50000 --gallery 20000
+
+Article files are written to frontend/blog next to the database, where the
+app (started from that directory) reads them.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+from datetime import date, timedelta
+
+# Benchmark admin account, created by generate()
+ADMIN_USERNAME = "bench"
+ADMIN_PASSWORD = "bench-password"
+
+# Most frequent words; generated words form the long tail of the vocabulary
+WORDS = (
+    "the a of and to in is for on with 的 了 是 在 我 "
+    "sqlite fastapi astro python rust async cache index query latency 性能 缓存 索引 查询 "
+    "日记 读书 旅行 摄影 编程 算法 设计 前端 后端 数据库 部署 笔记 周末 咖啡 音乐 电影 "
+    "notes build release weekly review guide"
+).split()
+SYLLABLES = "ka lo mi ren shu tan vel qi zor ne pa lu xin mo ra ti der sen wo fi".split()
+HANZI = "山水风月花雨云光城海书影梦夜春秋星路心时年家歌声色古今远近晴雪林湖桥灯茶酒诗画"
+MOODS = ["happy", "calm", "tired", "sad", "excited", None]
+WEATHERS = ["sunny", "cloudy", "rainy", "snowy", "windy", None]
+TECH = ["Python", "FastAPI", "SQLite", "Astro", "TypeScript", "Rust", "Go", "Docker", "Vue", "React", "Redis", "Nginx"]
+TOOL_CATEGORIES = ["dev", "design", "writing", "media", "productivity", "ops"]
+TODO_TYPES = ["short-term", "long-term", "habit", "reading"]
+PRIORITIES = ["high", "medium", "low"]
+
+DEFAULT_COUNTS = {
+    "posts": 100_000,
+    "diaries": 50_000,
+    "gallery": 20_000,
+    "books": 2_000,
+    "projects": 500,
+    "todos": 5_000,
+    "tools": 500,
+}
+
+def _zipf(count: int, s: float) -> list:
+    # Cumulative weights for random.choices
+    return list(itertools.accumulate(1 / (i + 1) ** s for i in range(count)))
+
+class Generator:
+    def __init__(self, seed: int, tag_vocabulary: int = 400, folders: int = 40, vocabulary: int = 5000):
+        self.rng = random.Random(seed)
+        self.tags = [f"tag-{i}" for i in range(tag_vocabulary)]
+        self.folders = [f"folder-{i}" for i in range(folders)]
+        self.words = list(dict.fromkeys(WORDS + self._tail_words(vocabulary)))
+        # Zipf weights (s = 1.1 for labels, 1.0 for words): the first values dominate, the tail stays rare
+        self.tag_weights = _zipf(tag_vocabulary, 1.1)
+        self.folder_weights = _zipf(folders, 1.1)
+        self.word_weights = _zipf(len(self.words), 1.0)
+
+    def _tail_words(self, count: int) -> list:
+        words = set()
+        while len(words) < count:
+            if self.rng.random() < 0.6:
+                words.add("".join(self.rng.choices(SYLLABLES, k=self.rng.randint(2, 3))))
+            else:
+                words.add("".join(self.rng.choices(HANZI, k=self.rng.randint(2, 4))))
+        return sorted(words)
+
+    def text(self, words: int) -> str:
+        return " ".join(self.rng.choices(self.words, cum_weights=self.word_weights, k=words))
+
+    def day(self) -> str:
+        return (date(2016, 1, 1) + timedelta(days=self.rng.randrange(3650))).isoformat()
+
+    def pick_tags(self, low: int = 1, high: int = 5) -> list:
+        tags = self.rng.choices(self.tags, cum_weights=self.tag_weights, k=self.rng.randint(low, high))
+        return list(dict.fromkeys(tags))
+
+    def status(self, public: str, hidden: tuple) -> str:
+        return public if self.rng.random() < 0.85 else self.rng.choice(hidden)
+
+    def posts(self, count: int):
+        for i in range(count):
+            folder = self.rng.choices(self.folders, cum_weights=self.folder_weights)[0]
+            yield {
+                "title": f"{self.text(4)} {i}",
+                "date": self.day(),
+                "desc": self.text(self.rng.randint(10, 60)),
+                "url": f"/user/posts/{folder}/post-{i}",
+                "tags": self.pick_tags(),
+                "image": f"https://img.example.com/covers/{i}.jpg" if self.rng.random() < 0.3 else None,
+                "folder": folder,
+                "status": self.status("public", ("draft", "private")),
+            }
+
+    def diaries(self, count: int):
+        for _ in range(count):
+            yield {
+                "date": self.day(),
+                "content": self.text(self.rng.randint(20, 200)),
+                "mood": self.rng.choice(MOODS),
+                "weather": self.rng.choice(WEATHERS),
+                "images": [f"https://img.example.com/diary/{self.rng.randrange(10**6)}.jpg" for _ in range(self.rng.choice((0, 0, 0, 1, 2, 4)))],
+            }
+
+    def gallery(self, count: int):
+        for i in range(count):
+            yield {
+                "title": self.text(3),
+                "url": f"https://img.example.com/gallery/{i}.jpg",
+                "date": self.day(),
+                "tags": self.pick_tags(0, 4),
+                "status": self.status("published", ("draft", "archived")),
+            }
+
+    def books(self, count: int):
+        for i in range(count):
+            yield {
+                "title": f"{self.text(3)} {i}",
+                "cover": f"https://img.example.com/books/{i}.jpg",
+                "url": f"https://books.example.com/{i}",
+                "status": self.status("published", ("draft", "archived")),
+                "rating": self.rng.randint(1, 5),
+                "tags": self.pick_tags(1, 3),
+            }
+
+    def projects(self, count: int):
+        for i in range(count):
+            yield {
+                "name": f"project-{i}",
+                "description": self.text(self.rng.randint(10, 40)),
+                "link": f"https://git.example.com/project-{i}",
+                "techStack": self.rng.sample(TECH, self.rng.randint(1, 4)),
+                "status": self.rng.choice(("completed", "ongoing", "paused")),
+                "visibility": self.status("published", ("draft", "archived")),
+            }
+
+    def todos(self, count: int):
+        for _ in range(count):
+            yield {
+                "task": self.text(6),
+                "completed": self.rng.random() < 0.4,
+                "priority": self.rng.choice(PRIORITIES),
+                "type": self.rng.choice(TODO_TYPES),
+                "progress": self.rng.randrange(0, 101, 10),
+                "icon": None,
+                "status": self.status("published", ("draft", "archived")),
+            }
+
+    def tools(self, count: int):
+        for i in range(count):
+            yield {
+                "name": f"tool-{i}",
+                "description": self.text(12),
+                "url": f"https://tools.example.com/{i}",
+                "icon": None,
+                "category": self.rng.choice(TOOL_CATEGORIES),
+                "status": self.status("published", ("draft", "archived")),
+            }
+
+    def article(self, row: dict) -> str:
+        paragraphs = "\n\n".join(self.text(self.rng.randint(40, 120)) for _ in range(self.rng.randint(2, 8)))
+        return f"# {row['title']}\n\n{paragraphs}\n"
+
+def _insert(db, model, rows, batch_size: int = 5000):
+    from sqlalchemy import insert
+
+    for batch in itertools.batched(rows, batch_size):
+        db.execute(insert(model), list(batch))
+
+def generate(db, counts: dict, seed: int = 42, article_files: int = 0, base_path: str = "frontend/blog") -> dict:
+    """
+    Inserts the generated rows, then builds the tag index, facet counts and
+    search index the same way a migrated database has them. Writes the
+    markdown files of the first `article_files` posts under base_path.
+    Returns the number of rows per resource.
+    """
+    from app.crud import blog as crud
+    from app.models import blog as models
+    from app.utils.security import hash_password
+
+    generator = Generator(seed)
+    tables = {
+        "posts": models.Post,
+        "diaries": models.Diary,
+        "gallery": models.Gallery,
+        "books": models.Book,
+        "projects": models.Project,
+        "todos": models.Todo,
+        "tools": models.Tool,
+    }
+    for resource, model in tables.items():
+        count = counts.get(resource, 0)
+        if resource == "posts" and article_files:
+            rows = list(generator.posts(count))
+            for row in rows[:article_files]:
+                file_path = os.path.join(base_path, row["url"].split("/user/posts/")[-1] + ".md")
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                with open(file_path, "w", encoding="utf-8") as f:
+                    f.write(generator.article(row))
+        else:
+            rows = getattr(generator, resource)(count)
+        _insert(db, model, rows)
+
+    if not crud.get_admin_by_username(db, ADMIN_USERNAME):
+        db.add(models.Admin(username=ADMIN_USERNAME, password=hash_password(ADMIN_PASSWORD)))
+    db.commit()
+
+    crud.rebuild_content_tags(db)
+    crud.rebuild_facet_counts(db)
+    crud.rebuild_search_index(db)
+    db.commit()
+    return {resource: counts.get(resource, 0) for resource in tables}
+
+def add_count_arguments(parser: argparse.ArgumentParser):
+    for resource, count in DEFAULT_COUNTS.items():
+        parser.add_argument(f"--{resource}", type=int, default=count, help=f"number of {resource} (default {count})")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--article-files", type=int, default=200, help="posts that get a markdown file")
+
+def counts_from_args(args) -> dict:
+    return {resource: getattr(args, resource) for resource in DEFAULT_COUNTS}
+
+def seed_database(args) -> dict:
+    # Imported late: DATABASE_URL must be set before app.core.database creates its engines
+    from app.core.database import Base, engine, SessionLocal
+    from app.core.migrations import run_migrations
+    from app.models import blog as models # noqa: F401, registers the tables
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    with SessionLocal() as db:
+        return generate(db, counts_from_args(args), seed=args.seed, article_files=args.article_files)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="SQLite file to create (must not exist)")
+    add_count_arguments(parser)
+    args = parser.parse_args()
+    if os.path.exists(args.db):
+        parser.error(f"{args.db} already exists")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.db)}"
+    os.makedirs(os.path.dirname(os.path.abspath(args.db)), exist_ok=True)
+    os.chdir(os.path.dirname(os.path.abspath(args.db)))
+    print(json.dumps(seed_database(args)))
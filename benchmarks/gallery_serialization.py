@@ -0,0 +1,106 @@
+"""
+Measures the per-row cost of serializing a gallery page: the previous path
+(JSON tags decoded by a pydantic validator, every row validated by the
+response model, then dumped) against JSONList columns encoded with
+row_encoder/orjson.
+
+Usage:
+    uv run python -m benchmarks.gallery_serialization --items 1000 --rounds 50
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000, help="number of seeded gallery items (one page)")
+    parser.add_argument("--rounds", type=int, default=50, help="timed rounds per variant")
+    return parser.parse_args()
+
+def measure(fn, rounds: int, items: int) -> dict:
+    fn() # warm up
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    median = statistics.median(timings)
+    return {
+        "page_ms": round(median * 1000, 3),
+        "per_row_us": round(median / items * 1_000_000, 3),
+    }
+
+def main(args):
+    from typing import List
+    from pydantic import TypeAdapter
+    from sqlalchemy import Column, Integer, String, Text, insert, select
+    from sqlalchemy.orm import declarative_base
+    from app.core.database import Base, engine, SessionLocal, ReadSessionLocal
+    from app.core.serialization import row_encoder
+    from app.models import blog as models
+    from app.schemas import blog as schemas
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.execute(insert(models.Gallery), [
+            {"title": f"Photo {i}", "url": f"https://img.example.com/{i}.jpg", "date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+             "tags": ["bench", f"t{i % 50}", "风景"], "status": "published"}
+            for i in range(args.items)
+        ])
+        db.commit()
+
+    # The gallery model as it was before JSONList: tags stay the stored JSON text
+    class LegacyGallery(declarative_base()):
+        __tablename__ = "gallery"
+        id = Column(Integer, primary_key=True)
+        title = Column(String)
+        url = Column(String)
+        date = Column(String)
+        tags = Column(Text)
+        status = Column(String)
+
+    adapter = TypeAdapter(List[schemas.Gallery])
+    encode = row_encoder(List[schemas.Gallery])
+    legacy_query = select(LegacyGallery).order_by(LegacyGallery.id)
+    orm_query = select(models.Gallery).order_by(models.Gallery.id)
+
+    def load_and(query, serialize):
+        with ReadSessionLocal() as session:
+            return serialize(session.scalars(query).all())
+
+    with ReadSessionLocal() as db:
+        legacy_rows = db.scalars(legacy_query).all()
+        orm_rows = db.scalars(orm_query).all()
+
+        def validate_and_dump_rows(rows):
+            return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+        def validate_and_dump():
+            return validate_and_dump_rows(legacy_rows)
+
+        def encode_rows():
+            return encode(orm_rows)
+
+        assert json.loads(validate_and_dump()) == json.loads(encode_rows())
+        results = {
+            "serialize": {
+                "validate_and_dump": measure(validate_and_dump, args.rounds, args.items),
+                "row_encoder": measure(encode_rows, args.rounds, args.items),
+            },
+            # Includes the query and object loading (and the JSONList decode) on a fresh session
+            "load_and_serialize": {
+                "validate_and_dump": measure(lambda: load_and(legacy_query, validate_and_dump_rows), args.rounds, args.items),
+                "row_encoder": measure(lambda: load_and(orm_query, encode), args.rounds, args.items),
+            },
+        }
+    print(json.dumps({"items": args.items, "rounds": args.rounds, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="nayukiblog-bench-")
+    # Must be set before app.core.database creates its engines
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    main(args)
@@ -35,3 +35,15 @@ export function apiUrl(path: string): string {
   const normalizedPath = path.startsWith('/') ? path : `/${path}`;
   return `${base}${normalizedPath}`;
 }
+
+/**
+ * 构建浏览器可访问的图片地址
+ * 上传的图片保存为相对路径（如 /uploads/...），由后端提供；外部图片地址原样返回
+ * 页面在服务端渲染，但图片由浏览器加载，所以使用 PUBLIC_API_BASE 而不是服务端地址
+ * @param path 图片地址
+ * @returns 完整的图片地址
+ */
+export function mediaUrl(path: string): string {
+  if (!path.startsWith('/') || path.startsWith('//')) return path;
+  return `${import.meta.env.PUBLIC_API_BASE || ''}${path}`;
+}
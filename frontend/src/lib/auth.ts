@@ -0,0 +1,46 @@
+/**
+ * 管理端登录令牌工具
+ * 后端 /api/admin/login 签发 HMAC 签名令牌，前端存于 auth_token Cookie，
+ * 请求 /api/admin 时以 Authorization: Bearer 头发送
+ */
+import type { AstroCookies } from 'astro';
+
+export const AUTH_COOKIE = 'auth_token';
+
+/**
+ * 读取令牌声明（不校验签名，签名由后端校验）
+ * @param token 形如 base64url(声明).base64url(签名)
+ */
+function readClaims(token: string): { sub?: string; exp?: number } | null {
+  const [payload, signature] = token.split('.');
+  if (!payload || !signature) return null;
+  try {
+    const base64 = payload.replace(/-/g, '+').replace(/_/g, '/');
+    return JSON.parse(atob(base64));
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * 获取 Cookie 中未过期的管理端令牌
+ * @returns 令牌，未登录或已过期时返回 null
+ */
+export function getAdminToken(cookies: AstroCookies): string | null {
+  const token = cookies.get(AUTH_COOKIE)?.value;
+  if (!token) return null;
+  const claims = readClaims(token);
+  if (!claims || typeof claims.exp !== 'number' || claims.exp * 1000 <= Date.now()) {
+    return null;
+  }
+  return token;
+}
+
+/**
+ * 服务端渲染时请求 /api/admin 所需的请求头
+ * 浏览器端请求由 AdminAuth 组件统一附加，SSR 中的 fetch 需显式传入
+ */
+export function adminHeaders(cookies: AstroCookies): Record<string, string> {
+  const token = getAdminToken(cookies);
+  return token ? { Authorization: `Bearer ${token}` } : {};
+}
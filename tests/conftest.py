@@ -0,0 +1,89 @@
+"""
+Shared fixtures. The tests run against one temporary database, emptied after
+every test; DATABASE_URL must point at it before the app is imported.
+"""
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timezone
+
+import pytest
+
+_workdir = tempfile.mkdtemp(prefix="nayukiblog-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'blog.db')}"
+os.environ["TIMING_LOG_LEVEL"] = "WARNING"
+os.environ["RENDER_WARMUP"] = "0"
+os.environ["EXPORT_DIR"] = ""
+# Re-read content_versions on every cached request, so writes from other processes show at once
+os.environ["CACHE_VERSION_CHECK_MS"] = "0"
+os.environ["PASSWORD_SCRYPT_N"] = "1024"
+# The db fixture keeps a writer connection open next to the app's own
+os.environ["DB_WRITE_POOL_SIZE"] = "2"
+# Article files, the render cache and uploads are resolved against the working directory
+os.chdir(_workdir)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.core.cache import response_cache  # noqa: E402
+from app.core.database import Base, SessionLocal  # noqa: E402
+from app.crud import blog as crud  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import blog as models  # noqa: E402
+from app.utils.security import hash_password  # noqa: E402
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.rollback()
+    for table in reversed(Base.metadata.sorted_tables):
+        # Versions only move forward, as in the in-process cache
+        if table.name != "content_versions":
+            session.execute(table.delete())
+    session.execute(text("DELETE FROM search_index"))
+    session.commit()
+    session.close()
+    response_cache.clear()
+
+@pytest.fixture
+def client(db):
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def make_post(db):
+    def make_post(title, tags="[]", status="public", folder="notes", date="2024-01-01", url=None):
+        return crud.create_post(db, title=title, date=date, folder=folder, tags=tags,
+                                status=status, desc="", url=url or f"{title}.md")
+    return make_post
+
+@pytest.fixture
+def write_from_another_process(db):
+    # A second connection that bypasses crud, as the sync and import scripts' processes do
+    def write_from_another_process(title):
+        with sqlite3.connect(os.environ["DATABASE_URL"].removeprefix("sqlite:///")) as conn:
+            conn.execute(
+                "INSERT INTO posts (title, date, url, tags, status) VALUES (?, '2024-01-01', ?, '[]', 'public')",
+                (title, f"{title}.md")
+            )
+            conn.execute(
+                "INSERT INTO content_versions (resource, version, updated_at) VALUES ('posts', 1, ?) "
+                "ON CONFLICT (resource) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at",
+                (datetime.now(timezone.utc).isoformat(),)
+            )
+    return write_from_another_process
+
+@pytest.fixture
+def facet_rows(db):
+    def facet_rows():
+        return sorted((f.resource, f.facet, f.status, f.value, f.count) for f in db.query(models.FacetCount))
+    return facet_rows
+
+@pytest.fixture
+def admin_client(client, db):
+    db.add(models.Admin(username="admin", password=hash_password("secret")))
+    db.commit()
+    response = client.post("/api/admin/login", json={"username": "admin", "password": "secret"})
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+    return client
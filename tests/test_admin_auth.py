@@ -0,0 +1,32 @@
+import hashlib
+
+from app.models import blog as models
+from app.utils.security import create_admin_token, verify_admin_token
+
+def _login(client, username, password):
+    return client.post("/api/admin/login", json={"username": username, "password": password})
+
+def test_token_rejects_non_ascii():
+    assert verify_admin_token("abc.é") is None
+    assert verify_admin_token("é.é") is None
+    assert verify_admin_token(create_admin_token("admin"))["sub"] == "admin"
+
+def test_non_ascii_bearer_is_unauthorized(client):
+    response = client.get("/api/admin/cache", headers={"Authorization": "Bearer é".encode()})
+    assert response.status_code == 401
+
+def test_stored_hash_is_not_a_password(client, db):
+    digest = hashlib.sha256(b"secret").hexdigest()
+    db.add(models.Admin(username="legacy", password=digest))
+    db.commit()
+    assert _login(client, "legacy", digest).status_code == 401
+    assert _login(client, "legacy", "secret").status_code == 200
+
+def test_plain_text_row_logs_in_and_is_rehashed(client, db):
+    admin = models.Admin(username="plain", password="pässwort")
+    db.add(admin)
+    db.commit()
+    assert _login(client, "plain", "wrong").status_code == 401
+    assert _login(client, "plain", "pässwort").status_code == 200
+    db.refresh(admin)
+    assert admin.password.startswith("scrypt$")
@@ -0,0 +1,17 @@
+import io
+import os
+import stat
+
+from app.services.article_service import ARTICLE_FILE_MODE, write_article_atomically
+
+def test_atomic_write_normalizes_and_keeps_default_mode(tmp_path):
+    target = tmp_path / "a.md"
+    write_article_atomically(io.BytesIO("body\r\nline\r".encode()), str(target), "---\ntitle: a\n---\n\n")
+    assert target.read_text(encoding="utf-8") == "---\ntitle: a\n---\n\nbody\nline\n"
+    assert stat.S_IMODE(os.stat(target).st_mode) == ARTICLE_FILE_MODE
+    assert os.listdir(tmp_path) == ["a.md"]
+
+def test_gbk_fallback(tmp_path):
+    target = tmp_path / "a.md"
+    write_article_atomically(io.BytesIO("---\n标题\n".encode("gbk")), str(target), "unused")
+    assert target.read_text(encoding="utf-8") == "---\n标题\n"
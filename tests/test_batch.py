@@ -0,0 +1,44 @@
+from app.crud import blog as crud
+
+def _versions(db):
+    return {v.resource: v.version for v in crud.get_content_versions(db)}
+
+def _assert_counts_match_rebuild(db, facet_rows):
+    incremental = facet_rows()
+    crud.rebuild_facet_counts(db)
+    assert facet_rows() == incremental
+
+def test_update_tags_counts_only_changed_rows(db, make_post, facet_rows):
+    a = make_post("a", '["python"]')
+    b = make_post("b", '["web"]')
+    c = make_post("c", '["python", "web"]')
+    assert crud.batch_update_tags(db, "posts", [a.id, b.id, c.id], add=["web"]) == [a.id]
+    assert crud.get_facet_counts(db, "posts", "tags") == [("python", 2), ("web", 3)]
+    assert crud.batch_update_tags(db, "posts", [a.id, b.id], remove=["python"]) == [a.id]
+    assert crud.get_facet_counts(db, "posts", "tags") == [("python", 1), ("web", 3)]
+    assert [p.id for p in crud.get_posts(db, tags=["python"])] == [c.id]
+    _assert_counts_match_rebuild(db, facet_rows)
+
+def test_update_tags_without_changes_writes_nothing(db, make_post):
+    a = make_post("a", '["python"]')
+    versions = _versions(db)
+    head = crud.get_journal_head(db)
+    assert crud.batch_update_tags(db, "posts", [a.id, 999], add=["python"]) == []
+    assert _versions(db) == versions
+    assert crud.get_journal_head(db) == head
+
+def test_set_status_and_delete(db, make_post, facet_rows):
+    a = make_post("a", '["python"]').id
+    b = make_post("b", '["web"]', status="draft").id
+    assert crud.batch_set_status(db, "posts", [a, b, 999], "draft") == [a, b]
+    assert crud.get_facet_counts(db, "posts", "tags", status="public") == []
+    assert crud.batch_delete(db, "posts", [a, 999]) == [(a, "a.md")]
+    assert crud.get_facet_counts(db, "posts", "tags") == [("web", 1)]
+    assert crud.get_posts(db, tags=["python"]) == []
+    _assert_counts_match_rebuild(db, facet_rows)
+
+def test_batch_endpoint(admin_client, make_post):
+    a = make_post("a", '["python"]')
+    response = admin_client.post("/api/admin/articles/batch", json={"action": "add_tags", "ids": [a.id], "tags": ["web"]})
+    assert response.json() == {"status": "success", "action": "add_tags", "affected": [a.id]}
+    assert admin_client.get("/api/user/articles/tags").json() == {"tags": ["python", "web"]}
@@ -0,0 +1,32 @@
+from app.crud import blog as crud
+from app.models import blog as models
+
+def _index(db, resource="posts"):
+    return sorted(
+        (row.tag, row.item_id)
+        for row in db.query(models.ContentTag).filter(models.ContentTag.resource == resource)
+    )
+
+def test_tag_filter_requires_every_tag(db, make_post):
+    a = make_post("a", '["python", "web"]')
+    b = make_post("b", '["python"]')
+    make_post("c", '["web"]')
+    assert {p.id for p in crud.get_posts(db, tags=["python"])} == {a.id, b.id}
+    assert [p.id for p in crud.get_posts(db, tags=["python", "web"])] == [a.id]
+    assert crud.get_posts(db, tags=["python", "rust"]) == []
+
+def test_index_follows_create_update_delete(db, make_post):
+    post = make_post("a", '["python", "web"]')
+    assert _index(db) == [("python", post.id), ("web", post.id)]
+    crud.update_post(db, post.id, tags='["rust"]')
+    assert _index(db) == [("rust", post.id)]
+    crud.delete_post(db, post.id)
+    assert _index(db) == []
+
+def test_rebuild_matches_incremental_index(db, make_post):
+    make_post("a", '["python", "web"]')
+    make_post("b", '["python", "python"]')
+    crud.create_project(db, name="p", description="", link="", techStack='["go"]', status="active", visibility="published")
+    incremental = _index(db), _index(db, "projects")
+    crud.rebuild_content_tags(db)
+    assert (_index(db), _index(db, "projects")) == incremental
@@ -0,0 +1,29 @@
+from app.crud import blog as crud
+
+def _walk(db, limit, sort):
+    ids, cursor = [], ""
+    while True:
+        items, cursor = crud.get_posts_page(db, cursor=cursor, limit=limit, sort=sort)
+        ids += [p.id for p in items]
+        if cursor is None:
+            return ids
+
+def test_pages_match_offset_order(db, make_post):
+    # Repeated and missing dates exercise the (date, id) tie-break and the NULL zone
+    dates = ["2024-01-02", None, "2024-01-01", "2024-01-02", None, "2024-01-03", "2024-01-01"]
+    for i, date in enumerate(dates):
+        make_post(f"p{i}", date=date)
+    for sort in ("desc", "asc"):
+        expected = [p.id for p in crud.get_posts(db, sort=sort)]
+        for limit in (1, 2, 3, 7, 10):
+            assert _walk(db, limit, sort) == expected
+
+def test_endpoint_pages_and_rejects_bad_cursor(client, make_post):
+    for i, date in enumerate(["2024-01-01", "2024-01-02", "2024-01-03"]):
+        make_post(f"p{i}", date=date)
+    first = client.get("/api/user/posts", params={"cursor": "", "limit": 2}).json()
+    assert [p["title"] for p in first["items"]] == ["p2", "p1"]
+    second = client.get("/api/user/posts", params={"cursor": first["next_cursor"], "limit": 2}).json()
+    assert [p["title"] for p in second["items"]] == ["p0"]
+    assert second["next_cursor"] is None
+    assert client.get("/api/user/posts", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,33 @@
+from app.crud import blog as crud
+
+def _diary(db, date, mood=None, weather=None):
+    return crud.create_diary(db, date, "entry", mood, weather, "[]")
+
+def test_archive_groups_by_year_and_month(db, client):
+    _diary(db, "2023-12-31", "calm", "snow")
+    _diary(db, "2024-01-05", "happy", "sunny")
+    _diary(db, "2024-01-20", "happy", "rain")
+    _diary(db, "2024-03-02", "tired")
+    # Dates that do not start with a year land in year 0, after every real year
+    _diary(db, "undated")
+
+    archive = client.get("/api/user/diaries/archive").json()
+    assert archive["total"] == 5
+    assert [(y["year"], y["count"]) for y in archive["years"]] == [(2024, 3), (2023, 1), (0, 1)]
+    year = archive["years"][0]
+    assert [(m["month"], m["count"]) for m in year["months"]] == [(3, 1), (1, 2)]
+    assert year["moods"] == {"happy": 2, "tired": 1}
+    assert year["months"][1]["weathers"] == {"sunny": 1, "rain": 1}
+
+def test_archive_matches_the_public_listing(db, client):
+    # Diaries carry no status: the archive counts exactly what /api/user/diaries lists
+    for date in ("2024-01-05", "2024-01-20", "2024-02-01"):
+        _diary(db, date)
+    archive = client.get("/api/user/diaries/archive").json()
+    assert archive["total"] == len(client.get("/api/user/diaries").json()) == 3
+    january = client.get("/api/user/diaries", params={"year": "2024", "month": "1"}).json()
+    assert len(january) == archive["years"][0]["months"][1]["count"] == 2
+    assert crud.get_diaries_count(db, year="2024", month="1") == 2
+    # Writes invalidate the cached archive
+    crud.delete_diary(db, january[0]["id"])
+    assert client.get("/api/user/diaries/archive").json()["total"] == 2
@@ -0,0 +1,39 @@
+import json
+import os
+
+from app.core.database import ReadSessionLocal
+from app.crud import blog as crud
+from app.services import export_service
+from app.services.export_service import export_static
+
+def _posts(out_dir) -> list:
+    with open(os.path.join(out_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    titles = []
+    for name in manifest["lists"]["posts"]["pages"]:
+        with open(os.path.join(out_dir, name), encoding="utf-8") as f:
+            titles += [item["title"] for item in json.load(f)["items"]]
+    return manifest["journal_id"], titles
+
+def test_export_reads_one_snapshot(db, make_post, write_from_another_process, tmp_path, monkeypatch):
+    make_post("a")
+    get_journal_head = crud.get_journal_head
+
+    def head_then_write(session):
+        head = get_journal_head(session)
+        # Committed by another connection after the export read the journal head
+        write_from_another_process("late")
+        return head
+    monkeypatch.setattr(crud, "get_journal_head", head_then_write)
+    with ReadSessionLocal() as session:
+        report = export_static(session, str(tmp_path))
+    assert _posts(tmp_path) == (report["journal_id"], ["a"])
+
+def test_batched_loads_keep_the_public_filter(db, make_post):
+    public = [make_post(f"p{i}") for i in range(4)]
+    draft = make_post("draft", status="draft")
+    spec = export_service.EXPORTED_RESOURCES["posts"]
+    # Few ids out of a long list: loaded with IN batches
+    with ReadSessionLocal() as session:
+        encoded = export_service._load_encoded(session, spec, {public[0].id, draft.id}, list_size=100)
+    assert set(encoded) == {public[0].id}
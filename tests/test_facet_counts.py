@@ -0,0 +1,31 @@
+from app.crud import blog as crud
+
+def test_counts_by_status(db, make_post):
+    make_post("a", '["python", "web"]')
+    make_post("b", '["python"]', status="draft")
+    assert crud.get_facet_counts(db, "posts", "tags") == [("python", 2), ("web", 1)]
+    assert crud.get_facet_counts(db, "posts", "tags", status="draft") == [("python", 1)]
+
+def test_writes_keep_counts_equal_to_rebuild(db, make_post, facet_rows):
+    a = make_post("a", '["python", "web"]')
+    b = make_post("b", '["python"]', folder="notes/deep")
+    crud.update_post(db, a.id, tags='["rust"]', status="draft")
+    crud.delete_post(db, b.id)
+    crud.create_todo(db, task="t", priority="high", type="bug", progress=0, icon="", status="open", completed=False)
+    incremental = facet_rows()
+    crud.rebuild_facet_counts(db)
+    assert facet_rows() == incremental
+    # Rows that drop to zero are removed
+    assert all(count > 0 for *_, count in incremental)
+
+def test_public_endpoints(client, make_post):
+    make_post("a", '["python", "web"]')
+    make_post("b", '["python"]', folder="notes/deep")
+    make_post("c", '["secret"]', status="draft")
+    assert client.get("/api/user/articles/tags").json() == {"tags": ["python", "web"]}
+    assert client.get("/api/user/articles/tags?counts=true").json() == {
+        "tags": [{"tag": "python", "count": 2}, {"tag": "web", "count": 1}]
+    }
+    assert client.get("/api/user/articles/categories").json() == {
+        "categories": [{"path": "notes", "count": 1}, {"path": "notes/deep", "count": 1}]
+    }
@@ -0,0 +1,86 @@
+import asyncio
+import base64
+import io
+
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+
+from app.core import config
+from app.services import image_service
+
+class _CountingFile(io.BytesIO):
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+def test_oversized_upload_stops_reading(monkeypatch):
+    monkeypatch.setattr(config, "IMAGE_MAX_MB", 1)
+    source = _CountingFile(b"\0" * (8 * image_service.READ_CHUNK_SIZE))
+    with pytest.raises(ValueError, match="larger than 1 MB"):
+        asyncio.run(image_service.store_image(UploadFile(source, filename="big.png")))
+    assert source.bytes_read <= 2 * image_service.READ_CHUNK_SIZE
+
+def _png(width, height) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 80, 40)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+def _upload(client, data: bytes, filename="photo.png"):
+    return client.post("/api/admin/images", files={"file": (filename, data, "application/octet-stream")})
+
+def test_upload_writes_variants_and_placeholder(admin_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "UPLOAD_DIR", str(tmp_path))
+    data = _png(1200, 600)
+    try:
+        first = _upload(admin_client, data).json()
+    finally:
+        image_service.shutdown_image_pool()
+    assert (first["width"], first["height"]) == (1200, 600)
+    # Variants are not upscaled: large keeps the original width
+    assert first["variant_widths"] == {"thumb": 320, "medium": 960, "large": 1200}
+
+    def stored(url):
+        return tmp_path / url.removeprefix(f"{config.UPLOAD_URL}/")
+    assert stored(first["url"]).read_bytes() == data
+    for name, url in first["variants"].items():
+        with Image.open(stored(url)) as variant:
+            assert (variant.format, variant.width) == ("WEBP", first["variant_widths"][name])
+    prefix = "data:image/webp;base64,"
+    assert first["placeholder"].startswith(prefix)
+    with Image.open(io.BytesIO(base64.b64decode(first["placeholder"].removeprefix(prefix)))) as placeholder:
+        assert placeholder.size == (image_service.PLACEHOLDER_EDGE, image_service.PLACEHOLDER_EDGE // 2)
+
+    # Same bytes: answered from the stored metadata, never processed again
+    def no_pool():
+        raise AssertionError("image processed twice")
+    monkeypatch.setattr(image_service, "_get_pool", no_pool)
+    again = _upload(admin_client, data, filename="copy.png").json()
+    assert again == first
+
+def test_rejects_non_images_and_oversized_uploads(admin_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "UPLOAD_DIR", str(tmp_path))
+    try:
+        response = _upload(admin_client, b"just some text", filename="notes.png")
+    finally:
+        image_service.shutdown_image_pool()
+    assert (response.status_code, response.json()["detail"]) == (400, "Not an image file")
+    monkeypatch.setattr(config, "IMAGE_MAX_MB", 0)
+    response = _upload(admin_client, _png(10, 10))
+    assert (response.status_code, response.json()["detail"]) == (400, "Image larger than 0 MB")
+    assert not any(tmp_path.rglob("*.*"))
+
+def test_variant_widths_match_thumbnail():
+    for size in ((4000, 3000), (333, 1000), (1001, 3000), (320, 320), (100, 2000)):
+        image = Image.new("RGB", size)
+        expected = {}
+        for name, edge in image_service.IMAGE_VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((edge, edge))
+            expected[name] = resized.width
+        assert image_service.variant_widths(*size) == expected
@@ -0,0 +1,60 @@
+import io
+import zipfile
+
+from app.core import config
+from app.crud import blog as crud
+from app.services.import_service import import_articles
+
+def _zip(files: dict) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, text in files.items():
+            zf.writestr(name, text)
+    buffer.seek(0)
+    return buffer
+
+def test_import_reports_unsafe_and_skips_non_articles(db, tmp_path):
+    archive = _zip({
+        "notes/a.md": "---\ntitle: A\ntags: [x]\n---\nbody",
+        "../evil.md": "nope",
+        "__MACOSX/notes/._a.md": "junk",
+        "notes/image.png": "png",
+    })
+    report = import_articles(db, archive, base_path=str(tmp_path))
+    assert [(e["file"], e["status"]) for e in report] == [("notes/a.md", "created"), ("../evil.md", "error")]
+    assert report[1]["error"] == "Unsafe path"
+    assert not (tmp_path.parent / "evil.md").exists()
+    post = crud.get_post(db, report[0]["id"])
+    assert (post.title, post.folder, post.status) == ("A", "notes", "draft")
+
+def test_oversized_member_is_not_read(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "IMPORT_MAX_FILE_MB", 0)
+    report = import_articles(db, _zip({"a.md": "body"}), base_path=str(tmp_path))
+    assert report == [{"file": "a.md", "status": "error", "error": "File larger than 0 MB"}]
+    assert not (tmp_path / "a.md").exists()
+
+def test_reimport_keeps_status(db, tmp_path):
+    first = import_articles(db, _zip({"a.md": "v1"}), status="draft", base_path=str(tmp_path))
+    crud.update_post(db, first[0]["id"], status="public")
+    second = import_articles(db, _zip({"a.md": "v2"}), status="draft", base_path=str(tmp_path))
+    assert second[0]["status"] == "updated"
+    db.expire_all()
+    assert crud.get_post(db, first[0]["id"]).status == "public"
+    assert (tmp_path / "a.md").read_text(encoding="utf-8").endswith("v2")
+
+def test_failed_upsert_keeps_the_old_file(db, tmp_path, monkeypatch):
+    import_articles(db, _zip({"a.md": "v1"}), base_path=str(tmp_path))
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(crud, "upsert_posts", fail)
+    report = import_articles(db, _zip({"a.md": "v2", "b.md": "new"}), base_path=str(tmp_path))
+    assert [e["status"] for e in report] == ["error", "error"]
+    assert (tmp_path / "a.md").read_text(encoding="utf-8").endswith("v1")
+    # Staged files are discarded, not left next to the articles
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.md"]
+
+def test_imported_body_is_searchable(db, tmp_path):
+    import_articles(db, _zip({"a.md": "---\ntitle: A\n---\nzebra crossing"}), status="public", base_path=str(tmp_path))
+    total, items = crud.search(db, "zebra")
+    assert total == 1 and items[0]["title"] == "A"
@@ -0,0 +1,68 @@
+import math
+import re
+
+# One sample line of the text exposition format: name{label="value",...} value
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"(?:,|$)')
+
+def _parse(text: str) -> dict:
+    """
+    Parses Prometheus text output into {name: [(labels, value), ...]},
+    failing on any line that does not follow the format.
+    """
+    assert text.endswith("\n")
+    types, samples = {}, {}
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            continue
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            assert kind in ("counter", "gauge", "histogram") and name not in types
+            types[name] = kind
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"not a sample line: {line!r}"
+        name, labels, value = match.groups()
+        parsed = dict(LABEL.findall(labels or ""))
+        assert "".join(f'{k}="{v}",' for k, v in parsed.items()).rstrip(",") == (labels or "")
+        base = re.sub(r"_(bucket|sum|count)$", "", name)
+        assert name in types or types.get(base) == "histogram", f"sample without # TYPE: {name}"
+        assert not math.isnan(float(value))
+        samples.setdefault(name, []).append((parsed, float(value)))
+    return samples
+
+def _requests(samples: dict, route: str) -> float:
+    return sum(v for labels, v in samples.get("nayukiblog_http_requests_total", []) if labels["route"] == route)
+
+def test_metrics_parse_as_prometheus_text(client):
+    client.get("/api/user/posts")
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _parse(response.text)
+    # Histogram buckets are cumulative and end in +Inf == _count
+    series = {"method": "GET", "route": "/api/user/posts", "status": "200"}
+    buckets = [
+        (labels.pop("le"), v) for labels, v in samples["nayukiblog_http_request_duration_seconds_bucket"]
+        if series.items() <= labels.items()
+    ]
+    values = [v for _, v in buckets]
+    assert values == sorted(values) and buckets[-1][0] == "+Inf"
+    [count] = [v for labels, v in samples["nayukiblog_http_request_duration_seconds_count"] if labels == series]
+    assert values[-1] == count >= 1
+    assert {labels["pool"] for labels, _ in samples["nayukiblog_db_pool_size"]} == {"write", "read", "async_read"}
+
+def test_requests_are_labelled_by_route_template(client, make_post):
+    posts = [make_post(f"p{i}", url=f"/user/posts/p{i}") for i in range(3)]
+    before = _parse(client.get("/metrics").text)
+    for post in posts:
+        client.get(f"/api/user/posts/{post.id}/content")
+    client.get("/no/such/page")
+    client.get("/api/user/nothing-here")
+    after = _parse(client.get("/metrics").text)
+
+    template = "/api/user/posts/{post_id}/content"
+    assert _requests(after, template) - _requests(before, template) == 3
+    routes = {labels["route"] for labels, _ in after["nayukiblog_http_requests_total"]}
+    assert not any(str(post.id) in route.split("/") for route in routes for post in posts)
+    assert "/no/such/page" not in routes
+    assert _requests(after, "unmatched") - _requests(before, "unmatched") == 2
@@ -0,0 +1,67 @@
+import json
+
+from sqlalchemy import create_engine, text
+
+from app.core.database import Base
+from app.core.migrations import MIGRATIONS, run_migrations
+
+# Content tables as created by the first release, before any migration
+BASELINE_SCHEMA = [
+    "CREATE TABLE books (id INTEGER NOT NULL, title VARCHAR NOT NULL, cover VARCHAR, url VARCHAR, "
+    "status VARCHAR, rating INTEGER, tags TEXT, PRIMARY KEY (id))",
+    "CREATE TABLE diaries (id INTEGER NOT NULL, date VARCHAR NOT NULL, content TEXT, mood VARCHAR, "
+    "weather VARCHAR, images TEXT, PRIMARY KEY (id))",
+    "CREATE TABLE gallery (id INTEGER NOT NULL, title VARCHAR, url VARCHAR NOT NULL, date VARCHAR, "
+    "tags TEXT, status VARCHAR, PRIMARY KEY (id))",
+    "CREATE TABLE posts (id INTEGER NOT NULL, title VARCHAR NOT NULL, date VARCHAR, \"desc\" TEXT, "
+    "url VARCHAR, tags TEXT, image VARCHAR, folder VARCHAR, status VARCHAR, PRIMARY KEY (id))",
+    "CREATE TABLE projects (id INTEGER NOT NULL, name VARCHAR NOT NULL, description TEXT, link VARCHAR, "
+    "\"techStack\" TEXT, status VARCHAR, visibility VARCHAR, PRIMARY KEY (id))",
+    "CREATE TABLE todos (id INTEGER NOT NULL, task VARCHAR NOT NULL, completed BOOLEAN, priority VARCHAR, "
+    "type VARCHAR, progress INTEGER, icon VARCHAR, status VARCHAR, PRIMARY KEY (id))",
+    "CREATE TABLE tools (id INTEGER NOT NULL, name VARCHAR NOT NULL, description TEXT, url VARCHAR, "
+    "icon VARCHAR, category VARCHAR, status VARCHAR, PRIMARY KEY (id))",
+    "CREATE TABLE admins (id INTEGER NOT NULL, username VARCHAR NOT NULL, password VARCHAR NOT NULL, "
+    "PRIMARY KEY (id), UNIQUE (username))",
+]
+
+def test_upgrade_baseline_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(text("INSERT INTO posts (title, date, url, tags, folder, status) VALUES ('Hello world', '2024-05-01', '/user/posts/hello', '[\"python\"]', 'notes', 'public')"))
+        conn.execute(text("INSERT INTO diaries (date, content, mood) VALUES ('2024-05-02', 'sunny afternoon', 'happy')"))
+        conn.execute(text("INSERT INTO projects (name, \"techStack\", visibility) VALUES ('blog', '[\"fastapi\"]', 'published')"))
+
+    # As at startup: create_all adds the new tables, migrations upgrade the old ones
+    Base.metadata.create_all(bind=engine)
+    assert run_migrations(engine) == [version for version, _, _ in MIGRATIONS]
+    assert run_migrations(engine) == []
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT year, month FROM diaries")).one() == (2024, 5)
+        assert conn.execute(text("SELECT tag FROM content_tags ORDER BY tag")).scalars().all() == ["fastapi", "python"]
+        found = conn.execute(text("SELECT resource FROM search_index WHERE search_index MATCH 'sunny' OR search_index MATCH 'Hello'")).scalars().all()
+        assert sorted(found) == ["diaries", "posts"]
+    engine.dispose()
+
+def test_gallery_variant_widths_backfill(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'v6.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE schema_version (version INTEGER PRIMARY KEY, description TEXT, applied_at TEXT)"))
+        conn.execute(text("INSERT INTO schema_version (version) VALUES (6)"))
+        conn.execute(text("INSERT INTO gallery (url, width, height, variants) VALUES ('/a.jpg', 3000, 2000, '{}')"))
+        conn.execute(text("INSERT INTO gallery (url, width, height, variants) VALUES ('/b.jpg', 500, 1000, '{}')"))
+        conn.execute(text("INSERT INTO gallery (url) VALUES ('https://example.com/c.jpg')"))
+
+    assert run_migrations(engine) == [7]
+    with engine.connect() as conn:
+        widths = conn.execute(text("SELECT variant_widths FROM gallery ORDER BY id")).scalars().all()
+    assert [json.loads(w) if w else None for w in widths] == [
+        {"thumb": 320, "medium": 960, "large": 1920},
+        {"thumb": 160, "medium": 480, "large": 500},
+        None,
+    ]
+    engine.dispose()
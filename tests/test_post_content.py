@@ -0,0 +1,21 @@
+import os
+
+def test_content_follows_file_edits(client, make_post):
+    os.makedirs("frontend/blog", exist_ok=True)
+    path = "frontend/blog/edited.md"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("---\ntitle: Edited\n---\n# First\n")
+    post = make_post("Edited", url="/user/posts/edited")
+    first = client.get(f"/api/user/posts/{post.id}/content").json()
+    assert first["toc"] == [{"depth": 1, "slug": "first", "text": "First"}]
+
+    # Changed on disk only, no posts write
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("---\ntitle: Edited\n---\n# Second heading\n")
+    second = client.get(f"/api/user/posts/{post.id}/content").json()
+    assert second["html"] == '<h1 id="second-heading">Second heading</h1>\n'
+    os.remove(path)
+
+def test_draft_content_is_hidden(client, make_post):
+    post = make_post("d", status="draft", url="/user/posts/d")
+    assert client.get(f"/api/user/posts/{post.id}/content").status_code == 404
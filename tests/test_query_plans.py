@@ -0,0 +1,14 @@
+from app.crud import blog as crud
+from app.crud.query_plans import QUERY_SHAPES, check_query_plans, explain
+
+def test_no_full_scans_on_migrated_schema(db):
+    assert check_query_plans(db) == []
+
+def test_folder_filter_uses_folder_index(db):
+    factory = dict((name, factory) for name, factory, _ in QUERY_SHAPES)["posts by folder"]
+    assert any("ix_posts_folder_status_date" in detail for detail in explain(db, factory(db)))
+
+def test_folder_filter_matches_folder_and_subfolders(db, make_post):
+    for folder in ("notes", "notes/deep", "notes2", "notes-x", "other/notes"):
+        make_post(folder, folder=folder)
+    assert sorted(p.folder for p in crud.get_posts(db, folder="notes")) == ["notes", "notes/deep"]
@@ -0,0 +1,78 @@
+import gzip
+
+import brotli
+
+from app.core.cache import response_cache
+from app.crud import blog as crud
+
+def test_write_invalidates(client, make_post):
+    assert client.get("/api/user/posts").json() == []
+    make_post("a")
+    assert [p["title"] for p in client.get("/api/user/posts").json()] == ["a"]
+
+def test_writes_only_invalidate_their_resource(client, db):
+    client.get("/api/user/posts")
+    client.get("/api/user/books")
+    crud.create_book(db, title="b", cover="", url="", status="published", rating=5, tags="[]")
+    hits = response_cache.stats()["hits"]
+    assert client.get("/api/user/posts").json() == []
+    assert response_cache.stats()["hits"] == hits + 1
+    assert [b["title"] for b in client.get("/api/user/books").json()] == ["b"]
+
+def test_conditional_get_until_write(client, make_post):
+    first = client.get("/api/user/posts")
+    etag = first.headers["ETag"]
+    assert client.get("/api/user/posts", headers={"If-None-Match": etag}).status_code == 304
+
+    make_post("a")
+    after = client.get("/api/user/posts", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert [p["title"] for p in after.json()] == ["a"]
+    assert after.headers["ETag"] != etag
+
+def test_writes_from_other_processes_invalidate(client, write_from_another_process):
+    first = client.get("/api/user/posts")
+    assert first.json() == []
+    write_from_another_process("outside")
+    after = client.get("/api/user/posts", headers={"If-None-Match": first.headers["ETag"]})
+    assert after.status_code == 200
+    assert [p["title"] for p in after.json()] == ["outside"]
+
+def test_version_checks_are_throttled(monkeypatch):
+    monkeypatch.setattr(response_cache, "version_check_ms", 60000)
+    monkeypatch.setattr(response_cache, "_next_version_check", 0.0)
+    assert response_cache.versions_due()
+    assert not response_cache.versions_due()
+
+def _fetch(client, accept_encoding, **headers):
+    # iter_raw() returns the body as sent, without decoding its Content-Encoding
+    with client.stream("GET", "/api/user/posts", headers={"Accept-Encoding": accept_encoding, **headers}) as response:
+        return response, b"".join(response.iter_raw())
+
+def test_large_bodies_use_the_negotiated_coding(client, make_post):
+    for i in range(30):
+        make_post(f"post {i} " + "x" * 100)
+    plain, identity = _fetch(client, "identity")
+    assert "Content-Encoding" not in plain.headers
+    br, br_body = _fetch(client, "gzip;q=0.5, br")
+    gz, gz_body = _fetch(client, "gzip")
+    assert (br.headers["Content-Encoding"], gz.headers["Content-Encoding"]) == ("br", "gzip")
+    assert brotli.decompress(br_body) == gzip.decompress(gz_body) == identity
+    for response in (plain, br, gz):
+        assert "Accept-Encoding" in response.headers["Vary"]
+    # One ETag per representation, each revalidated by its own coding
+    assert len({plain.headers["ETag"], br.headers["ETag"], gz.headers["ETag"]}) == 3
+    revalidated, _ = _fetch(client, "gzip", **{"If-None-Match": gz.headers["ETag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == gz.headers["ETag"]
+    assert _fetch(client, "br", **{"If-None-Match": gz.headers["ETag"]})[0].status_code == 200
+
+def test_small_bodies_are_sent_as_identity(client, make_post):
+    make_post("a")
+    plain, _ = _fetch(client, "identity")
+    gz, _ = _fetch(client, "gzip, br")
+    assert "Content-Encoding" not in gz.headers
+    assert "Accept-Encoding" in gz.headers["Vary"]
+    # Same bytes, same ETag, whatever the client accepts
+    assert gz.headers["ETag"] == plain.headers["ETag"]
+    assert _fetch(client, "br", **{"If-None-Match": plain.headers["ETag"]})[0].status_code == 304
@@ -0,0 +1,46 @@
+from sqlalchemy import text
+
+from app.crud import blog as crud
+
+def test_rowid_encodes_id_and_resource(db, make_post):
+    post = make_post("Trigram post")
+    diary = crud.create_diary(db, "2024-02-01", "sunny walk", "calm", "sunny", "[]")
+    project = crud.create_project(db, "Trigram tool", "", "", "[]", "active", "published")
+    rows = dict(db.execute(text("SELECT rowid, resource FROM search_index")).all())
+    assert rows == {post.id * 4 + 1: "posts", diary.id * 4 + 2: "diaries", project.id * 4 + 3: "projects"}
+
+    total, items = crud.search(db, "trigram")
+    assert total == 2
+    assert {(item["type"], item["id"]) for item in items} == {("posts", post.id), ("projects", project.id)}
+    crud.delete_post(db, post.id)
+    assert db.execute(text("SELECT count(*) FROM search_index WHERE rowid = :r"), {"r": post.id * 4 + 1}).scalar() == 0
+
+def test_short_terms_fall_back_to_like(db, make_post):
+    make_post("Go notes", date="2024-01-01")
+    make_post("Go and Rust", date="2024-02-01")
+    make_post("Rust only", date="2024-03-01")
+    # Every term is short: LIKE only, newest first, snippet built in Python
+    total, items = crud.search(db, "go")
+    assert total == 2
+    assert [item["title"] for item in items] == ["Go and Rust", "Go notes"]
+    assert items[0]["snippet"] == "<mark>Go</mark> and Rust"
+    assert items[0]["score"] is None
+    # Mixed: the long term uses the index, the short one still filters
+    total, items = crud.search(db, "go rust")
+    assert [item["title"] for item in items] == ["Go and Rust"]
+    # LIKE wildcards in the term are matched literally
+    assert crud.search(db, "_%")[0] == 0
+
+def test_public_search_uses_listing_statuses(db, client, make_post):
+    make_post("Visible fox")
+    make_post("Draft fox", status="draft")
+    make_post("Legacy fox", status="published")
+    make_post("Empty fox", status="")
+    crud.create_diary(db, "2024-02-01", "a fox in the garden", "", "", "[]")
+    crud.create_project(db, "Fox project", "", "", "[]", "active", "published")
+    crud.create_project(db, "Fox secret", "", "", "[]", "active", "draft")
+
+    page = client.get("/api/user/search", params={"q": "fox"}).json()
+    assert sorted(item["title"] for item in page["items"]) == ["2024-02-01", "Fox project", "Visible fox"]
+    assert page["total"] == 3
+    assert crud.search(db, "fox", include_hidden=True)[0] == 7
@@ -0,0 +1,26 @@
+from typing import List
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import text
+
+from app.core.serialization import row_encoder
+from app.models import blog as models
+from app.schemas import blog as schemas
+
+def test_encoder_matches_pydantic(db, client, make_post):
+    make_post("legacy", status="published")
+    post = make_post("untagged")
+    # Synced posts without tags in their frontmatter store NULL
+    db.execute(text("UPDATE posts SET tags = NULL WHERE id = :id"), {"id": post.id})
+    db.commit()
+    db.expire_all()
+
+    rows = db.query(models.Post).order_by(models.Post.id).all()
+    encoded = orjson.loads(row_encoder(List[schemas.Post])(rows))
+    adapter = TypeAdapter(List[schemas.Post])
+    assert encoded == adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    assert [(p["status"], p["tags"]) for p in encoded] == [("public", []), ("public", [])]
+    # Cached endpoints go through the encoder
+    listed = client.get("/api/user/posts").json()
+    assert [p["tags"] for p in listed] == [[]]
@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_sync_script_invalidates_a_running_server(client, tmp_path):
+    assert client.get("/api/user/posts").json() == []
+    assert client.get("/api/user/posts", params={"with_total": "true"}).json()["total"] == 0
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "notes" / "hello.md").write_text("---\ntitle: Hello\n---\nbody", encoding="utf-8")
+    # A separate process, as `--watch` runs next to the server
+    subprocess.run(
+        [sys.executable, "-m", "app.sync_articles", "--base-path", str(tmp_path), "--status", "public"],
+        env={**os.environ, "PYTHONPATH": ROOT}, check=True, capture_output=True,
+    )
+    assert [p["title"] for p in client.get("/api/user/posts").json()] == ["Hello"]
+    # The cached count is invalidated too
+    assert client.get("/api/user/posts", params={"with_total": "true"}).json()["total"] == 1
@@ -0,0 +1,54 @@
+import json
+import logging
+import re
+
+from app.core import timing
+
+def _server_timing(response) -> dict:
+    # {"db": (ms, "N queries"), "total": (ms, None), ...}
+    metrics = {}
+    for part in response.headers["Server-Timing"].split(", "):
+        name, *params = part.split(";")
+        values = dict(param.split("=", 1) for param in params)
+        metrics[name] = (float(values["dur"]), values.get("desc", "").strip('"') or None)
+    return metrics
+
+def test_server_timing_counts_async_queries(client, make_post):
+    make_post("a")
+    # Cache miss: the listing runs on the async engine's greenlet
+    miss = _server_timing(client.get("/api/user/posts"))
+    hit = _server_timing(client.get("/api/user/posts"))
+    miss_queries = int(re.match(r"(\d+) queries", miss["db"][1]).group(1))
+    hit_queries = int(re.match(r"(\d+) queries", hit["db"][1]).group(1))
+    # Both re-read content_versions (CACHE_VERSION_CHECK_MS=0); only the miss selects posts
+    assert miss_queries == hit_queries + 1
+    assert miss["db"][0] > 0
+    assert miss["total"][0] >= miss["db"][0]
+    assert "serialize" in miss
+
+class _Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+def test_requests_are_logged_only_at_debug(client):
+    handler = _Records()
+    level = timing.logger.level
+    timing.logger.addHandler(handler)
+    try:
+        timing.logger.setLevel(logging.INFO)
+        client.get("/api/user/posts")
+        assert handler.records == []
+
+        timing.logger.setLevel(logging.DEBUG)
+        response = client.get("/api/user/books")
+        [record] = handler.records
+        line = json.loads(record.getMessage())
+        assert (record.levelno, line["event"], line["path"], line["status"]) == (logging.DEBUG, "request", "/api/user/books", 200)
+        assert f'"{line["db_queries"]} queries"' in response.headers["Server-Timing"]
+    finally:
+        timing.logger.removeHandler(handler)
+        timing.logger.setLevel(level)
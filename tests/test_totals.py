@@ -0,0 +1,23 @@
+from app.core.cache import response_cache
+from app.crud import blog as crud
+
+def test_with_total(client, make_post):
+    for i in range(3):
+        make_post(f"p{i}")
+    make_post("hidden", status="draft")
+    page = client.get("/api/user/posts", params={"limit": 2, "with_total": "true"}).json()
+    assert page["total"] == 3
+    assert len(page["items"]) == 2
+    assert isinstance(client.get("/api/user/posts").json(), list)
+
+def test_count_is_cached_until_write(db, make_post):
+    make_post("a", '["x"]')
+    make_post("b")
+    assert crud.get_posts_count(db, status="public", tags=["x"]) == 1
+    hits = response_cache.stats()["hits"]
+    assert crud.get_posts_count(db, status="public", tags=["x"]) == 1
+    assert response_cache.stats()["hits"] == hits + 1
+    # Different filters are counted separately
+    assert crud.get_posts_count(db, status="public") == 2
+    make_post("c", '["x"]')
+    assert crud.get_posts_count(db, status="public", tags=["x"]) == 2